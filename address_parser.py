@@ -0,0 +1,260 @@
+"""
+VDI Realty - Address Parser
+Splits one-line US addresses ("16454 108th Avenue NE Bothell WA 98011",
+"123 Main St, Apt 4, Seattle, WA 98101 | Zillow") into street address, city,
+state and ZIP for the extractors and submission scripts.
+
+The state/ZIP tail is matched from the end of the string, so directionals
+like the NE in "108th Avenue NE" are never taken for a state. Without commas,
+the street/city boundary comes from the ZIP's city in the ZIP-centroid table
+(backend/data/zip_centroids.csv), then any city from that table, then the
+street grammar (house number ... suffix [directional] [unit]), which handles
+multi-word cities outside the table. Results are cached per input string.
+
+Usage:
+    python address_parser.py "16454 108th Avenue NE Bothell WA 98011"
+    python address_parser.py --benchmark                   # Addresses/sec, uncached and cached
+
+From Python:
+    from address_parser import parse_address
+    parse_address("16454 108th Avenue NE Bothell WA 98011").fields()
+    # {'address': '16454 108th Avenue NE', 'city': 'Bothell', 'state': 'WA', 'zip': '98011'}
+"""
+
+import re
+import sys
+import csv
+import time
+import random
+import argparse
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+CENTROIDS_FILE = Path(__file__).parent / 'backend' / 'data' / 'zip_centroids.csv'
+CACHE_SIZE = 100000
+
+STATES = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas', 'CA': 'California',
+    'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware', 'DC': 'District of Columbia',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky', 'LA': 'Louisiana',
+    'ME': 'Maine', 'MD': 'Maryland', 'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma', 'OR': 'Oregon',
+    'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont', 'VA': 'Virginia',
+    'WA': 'Washington', 'WV': 'West Virginia', 'WI': 'Wisconsin', 'WY': 'Wyoming'
+}
+STATE_NAMES = {name.lower(): code for code, name in STATES.items()}
+
+# Street types that end the street part. Words that are also common in city
+# names (Park, Lake, Harbor, View, Island, ...) are left out on purpose.
+STREET_SUFFIXES = (
+    'Street St Avenue Ave Av Road Rd Drive Dr Lane Ln Boulevard Blvd Way Court Ct Place Pl '
+    'Circle Cir Terrace Ter Parkway Pkwy Highway Hwy Loop Trail Trl Square Sq Row Walk '
+    'Alley Aly Crescent Cres Expressway Expy Freeway Fwy Pike Plaza Plz Run Path Pass'
+).split()
+DIRECTIONALS = 'N S E W NE NW SE SW North South East West Northeast Northwest Southeast Southwest'.split()
+UNIT_DESIGNATORS = r'(?:Apt|Apartment|Unit|Ste|Suite|Bldg|Building|Fl|Floor|Rm|Room|Lot|Spc|Space|#)'
+
+
+def alternation(words):
+    """Regex alternation, longest first so 'Street' wins over 'St'"""
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+ZIP_CODE = re.compile(r'\d{5}(?:-\d{4})?')
+# House number ... suffix [directional] [unit], then the city (greedy: the last suffix
+# that still leaves a city wins)
+STREET_THEN_CITY = re.compile(
+    rf"^(?P<street>\d+[A-Za-z]?(?:-\d+)?\s+.*\b(?:{alternation(STREET_SUFFIXES)})\.?"
+    rf"(?:\s+(?:{alternation(DIRECTIONALS)})\.?)?"
+    rf"(?:\s+{UNIT_DESIGNATORS}\s*[\w-]+)?)\s+(?!(?:{alternation(DIRECTIONALS)})\.?$)(?P<city>[A-Za-z][A-Za-z .'-]*)$",
+    re.IGNORECASE
+)
+STARTS_WITH_NUMBER = re.compile(r'^\d')
+HAS_DIGIT = re.compile(r'\d')
+SPACES = re.compile(r'\s+')
+AMBIGUOUS_STATES = {word.upper() for word in STREET_SUFFIXES + DIRECTIONALS} & set(STATES)
+
+
+class ParsedAddress(namedtuple('ParsedAddress', 'address city state zip')):
+    """Parsed parts; any of them may be None"""
+
+    def fields(self):
+        """Non-empty parts as listing fields (address, city, state, zip)"""
+        return {key: value for key, value in self._asdict().items() if value}
+
+
+@lru_cache(maxsize=4)
+def load_zip_cities(path=CENTROIDS_FILE):
+    """{zip: city} from the zip,city,lat,lon table (files without a city column give {})"""
+    cities = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('zip') and row.get('city'):
+                    cities[row['zip'].strip().zfill(5)] = row['city'].strip()
+    except OSError:
+        pass
+    return cities
+
+
+@lru_cache(maxsize=4)
+def known_cities(path=CENTROIDS_FILE):
+    """{lowercase city: city} for every city in the table"""
+    return {city.lower(): city for city in load_zip_cities(path).values()}
+
+
+def split_known_city(prefix, zip_code):
+    """(street, city) if prefix ends with the ZIP's city or another known city"""
+    words = prefix.split(' ')
+    expected = load_zip_cities().get(zip_code[:5]) if zip_code else None
+    cities = known_cities()
+    # Longest match first ("North Bend" before "Bend"); cities are at most 3 words here
+    for size in (3, 2, 1):
+        if len(words) <= size:
+            continue
+        candidate = ' '.join(words[-size:]).lower()
+        if (expected and candidate == expected.lower()) or (not expected and candidate in cities):
+            street = ' '.join(words[:-size])
+            if STARTS_WITH_NUMBER.match(street):
+                return street, expected or cities[candidate]
+    return None
+
+
+def split_street_city(prefix, zip_code):
+    """Split 'street city' with no comma between them; city is None if no boundary is found"""
+    if ',' in prefix:
+        street, city = prefix.rsplit(',', 1)
+        street, city = street.strip(' ,'), city.strip()
+        if city and not HAS_DIGIT.search(city):
+            return street, city
+        return prefix, None
+
+    known = split_known_city(prefix, zip_code)
+    if known:
+        return known
+
+    match = STREET_THEN_CITY.match(prefix)
+    if match:
+        return match.group('street'), match.group('city').strip()
+    return prefix, None
+
+
+def last_word(text):
+    """(rest, separator, word): text split at its last space or comma"""
+    cut = max(text.rfind(' '), text.rfind(','))
+    if cut < 0:
+        return '', ' ', text
+    rest = text[:cut + 1].rstrip(' ')
+    return rest.rstrip(' ,'), ',' if rest.endswith(',') else ' ', text[cut + 1:]
+
+
+def split_tail(text):
+    """(prefix, state, zip) with the state and/or ZIP taken off the end of text"""
+    zip_code = None
+    prefix, _, word = last_word(text)
+    if ZIP_CODE.fullmatch(word):
+        zip_code, text = word, prefix
+
+    # Full names are up to three words ("District of Columbia"); like ambiguous
+    # abbreviations they need a ZIP or a comma ("1 Lake Washington" is a street)
+    words = text.split(' ')
+    for size in (3, 2, 1):
+        name = ' '.join(words[-size:]).strip(',').lower()
+        if len(words) > size and name in STATE_NAMES:
+            rest = ' '.join(words[:-size]).rstrip(' ')
+            if zip_code or rest.endswith(','):
+                return rest.rstrip(' ,'), STATE_NAMES[name], zip_code
+
+    prefix, separator, word = last_word(text)
+    word = word.rstrip('.')
+    if prefix and word.upper() in STATES:
+        # Without a ZIP or a comma, "... Avenue NE" / "... Oak Ct" end in a street part, not a state
+        ambiguous = word.upper() in AMBIGUOUS_STATES or not word.isupper()
+        if zip_code or separator == ',' or not ambiguous:
+            return prefix, word.upper(), zip_code
+    return text, None, zip_code
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_address(text):
+    """Parse a one-line address into ParsedAddress(address, city, state, zip)"""
+    text = SPACES.sub(' ', str(text or '')).strip()
+    # Page titles: "123 Main St, Seattle, WA 98101 | Zillow"
+    text = text.split(' | ')[0].strip(' ,')
+    if not text:
+        return ParsedAddress(None, None, None, None)
+
+    prefix, state, zip_code = split_tail(text)
+    if not prefix:
+        return ParsedAddress(None, None, state, zip_code)
+    # "Bothell, WA 98011": no street, just the city
+    if (state or zip_code) and not HAS_DIGIT.search(prefix) and ',' not in prefix:
+        return ParsedAddress(None, prefix, state, zip_code)
+    street, city = split_street_city(prefix, zip_code)
+    return ParsedAddress(street or None, city, state, zip_code)
+
+
+def fill_address_fields(listing):
+    """Split a one-line 'address' into address/city/state/zip, keeping fields already set"""
+    if not listing.get('address') or (listing.get('city') and listing.get('zip')):
+        return listing
+    parsed = parse_address(listing['address'])
+    if parsed.city or parsed.state or parsed.zip:
+        listing['address'] = parsed.address or listing['address']
+        for key in ('city', 'state', 'zip'):
+            if not listing.get(key) and getattr(parsed, key):
+                listing[key] = getattr(parsed, key)
+    return listing
+
+
+def benchmark(count):
+    """Addresses/sec for unique strings (parsed) and repeats (served from the cache)"""
+    rng = random.Random(3)
+    cities = [('Bothell', '98011'), ('Federal Way', '98003'), ('Lake Forest Park', '98155'),
+              ('Mountlake Terrace', '98043'), ('Seattle', '98101'), ('Spokane Valley', '99216')]
+    streets = ['108th Avenue NE', 'Main St', 'Pacific Hwy S', 'Lake Washington Blvd NE', 'NE 8th St Unit 4']
+    addresses = []
+    for i in range(count):
+        city, zip_code = rng.choice(cities)
+        separator = rng.choice([' ', ', '])
+        addresses.append(f"{1000 + i} {rng.choice(streets)}{separator}{city}{separator}WA {zip_code}")
+
+    parse_address.cache_clear()
+    started = time.perf_counter()
+    for address in addresses:
+        parse_address(address)
+    cold = count / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for address in addresses:
+        parse_address(address)
+    warm = count / (time.perf_counter() - started)
+    return cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split one-line addresses into address, city, state and ZIP')
+    parser.add_argument('addresses', nargs='*', help='Addresses to parse')
+    parser.add_argument('--benchmark', action='store_true', help='Measure parse throughput')
+    parser.add_argument('--count', type=int, default=50000, help='Addresses for --benchmark (default: 50,000)')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        cold, warm = benchmark(args.count)
+        print(f"⏱️  {args.count:,} unique addresses: {cold:,.0f}/sec parsed, {warm:,.0f}/sec cached")
+        return 0
+    if not args.addresses:
+        parser.print_help()
+        return 1
+    for address in args.addresses:
+        print(f"{address}\n   → {parse_address(address).fields()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
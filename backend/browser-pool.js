@@ -0,0 +1,230 @@
+const fs = require('fs');
+const puppeteer = require('puppeteer');
+const config = require('./config');
+
+/**
+ * Warm Puppeteer browser with a bounded pool of reusable pages.
+ *
+ * - One Chromium is launched on first use (or by warmUp()) and relaunched if it dies.
+ * - At most config.browserPool.maxPages pages work at once; further requests
+ *   wait in a FIFO queue of up to maxQueue, beyond which they are rejected.
+ * - Each page blocks images, media, fonts and known trackers, which extraction
+ *   never needs (image URLs are still read from the DOM and sized by their
+ *   width/height attributes and srcset descriptors).
+ * - A page is closed and replaced after maxUsesPerPage extractions to cap memory.
+ */
+
+const BLOCKED_RESOURCE_TYPES = new Set(['image', 'media', 'font']);
+const BLOCKED_HOSTS = [
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'facebook.net', 'facebook.com', 'connect.facebook.net', 'hotjar.com', 'segment.io', 'segment.com',
+    'newrelic.com', 'nr-data.net', 'optimizely.com', 'quantserve.com', 'scorecardresearch.com',
+    'adnxs.com', 'criteo.com', 'taboola.com', 'outbrain.com', 'bing.com', 'clarity.ms', 'tiktok.com'
+];
+
+const USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36';
+
+const isBlockedHost = (url) => {
+    try {
+        const host = new URL(url).hostname;
+        return BLOCKED_HOSTS.some(blocked => host === blocked || host.endsWith(`.${blocked}`));
+    } catch (e) {
+        return false;
+    }
+};
+
+class BrowserPool {
+    constructor(options = {}) {
+        this.options = { ...config.browserPool, ...options };
+        this.browser = null;
+        this.launching = null;
+        this.idle = [];          // { page, uses } ready for reuse
+        this.busy = 0;
+        this.waiting = [];       // resolve callbacks queued for a slot
+        this.timings = [];       // recent extraction timings (ms)
+        this.counters = {
+            extractions: 0,
+            browserLaunches: 0,
+            pagesCreated: 0,
+            pagesRecycled: 0,
+            blockedRequests: 0,
+            rejected: 0
+        };
+    }
+    
+    launchOptions() {
+        const executablePath = this.options.executablePath && fs.existsSync(this.options.executablePath)
+            ? this.options.executablePath
+            : undefined; // Fall back to Puppeteer's bundled Chromium
+        return {
+            headless: 'new',
+            executablePath,
+            args: [
+                '--no-sandbox',
+                '--disable-setuid-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-accelerated-2d-canvas',
+                '--disable-gpu',
+                '--window-size=1920x1080'
+            ]
+        };
+    }
+    
+    async getBrowser() {
+        if (this.browser && this.browser.isConnected()) {
+            return this.browser;
+        }
+        if (!this.launching) {
+            this.launching = puppeteer.launch(this.launchOptions()).then(browser => {
+                this.counters.browserLaunches++;
+                this.browser = browser;
+                this.idle = [];
+                browser.on('disconnected', () => {
+                    if (this.browser === browser) {
+                        console.log('⚠️  Extraction browser disconnected; it will be relaunched on next use');
+                        this.browser = null;
+                        this.idle = [];
+                    }
+                });
+                return browser;
+            }).finally(() => {
+                this.launching = null;
+            });
+        }
+        return this.launching;
+    }
+    
+    // Launch the browser ahead of the first request
+    async warmUp() {
+        await this.getBrowser();
+        console.log('✅ Extraction browser ready');
+    }
+    
+    async createPage() {
+        const browser = await this.getBrowser();
+        const page = await browser.newPage();
+        await page.setViewport({ width: 1920, height: 1080 });
+        await page.setUserAgent(USER_AGENT);
+        await page.setRequestInterception(true);
+        page.on('request', request => {
+            if (request.isInterceptResolutionHandled()) {
+                return;
+            }
+            if (BLOCKED_RESOURCE_TYPES.has(request.resourceType()) || isBlockedHost(request.url())) {
+                this.counters.blockedRequests++;
+                request.abort('blockedbyclient');
+            } else {
+                request.continue();
+            }
+        });
+        this.counters.pagesCreated++;
+        return { page, uses: 0 };
+    }
+    
+    // Wait for a free slot (FIFO), then hand out an idle page or a new one
+    async acquire() {
+        if (this.busy >= this.options.maxPages) {
+            if (this.waiting.length >= this.options.maxQueue) {
+                this.counters.rejected++;
+                throw new Error(`Extraction queue is full (${this.waiting.length} waiting)`);
+            }
+            await new Promise(resolve => this.waiting.push(resolve));
+        }
+        this.busy++;
+        try {
+            const entry = this.idle.pop();
+            return entry && !entry.page.isClosed() ? entry : await this.createPage();
+        } catch (error) {
+            this.releaseSlot();
+            throw error;
+        }
+    }
+    
+    releaseSlot() {
+        this.busy--;
+        const next = this.waiting.shift();
+        if (next) {
+            next();
+        }
+    }
+    
+    async release(entry, { broken = false } = {}) {
+        entry.uses++;
+        try {
+            if (broken || entry.uses >= this.options.maxUsesPerPage || !this.browser) {
+                this.counters.pagesRecycled++;
+                await entry.page.close().catch(() => {});
+            } else {
+                // Drop the previous site's DOM, timers and sockets before reuse
+                await entry.page.goto('about:blank');
+                this.idle.push(entry);
+            }
+        } catch (error) {
+            await entry.page.close().catch(() => {});
+        } finally {
+            this.releaseSlot();
+        }
+    }
+    
+    /**
+     * Run fn(page) on a pooled page. Returns fn's result; timings.queueMs is
+     * filled in here and fn may add its own steps to the timings object.
+     */
+    async withPage(fn) {
+        const timings = {};
+        const started = Date.now();
+        const entry = await this.acquire();
+        timings.queueMs = Date.now() - started;
+        
+        let broken = false;
+        try {
+            return await fn(entry.page, timings);
+        } catch (error) {
+            broken = true;
+            throw error;
+        } finally {
+            await this.release(entry, { broken });
+            timings.totalMs = Date.now() - started;
+            this.counters.extractions++;
+            this.timings.push(timings);
+            if (this.timings.length > 200) {
+                this.timings.shift();
+            }
+        }
+    }
+    
+    stats() {
+        const totals = this.timings.map(t => t.totalMs).sort((a, b) => a - b);
+        const pct = (p) => totals.length ? totals[Math.min(totals.length - 1, Math.round(p / 100 * (totals.length - 1)))] : null;
+        return {
+            ...this.counters,
+            browserConnected: Boolean(this.browser && this.browser.isConnected()),
+            activePages: this.busy,
+            idlePages: this.idle.length,
+            queueDepth: this.waiting.length,
+            recentTimings: {
+                count: totals.length,
+                p50Ms: pct(50),
+                p95Ms: pct(95),
+                last: this.timings[this.timings.length - 1] || null
+            }
+        };
+    }
+    
+    async close() {
+        const browser = this.browser;
+        this.browser = null;
+        this.idle = [];
+        if (browser) {
+            await browser.close();
+        }
+    }
+}
+
+// Shared pool used by the /extract endpoint
+const pool = new BrowserPool();
+
+module.exports = {
+    BrowserPool,
+    pool
+};
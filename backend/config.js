@@ -23,6 +23,15 @@ module.exports = {
         sendgridApiKey: process.env.SENDGRID_API_KEY
     },
     
+    // Outbound email queue (see email-outbox.js)
+    emailOutbox: {
+        concurrency: parseInt(process.env.EMAIL_CONCURRENCY) || 4,
+        batchSize: parseInt(process.env.EMAIL_BATCH_SIZE) || 50,
+        maxAttempts: parseInt(process.env.EMAIL_MAX_ATTEMPTS) || 5,
+        retryBaseSeconds: parseInt(process.env.EMAIL_RETRY_BASE_SECONDS) || 60,
+        pollSeconds: parseInt(process.env.EMAIL_POLL_SECONDS) || 30
+    },
+    
     // Website
     websiteUrl: process.env.WEBSITE_URL || 'http://localhost:5500',
     adminEmail: process.env.ADMIN_EMAIL || 'info@vdirealty.com',
@@ -37,8 +46,57 @@ module.exports = {
     // File upload
     maxFileSize: 5 * 1024 * 1024, // 5MB
     maxFiles: 10,
-    uploadDir: path.join(dataDir, 'uploads'),
+    uploadDir: process.env.UPLOAD_DIR || path.join(dataDir, 'uploads'),
+    
+    // Photo pipeline: resized WebP widths (px), generated in the background
+    photoSizes: { thumb: 400, card: 800, large: 1600 },
+    photoQuality: parseInt(process.env.PHOTO_QUALITY) || 80,
+    photoConcurrency: parseInt(process.env.PHOTO_CONCURRENCY) || 2,
+    
+    // Batch submission
+    maxBatchSize: parseInt(process.env.MAX_BATCH_SIZE) || 500,
+    
+    // Public listings pagination
+    listingsPageSize: parseInt(process.env.LISTINGS_PAGE_SIZE) || 50,
+    maxListingsPageSize: parseInt(process.env.MAX_LISTINGS_PAGE_SIZE) || 200,
+    searchPageSize: parseInt(process.env.SEARCH_PAGE_SIZE) || 20,
+    
+    // Cache for public listing responses (see response-cache.js)
+    responseCache: {
+        enabled: process.env.RESPONSE_CACHE !== 'off',
+        ttlSeconds: parseInt(process.env.RESPONSE_CACHE_TTL) || 300,
+        maxEntries: parseInt(process.env.RESPONSE_CACHE_MAX_ENTRIES) || 1000
+    },
+    
+    // Static, precompressed JSON feeds of active listings (see feed-export.js)
+    feeds: {
+        enabled: process.env.FEED_EXPORT !== 'off',
+        dir: process.env.FEED_DIR || path.join(dataDir, 'feeds'),
+        marketDataFile: process.env.MARKET_DATA_FILE || path.join(__dirname, '..', 'market_data.json'),
+        debounceMs: process.env.FEED_DEBOUNCE_MS !== undefined ? parseInt(process.env.FEED_DEBOUNCE_MS) : 2000,
+        refreshMinutes: parseInt(process.env.FEED_REFRESH_MINUTES) || 15
+    },
+    
+    // Offline geocoding (ZIP centroids, see geocoder.js)
+    zipCentroidsFile: process.env.ZIP_CENTROIDS_FILE || path.join(__dirname, 'data', 'zip_centroids.csv'),
+    maxNearbyRadiusMiles: parseInt(process.env.MAX_NEARBY_RADIUS_MILES) || 50,
+    
+    // Puppeteer pool for POST /extract (see browser-pool.js)
+    browserPool: {
+        executablePath: process.env.CHROMIUM_PATH || '/snap/bin/chromium',
+        maxPages: parseInt(process.env.EXTRACT_CONCURRENCY) || 3,
+        maxQueue: parseInt(process.env.EXTRACT_MAX_QUEUE) || 20,
+        maxUsesPerPage: parseInt(process.env.EXTRACT_PAGE_MAX_USES) || 25,
+        settleMs: process.env.EXTRACT_SETTLE_MS !== undefined ? parseInt(process.env.EXTRACT_SETTLE_MS) : 2000,
+        warmOnStart: process.env.EXTRACT_WARM_ON_START === 'true'
+    },
+    
+    // Extraction results shared with extract_listings.py (see extraction-cache.js)
+    extractionCache: {
+        enabled: process.env.EXTRACTION_CACHE !== 'off',
+        ttlHours: parseInt(process.env.EXTRACTION_CACHE_TTL_HOURS) || 24
+    },
     
     // Database
-    dbPath: path.join(dataDir, 'fsbo.db')
+    dbPath: process.env.DB_PATH || path.join(dataDir, 'fsbo.db')
 };
@@ -1,7 +1,8 @@
 const cron = require('node-cron');
-const { statements } = require('./database');
-const { sendReminderEmail } = require('./email-service');
+const { db, statements } = require('./database');
+const { queueReminderEmail } = require('./email-outbox');
 const config = require('./config');
+const { invalidate } = require('./response-cache');
 
 // Run every day at midnight to expire old listings
 const scheduleExpirationCheck = () => {
@@ -10,6 +11,8 @@ const scheduleExpirationCheck = () => {
         
         try {
             const result = statements.expireOldListings.run();
+            // Also drops listings that passed expirationDate since the last run
+            invalidate('expiration check');
             if (result.changes > 0) {
                 console.log(`✅ Expired ${result.changes} listing(s)`);
             } else {
@@ -25,7 +28,7 @@ const scheduleExpirationCheck = () => {
 
 // Run every day at 9 AM to send reminder emails
 const scheduleReminderEmails = () => {
-    cron.schedule('0 9 * * *', async () => {
+    cron.schedule('0 9 * * *', () => {
         console.log('📧 Checking for listings needing reminders...');
         
         try {
@@ -38,14 +41,16 @@ const scheduleReminderEmails = () => {
             
             console.log(`📬 Found ${listings.length} listing(s) needing reminders`);
             
-            for (const listing of listings) {
-                const sent = await sendReminderEmail(listing);
-                if (sent) {
+            // Queue all reminders in one transaction; the outbox retries failed sends,
+            // so a listing is marked as reminded once its email is queued
+            db.transaction(() => {
+                listings.forEach(listing => {
+                    queueReminderEmail(listing);
                     statements.markReminderSent.run(listing.id);
-                }
-            }
+                });
+            })();
             
-            console.log('✅ Reminder emails sent');
+            console.log(`✅ ${listings.length} reminder email(s) queued`);
         } catch (error) {
             console.error('❌ Error sending reminder emails:', error);
         }
@@ -62,6 +67,7 @@ const runImmediateChecks = async () => {
     try {
         const result = statements.expireOldListings.run();
         if (result.changes > 0) {
+            invalidate('startup expiration check');
             console.log(`✅ Expired ${result.changes} listing(s) on startup`);
         }
     } catch (error) {
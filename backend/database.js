@@ -2,6 +2,7 @@ const Database = require('better-sqlite3');
 const path = require('path');
 const fs = require('fs');
 const config = require('./config');
+const { geocodeListing } = require('./geocoder');
 
 // Ensure data directory exists (for production)
 const dataDir = path.dirname(config.dbPath);
@@ -83,11 +84,10 @@ const initDatabase = () => {
         )
     `);
 
-    // Create indexes for better performance
+    // Photos are always read per listing in display order
     db.exec(`
-        CREATE INDEX IF NOT EXISTS idx_listings_status ON listings(status);
-        CREATE INDEX IF NOT EXISTS idx_listings_expiration ON listings(expirationDate);
-        CREATE INDEX IF NOT EXISTS idx_photos_listing ON photos(listingId);
+        DROP INDEX IF EXISTS idx_photos_listing;
+        CREATE INDEX IF NOT EXISTS idx_photos_listing_order ON photos(listingId, displayOrder);
     `);
 
     console.log('✅ Database initialized successfully');
@@ -114,7 +114,9 @@ const runMigrations = () => {
         { name: 'leaseType', type: 'TEXT' },
         { name: 'mlsNumber', type: 'TEXT' },
         { name: 'externalUrl', type: 'TEXT' },
-        { name: 'listingSource', type: 'TEXT DEFAULT \'fsbo\'' }
+        { name: 'listingSource', type: 'TEXT DEFAULT \'fsbo\'' },
+        { name: 'lat', type: 'REAL' },
+        { name: 'lon', type: 'REAL' }
     ];
     
     // Add missing columns
@@ -131,6 +133,23 @@ const runMigrations = () => {
         }
     });
     
+    // Photo columns for the content-addressed upload pipeline (photo-pipeline.js)
+    const photoColumns = db.pragma('table_info(photos)').map(col => col.name);
+    [
+        { name: 'contentHash', type: 'TEXT' },
+        { name: 'variants', type: 'TEXT' }
+    ].forEach(column => {
+        if (!photoColumns.includes(column.name)) {
+            console.log(`  ➕ Adding photos column: ${column.name} (${column.type})`);
+            db.exec(`ALTER TABLE photos ADD COLUMN ${column.name} ${column.type}`);
+            migrationsRun++;
+        }
+    });
+    db.exec(`
+        CREATE INDEX IF NOT EXISTS idx_photos_content_hash ON photos(contentHash);
+        CREATE INDEX IF NOT EXISTS idx_photos_missing_variants ON photos(contentHash, path) WHERE variants IS NULL;
+    `);
+    
     // Update existing records with NULL listingSource to 'fsbo'
     // This handles both: newly created column and existing column with NULL values
     if (listingSourceAdded || existingColumns.includes('listingSource')) {
@@ -149,10 +168,310 @@ const runMigrations = () => {
     }
 };
 
+// Indexes for the public listings query (filters + newest-first keyset pagination)
+// and the daily cron jobs (expiration sweep, reminder lookup). Created after
+// migrations because listingSource may have just been added. Each index matches
+// a query shape checked by scripts/check-query-plans.js.
+const createListingIndexes = () => {
+    db.exec(`
+        DROP INDEX IF EXISTS idx_listings_status;
+        DROP INDEX IF EXISTS idx_listings_expiration;
+        CREATE INDEX IF NOT EXISTS idx_listings_status_created ON listings(status, createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_listings_status_source_created ON listings(status, listingSource, createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_listings_status_city_created ON listings(status, city COLLATE NOCASE, createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_listings_status_zip_created ON listings(status, zip, createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_listings_status_price ON listings(status, price);
+        CREATE INDEX IF NOT EXISTS idx_listings_status_expiration ON listings(status, expirationDate);
+        CREATE INDEX IF NOT EXISTS idx_listings_reminder_due ON listings(status, reminderSent, expirationDate);
+    `);
+};
+
+// Compact copy of each active listing for list views: the card fields, the
+// columns /listings filters and sorts on, and the first photo. Triggers on
+// listings and photos keep it in sync, so list pages never read seller contact
+// details, descriptions or commercial financials. Rows leave the table when
+// their listing stops being active.
+const SUMMARY_COLUMNS = [
+    'address', 'city', 'state', 'zip', 'propertyType', 'price', 'bedrooms', 'bathrooms', 'sqft',
+    'listingSource', 'expirationDate', 'createdAt'
+];
+
+// Summary row for listing `ref` (new.* in triggers, a table alias in the backfill)
+const summarySelect = (ref) => `
+    SELECT ${ref}.id, ${SUMMARY_COLUMNS.map(col => `${ref}.${col}`).join(', ')},
+           (SELECT path FROM photos WHERE listingId = ${ref}.id ORDER BY displayOrder, id LIMIT 1),
+           (SELECT filename FROM photos WHERE listingId = ${ref}.id ORDER BY displayOrder, id LIMIT 1),
+           (SELECT COUNT(*) FROM photos WHERE listingId = ${ref}.id)
+`;
+
+// Refresh the photo columns of one listing's summary
+const summaryPhotoUpdate = (listingId) => `
+    UPDATE listing_summaries SET
+        photoPath = (SELECT path FROM photos WHERE listingId = ${listingId} ORDER BY displayOrder, id LIMIT 1),
+        photoFilename = (SELECT filename FROM photos WHERE listingId = ${listingId} ORDER BY displayOrder, id LIMIT 1),
+        photoCount = (SELECT COUNT(*) FROM photos WHERE listingId = ${listingId})
+    WHERE id = ${listingId};
+`;
+
+const initListingSummaries = () => {
+    const insertSummary = `INSERT OR REPLACE INTO listing_summaries (id, ${SUMMARY_COLUMNS.join(', ')}, photoPath, photoFilename, photoCount)`;
+    const watched = `address, city, state, zip, propertyType, price, bedrooms, bathrooms, sqft, listingSource, status, expirationDate`;
+    db.exec(`
+        CREATE TABLE IF NOT EXISTS listing_summaries (
+            id INTEGER PRIMARY KEY,
+            address TEXT,
+            city TEXT,
+            state TEXT,
+            zip TEXT,
+            propertyType TEXT,
+            price INTEGER,
+            bedrooms INTEGER,
+            bathrooms REAL,
+            sqft INTEGER,
+            listingSource TEXT,
+            expirationDate TEXT,
+            createdAt DATETIME,
+            photoPath TEXT,
+            photoFilename TEXT,
+            photoCount INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_summaries_created ON listing_summaries(createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_summaries_source_created ON listing_summaries(listingSource, createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_summaries_city_created ON listing_summaries(city COLLATE NOCASE, createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_summaries_zip_created ON listing_summaries(zip, createdAt, id);
+        CREATE INDEX IF NOT EXISTS idx_summaries_price ON listing_summaries(price);
+        
+        CREATE TRIGGER IF NOT EXISTS listings_summary_insert AFTER INSERT ON listings
+        WHEN new.status = 'active' BEGIN
+            ${insertSummary} ${summarySelect('new')};
+        END;
+        CREATE TRIGGER IF NOT EXISTS listings_summary_update AFTER UPDATE OF ${watched} ON listings
+        WHEN new.status = 'active' BEGIN
+            ${insertSummary} ${summarySelect('new')};
+        END;
+        CREATE TRIGGER IF NOT EXISTS listings_summary_inactive AFTER UPDATE OF ${watched} ON listings
+        WHEN new.status IS NOT 'active' BEGIN
+            DELETE FROM listing_summaries WHERE id = old.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS listings_summary_delete AFTER DELETE ON listings BEGIN
+            DELETE FROM listing_summaries WHERE id = old.id;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS photos_summary_insert AFTER INSERT ON photos BEGIN
+            ${summaryPhotoUpdate('new.listingId')}
+        END;
+        CREATE TRIGGER IF NOT EXISTS photos_summary_update AFTER UPDATE OF listingId, displayOrder, path, filename ON photos BEGIN
+            ${summaryPhotoUpdate('old.listingId')}
+            ${summaryPhotoUpdate('new.listingId')}
+        END;
+        CREATE TRIGGER IF NOT EXISTS photos_summary_delete AFTER DELETE ON photos BEGIN
+            ${summaryPhotoUpdate('old.listingId')}
+        END;
+    `);
+    
+    // Existing databases: summarize listings created before the table existed
+    const summarized = db.prepare('SELECT COUNT(*) AS count FROM listing_summaries').get().count;
+    if (summarized === 0) {
+        const result = db.prepare(`
+            ${insertSummary} ${summarySelect('l')} FROM listings l WHERE l.status = 'active'
+        `).run();
+        if (result.changes > 0) {
+            console.log(`  📋 Summarized ${result.changes} active listing(s)`);
+        }
+    }
+};
+
+// Full-text search over FSBO/partner listings and extracted (third-party) listings.
+// One FTS5 table indexes both; rowid encodes the source row: listings.id * 2 for
+// listings, extracted_listings.id * 2 + 1 for extracted listings. Triggers keep
+// it in sync with both tables.
+const initSearchIndex = () => {
+    db.exec(`
+        CREATE TABLE IF NOT EXISTS extracted_listings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sourceUrl TEXT NOT NULL UNIQUE,
+            source TEXT,
+            address TEXT,
+            city TEXT,
+            state TEXT,
+            zip TEXT,
+            propertyType TEXT,
+            price INTEGER,
+            sqft INTEGER,
+            bedrooms INTEGER,
+            bathrooms REAL,
+            features TEXT,
+            description TEXT,
+            mlsNumber TEXT,
+            images TEXT,
+            status TEXT DEFAULT 'active',
+            extractedAt TEXT,
+            lat REAL,
+            lon REAL,
+            createdAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updatedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        
+        CREATE VIRTUAL TABLE IF NOT EXISTS listing_search USING fts5(
+            address, city, features, description,
+            tokenize = 'porter unicode61'
+        );
+        
+        CREATE TRIGGER IF NOT EXISTS listings_search_insert AFTER INSERT ON listings BEGIN
+            INSERT INTO listing_search(rowid, address, city, features, description)
+            VALUES (new.id * 2, new.address, new.city, new.features, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS listings_search_update AFTER UPDATE OF address, city, features, description ON listings BEGIN
+            DELETE FROM listing_search WHERE rowid = old.id * 2;
+            INSERT INTO listing_search(rowid, address, city, features, description)
+            VALUES (new.id * 2, new.address, new.city, new.features, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS listings_search_delete AFTER DELETE ON listings BEGIN
+            DELETE FROM listing_search WHERE rowid = old.id * 2;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS extracted_search_insert AFTER INSERT ON extracted_listings BEGIN
+            INSERT INTO listing_search(rowid, address, city, features, description)
+            VALUES (new.id * 2 + 1, new.address, new.city, new.features, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS extracted_search_update AFTER UPDATE OF address, city, features, description ON extracted_listings BEGIN
+            DELETE FROM listing_search WHERE rowid = old.id * 2 + 1;
+            INSERT INTO listing_search(rowid, address, city, features, description)
+            VALUES (new.id * 2 + 1, new.address, new.city, new.features, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS extracted_search_delete AFTER DELETE ON extracted_listings BEGIN
+            DELETE FROM listing_search WHERE rowid = old.id * 2 + 1;
+        END;
+    `);
+    
+    // Existing databases: index listings created before the search table existed
+    const indexed = db.prepare('SELECT COUNT(*) AS count FROM listing_search').get().count;
+    if (indexed === 0) {
+        const result = db.prepare(`
+            INSERT INTO listing_search(rowid, address, city, features, description)
+            SELECT id * 2, address, city, features, description FROM listings
+            UNION ALL
+            SELECT id * 2 + 1, address, city, features, description FROM extracted_listings
+        `).run();
+        if (result.changes > 0) {
+            console.log(`  🔎 Indexed ${result.changes} listing(s) for search`);
+        }
+    }
+};
+
+// Spatial index for radius/bounding-box queries. listings_geo is an R-tree of
+// points using the same rowid encoding as listing_search (listings.id * 2,
+// extracted_listings.id * 2 + 1). Coordinates are ZIP centroids from geocoder.js.
+const initGeoIndex = () => {
+    // extracted_listings created before coordinates were added
+    const extractedColumns = db.pragma('table_info(extracted_listings)').map(col => col.name);
+    ['lat', 'lon'].filter(name => !extractedColumns.includes(name)).forEach(name => {
+        db.exec(`ALTER TABLE extracted_listings ADD COLUMN ${name} REAL`);
+    });
+    
+    db.exec(`
+        CREATE VIRTUAL TABLE IF NOT EXISTS listings_geo USING rtree(id, minLat, maxLat, minLon, maxLon);
+        
+        CREATE TRIGGER IF NOT EXISTS listings_geo_insert AFTER INSERT ON listings
+        WHEN new.lat IS NOT NULL AND new.lon IS NOT NULL BEGIN
+            INSERT INTO listings_geo VALUES (new.id * 2, new.lat, new.lat, new.lon, new.lon);
+        END;
+        CREATE TRIGGER IF NOT EXISTS listings_geo_update AFTER UPDATE OF lat, lon ON listings BEGIN
+            DELETE FROM listings_geo WHERE id = old.id * 2;
+            INSERT INTO listings_geo SELECT new.id * 2, new.lat, new.lat, new.lon, new.lon
+            WHERE new.lat IS NOT NULL AND new.lon IS NOT NULL;
+        END;
+        CREATE TRIGGER IF NOT EXISTS listings_geo_delete AFTER DELETE ON listings BEGIN
+            DELETE FROM listings_geo WHERE id = old.id * 2;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS extracted_geo_insert AFTER INSERT ON extracted_listings
+        WHEN new.lat IS NOT NULL AND new.lon IS NOT NULL BEGIN
+            INSERT INTO listings_geo VALUES (new.id * 2 + 1, new.lat, new.lat, new.lon, new.lon);
+        END;
+        CREATE TRIGGER IF NOT EXISTS extracted_geo_update AFTER UPDATE OF lat, lon ON extracted_listings BEGIN
+            DELETE FROM listings_geo WHERE id = old.id * 2 + 1;
+            INSERT INTO listings_geo SELECT new.id * 2 + 1, new.lat, new.lat, new.lon, new.lon
+            WHERE new.lat IS NOT NULL AND new.lon IS NOT NULL;
+        END;
+        CREATE TRIGGER IF NOT EXISTS extracted_geo_delete AFTER DELETE ON extracted_listings BEGIN
+            DELETE FROM listings_geo WHERE id = old.id * 2 + 1;
+        END;
+    `);
+    
+    // Geocode rows saved before coordinates existed (the update triggers fill the R-tree)
+    const backfill = db.transaction(() => {
+        let count = 0;
+        ['listings', 'extracted_listings'].forEach(table => {
+            const update = db.prepare(`UPDATE ${table} SET lat = ?, lon = ? WHERE id = ?`);
+            db.prepare(`SELECT id, zip, address FROM ${table} WHERE lat IS NULL`).all().forEach(row => {
+                const point = geocodeListing(row);
+                if (point) {
+                    update.run(point.lat, point.lon, row.id);
+                    count++;
+                }
+            });
+        });
+        return count;
+    });
+    const geocoded = backfill();
+    if (geocoded > 0) {
+        console.log(`  📍 Geocoded ${geocoded} existing listing(s)`);
+    }
+};
+
+// Extraction results shared by POST /extract and extract_listings.py, keyed by
+// canonical URL (see extraction-cache.js; extraction_cache.py creates the same table)
+const initExtractionCache = () => {
+    db.exec(`
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            canonicalUrl TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            source TEXT,
+            data TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            extractor TEXT NOT NULL,
+            extractedAt TEXT NOT NULL,
+            changedAt TEXT NOT NULL,
+            expiresAt TEXT NOT NULL,
+            extractions INTEGER NOT NULL DEFAULT 1,
+            hits INTEGER NOT NULL DEFAULT 0,
+            lastHitAt TEXT
+        )
+    `);
+};
+
+// Outbound email queue drained by email-outbox.js. status: pending -> sending ->
+// sent, or back to pending with a later nextAttemptAt, or failed after the last attempt
+const initEmailOutbox = () => {
+    db.exec(`
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            listingId INTEGER,
+            recipient TEXT,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lastError TEXT,
+            createdAt TEXT NOT NULL,
+            nextAttemptAt TEXT NOT NULL,
+            sentAt TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(status, nextAttemptAt);
+    `);
+};
+
 // Initialize database tables before preparing statements
 // This ensures tables exist when db.prepare is called
 initDatabase();
 runMigrations();
+createListingIndexes();
+initListingSummaries();
+initSearchIndex();
+initGeoIndex();
+initExtractionCache();
+initEmailOutbox();
 
 // Prepared statements for better performance
 const statements = {
@@ -164,28 +483,52 @@ const statements = {
             features, description, privateContact, submissionDate, expirationDate,
             buildingClass, zoning, occupancyRate, capRate, grossIncome,
             operatingExpenses, numberOfUnits, parkingSpaces, leaseType,
-            mlsNumber, externalUrl, listingSource
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            mlsNumber, externalUrl, listingSource, lat, lon
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     `),
 
     // Insert photo
     insertPhoto: db.prepare(`
-        INSERT INTO photos (listingId, filename, originalName, path, size, mimeType, displayOrder)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO photos (listingId, filename, originalName, path, size, mimeType, displayOrder, contentHash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    `),
+
+    // Record generated sizes for every photo with this content
+    setPhotoVariants: db.prepare(`
+        UPDATE photos SET variants = ? WHERE contentHash = ?
+    `),
+
+    // Uploaded photos still waiting for resized variants
+    getPhotosMissingVariants: db.prepare(`
+        SELECT contentHash, MIN(path) AS path FROM photos
+        WHERE contentHash IS NOT NULL AND variants IS NULL
+        GROUP BY contentHash
     `),
 
     // Get all active listings
+    // (+expirationDate: filter rows, but walk the createdAt index - see activeListingsQuery)
     getActiveListings: db.prepare(`
         SELECT * FROM listings 
-        WHERE status = 'active' AND expirationDate > datetime('now')
+        WHERE status = 'active' AND +expirationDate > datetime('now')
+        ORDER BY createdAt DESC
+    `),
+
+    // Active listings for the public static feeds: an explicit list of public
+    // columns, never seller contact details or commercial financials
+    getFeedListings: db.prepare(`
+        SELECT id, address, city, state, zip, propertyType, price, sqft, bedrooms, bathrooms,
+               yearBuilt, lotSize, features, description, listingSource, externalUrl,
+               status, submissionDate, expirationDate, createdAt
+        FROM listings
+        WHERE status = 'active' AND +expirationDate > datetime('now')
         ORDER BY createdAt DESC
     `),
 
-    // Get active listings by source
+    // Get active listings by source (runMigrations backfills NULL sources with 'fsbo')
     getActiveListingsBySource: db.prepare(`
         SELECT * FROM listings 
-        WHERE status = 'active' AND expirationDate > datetime('now') 
-        AND (listingSource = ? OR (listingSource IS NULL AND ? = 'fsbo'))
+        WHERE status = 'active' AND +expirationDate > datetime('now') 
+        AND listingSource = ?
         ORDER BY createdAt DESC
     `),
 
@@ -199,6 +542,13 @@ const statements = {
         SELECT * FROM photos WHERE listingId = ? ORDER BY displayOrder
     `),
 
+    // Get photos for many listings at once (listing IDs passed as a JSON array)
+    getPhotosByListingIds: db.prepare(`
+        SELECT * FROM photos
+        WHERE listingId IN (SELECT value FROM json_each(?))
+        ORDER BY listingId, displayOrder
+    `),
+
     // Update listing status
     updateListingStatus: db.prepare(`
         UPDATE listings SET status = ?, updatedAt = CURRENT_TIMESTAMP WHERE id = ?
@@ -211,12 +561,13 @@ const statements = {
         WHERE status = 'active' AND expirationDate < datetime('now')
     `),
 
-    // Get listings needing reminders
+    // Get listings needing reminders: expiring within the next ? days (by date).
+    // Compares expirationDate itself so idx_listings_reminder_due can bound the range.
     getListingsNeedingReminder: db.prepare(`
         SELECT * FROM listings 
         WHERE status = 'active' 
         AND reminderSent = 0
-        AND date(expirationDate, '-' || ? || ' days') <= date('now')
+        AND expirationDate < date('now', '+' || (? + 1) || ' days')
         AND expirationDate > datetime('now')
     `),
 
@@ -228,11 +579,284 @@ const statements = {
     // Admin: Get all listings (including removed)
     getAllListings: db.prepare(`
         SELECT * FROM listings ORDER BY createdAt DESC
+    `),
+
+    // Insert or refresh an extracted listing (matched on its source URL)
+    upsertExtractedListing: db.prepare(`
+        INSERT INTO extracted_listings (
+            sourceUrl, source, address, city, state, zip, propertyType, price, sqft,
+            bedrooms, bathrooms, features, description, mlsNumber, images, status, extractedAt, lat, lon
+        ) VALUES (
+            @sourceUrl, @source, @address, @city, @state, @zip, @propertyType, @price, @sqft,
+            @bedrooms, @bathrooms, @features, @description, @mlsNumber, @images, @status, @extractedAt, @lat, @lon
+        )
+        ON CONFLICT(sourceUrl) DO UPDATE SET
+            source = excluded.source, address = excluded.address, city = excluded.city,
+            state = excluded.state, zip = excluded.zip, propertyType = excluded.propertyType,
+            price = excluded.price, sqft = excluded.sqft, bedrooms = excluded.bedrooms,
+            bathrooms = excluded.bathrooms, features = excluded.features,
+            description = excluded.description, mlsNumber = excluded.mlsNumber,
+            images = excluded.images, status = excluded.status,
+            extractedAt = excluded.extractedAt, lat = excluded.lat, lon = excluded.lon,
+            updatedAt = CURRENT_TIMESTAMP
+    `),
+
+    // Active extracted listings, most recently refreshed first (feed-export.js)
+    getActiveExtractedListings: db.prepare(`
+        SELECT * FROM extracted_listings WHERE status = 'active' ORDER BY updatedAt DESC
+    `),
+
+    // Shared extraction cache (extraction-cache.js)
+    getExtractionCache: db.prepare(`
+        SELECT * FROM extraction_cache WHERE canonicalUrl = ? AND expiresAt > ?
+    `),
+
+    recordExtractionCacheHit: db.prepare(`
+        UPDATE extraction_cache SET hits = hits + 1, lastHitAt = ? WHERE canonicalUrl = ?
+    `),
+
+    // Keeps changedAt when the content fingerprint is unchanged
+    upsertExtractionCache: db.prepare(`
+        INSERT INTO extraction_cache (
+            canonicalUrl, url, source, data, fingerprint, extractor, extractedAt, changedAt, expiresAt
+        ) VALUES (
+            @canonicalUrl, @url, @source, @data, @fingerprint, @extractor, @extractedAt, @extractedAt, @expiresAt
+        )
+        ON CONFLICT(canonicalUrl) DO UPDATE SET
+            url = excluded.url, source = excluded.source, data = excluded.data,
+            changedAt = CASE WHEN fingerprint = excluded.fingerprint THEN changedAt ELSE excluded.changedAt END,
+            fingerprint = excluded.fingerprint, extractor = excluded.extractor,
+            extractedAt = excluded.extractedAt, expiresAt = excluded.expiresAt,
+            extractions = extractions + 1
+    `),
+
+    getExtractionCacheTotals: db.prepare(`
+        SELECT COUNT(*) AS entries,
+               COUNT(CASE WHEN expiresAt > ? THEN 1 END) AS fresh,
+               COALESCE(SUM(hits), 0) AS hits,
+               COALESCE(SUM(extractions), 0) AS extractions
+        FROM extraction_cache
+    `),
+
+    // Email outbox (email-outbox.js)
+    enqueueEmail: db.prepare(`
+        INSERT INTO email_outbox (kind, listingId, recipient, message, createdAt, nextAttemptAt)
+        VALUES (?, ?, ?, ?, ?, ?)
+    `),
+
+    getDueEmails: db.prepare(`
+        SELECT * FROM email_outbox
+        WHERE status = 'pending' AND nextAttemptAt <= ?
+        ORDER BY nextAttemptAt, id
+        LIMIT ?
+    `),
+
+    markEmailSending: db.prepare(`
+        UPDATE email_outbox SET status = 'sending' WHERE id = ?
+    `),
+
+    markEmailSent: db.prepare(`
+        UPDATE email_outbox SET status = 'sent', attempts = attempts + 1, sentAt = ?, lastError = NULL WHERE id = ?
+    `),
+
+    markEmailRetry: db.prepare(`
+        UPDATE email_outbox SET status = ?, attempts = attempts + 1, lastError = ?, nextAttemptAt = ? WHERE id = ?
+    `),
+
+    // Messages claimed by a worker that stopped before finishing them
+    resetSendingEmails: db.prepare(`
+        UPDATE email_outbox SET status = 'pending' WHERE status = 'sending'
+    `),
+
+    deleteSentEmailsBefore: db.prepare(`
+        DELETE FROM email_outbox WHERE status = 'sent' AND sentAt < ?
+    `),
+
+    countEmailsByStatus: db.prepare(`
+        SELECT status, COUNT(*) AS count FROM email_outbox GROUP BY status
     `)
 };
 
+// Filters accepted by findActiveListings: query parameter -> SQL condition
+const listingFilters = {
+    city: 'city = ? COLLATE NOCASE',
+    zip: 'zip = ?',
+    minPrice: 'price >= ?',
+    maxPrice: 'price <= ?',
+    beds: 'bedrooms >= ?',
+    propertyType: 'propertyType = ?',
+    source: 'listingSource = ?'
+};
+
+// Columns a client may request with fields= (everything in the listings table)
+const listingColumns = db.pragma('table_info(listings)').map(col => col.name);
+
+// Columns of listing_summaries (id, SUMMARY_COLUMNS and the first photo)
+const summaryColumns = db.pragma('table_info(listing_summaries)').map(col => col.name);
+
+// Dynamic listing queries differ only in which filters are set, so cache one
+// prepared statement per distinct SQL string
+const listingQueryCache = new Map();
+
+/**
+ * Active listings, newest first, one page at a time.
+ * filters: values keyed like listingFilters (unset keys are ignored)
+ * columns: column names to select (already validated against listingColumns)
+ * after: { createdAt, id } of the last row of the previous page, or null
+ * summary: read listing_summaries instead (columns must be summaryColumns)
+ */
+const findActiveListings = ({ filters = {}, columns = listingColumns, after = null, limit, summary = false }) => {
+    const { sql, params } = activeListingsQuery({ filters, columns, after, summary });
+    
+    let statement = listingQueryCache.get(sql);
+    if (!statement) {
+        statement = db.prepare(sql);
+        listingQueryCache.set(sql, statement);
+    }
+    return statement.all(...params, limit);
+};
+
+/**
+ * SQL and parameters (all but the trailing LIMIT) for a findActiveListings page.
+ * The unary + keeps expirationDate out of index selection: pages must walk a
+ * (status, ..., createdAt, id) index and stop at LIMIT rather than range-scan
+ * idx_listings_status_expiration and sort every active listing.
+ * listing_summaries only holds active listings, so it needs no status check.
+ */
+const activeListingsQuery = ({ filters = {}, columns = listingColumns, after = null, summary = false }) => {
+    const conditions = summary
+        ? [`+expirationDate > datetime('now')`]
+        : [`status = 'active'`, `+expirationDate > datetime('now')`];
+    const params = [];
+    
+    Object.entries(listingFilters).forEach(([name, condition]) => {
+        if (filters[name] !== undefined) {
+            conditions.push(condition);
+            params.push(filters[name]);
+        }
+    });
+    
+    if (after) {
+        conditions.push('(createdAt, id) < (?, ?)');
+        params.push(after.createdAt, after.id);
+    }
+    
+    const sql = `
+        SELECT ${columns.join(', ')} FROM ${summary ? 'listing_summaries' : 'listings'}
+        WHERE ${conditions.join(' AND ')}
+        ORDER BY createdAt DESC, id DESC
+        LIMIT ?
+    `;
+    return { sql, params };
+};
+
+// Columns returned by searchListings/findNearbyListings, from listings (l) or extracted_listings (e)
+const resultColumns = ['id', 'address', 'city', 'state', 'zip', 'propertyType', 'price', 'sqft', 'bedrooms', 'bathrooms', 'lat', 'lon'];
+
+// Prepared statements for the dynamic queries below, one per distinct SQL string
+const unionQueryCache = new Map();
+
+/**
+ * Run a query over active listings and extracted listings together. `index` is
+ * a CTE ("idx") producing rowids in the shared encoding plus any extra columns;
+ * filters are the findActiveListings filters, with source === 'extracted'
+ * selecting only extracted listings.
+ */
+const queryListingsAndExtracted = ({ index, indexParams, extraColumns, filters, orderBy, limit, offset = 0 }) => {
+    const structured = Object.entries(listingFilters)
+        .filter(([name]) => name !== 'source' && filters[name] !== undefined);
+    const conditions = structured.map(([, condition]) => `AND ${condition}`).join(' ');
+    const values = structured.map(([name]) => filters[name]);
+    const extras = extraColumns.map(col => `, idx.${col}`).join('');
+    
+    const branches = [];
+    const params = [...indexParams];
+    if (filters.source !== 'extracted') {
+        branches.push(`
+            SELECT 'listing' AS type, ${resultColumns.map(col => `l.${col}`).join(', ')},
+                   l.listingSource AS source, l.externalUrl AS url${extras}
+            FROM idx JOIN listings l ON l.id = idx.rowid / 2
+            WHERE idx.rowid % 2 = 0 AND l.status = 'active' AND +l.expirationDate > datetime('now')
+            ${filters.source !== undefined ? 'AND l.listingSource = ?' : ''} ${conditions}
+        `);
+        params.push(...(filters.source !== undefined ? [filters.source] : []), ...values);
+    }
+    if (filters.source === undefined || filters.source === 'extracted') {
+        branches.push(`
+            SELECT 'extracted' AS type, ${resultColumns.map(col => `e.${col}`).join(', ')},
+                   e.source AS source, e.sourceUrl AS url${extras}
+            FROM idx JOIN extracted_listings e ON e.id = idx.rowid / 2
+            WHERE idx.rowid % 2 = 1 AND e.status = 'active' ${conditions}
+        `);
+        params.push(...values);
+    }
+    
+    const sql = `
+        WITH idx AS (${index})
+        ${branches.join(' UNION ALL ')}
+        ${orderBy ? `ORDER BY ${orderBy}` : ''}
+        ${limit ? 'LIMIT ? OFFSET ?' : ''}
+    `;
+    
+    let statement = unionQueryCache.get(sql);
+    if (!statement) {
+        statement = db.prepare(sql);
+        unionQueryCache.set(sql, statement);
+    }
+    return statement.all(...params, ...(limit ? [limit, offset] : []));
+};
+
+/**
+ * Ranked full-text search over active listings and extracted listings.
+ * match: an FTS5 query string (see toFtsQuery in routes/fsbo-routes.js)
+ * filters: same keys as findActiveListings; source may also be 'extracted'
+ * Returns rows with type ('listing' | 'extracted'), source, url, score and snippet.
+ */
+const searchListings = ({ match, filters = {}, limit, offset = 0 }) => {
+    // bm25 weights: address, city, features, description
+    const rows = queryListingsAndExtracted({
+        index: `
+            SELECT rowid, bm25(listing_search, 2.0, 2.0, 1.5, 1.0) AS rank,
+                   snippet(listing_search, 3, '<mark>', '</mark>', '…', 16) AS snippet
+            FROM listing_search WHERE listing_search MATCH ?
+        `,
+        indexParams: [match],
+        extraColumns: ['rank', 'snippet'],
+        filters,
+        orderBy: 'rank',
+        limit,
+        offset
+    });
+    return rows.map(({ rank, ...row }) => ({
+        ...row,
+        // bm25() is lower-is-better and negative; expose a positive score
+        score: Number((-rank).toFixed(4))
+    }));
+};
+
+/**
+ * Listings and extracted listings whose coordinates fall inside a lat/lon box
+ * (R-tree lookup). Distance filtering and ordering are done by the caller.
+ */
+const findListingsInBox = ({ minLat, maxLat, minLon, maxLon }, filters = {}) => queryListingsAndExtracted({
+    index: `
+        SELECT id AS rowid FROM listings_geo
+        WHERE minLat >= ? AND maxLat <= ? AND minLon >= ? AND maxLon <= ?
+    `,
+    indexParams: [minLat, maxLat, minLon, maxLon],
+    extraColumns: [],
+    filters
+});
+
 module.exports = {
     db,
     initDatabase,
-    statements
+    statements,
+    listingFilters,
+    listingColumns,
+    summaryColumns,
+    findActiveListings,
+    activeListingsQuery,
+    searchListings,
+    findListingsInBox
 };
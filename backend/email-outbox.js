@@ -0,0 +1,181 @@
+const config = require('./config');
+const { db, statements } = require('./database');
+const {
+    sendEmail,
+    buildConfirmationEmail,
+    buildReminderEmail,
+    buildAdminNotification,
+    buildContactEmail,
+    buildInquiryEmail
+} = require('./email-service');
+
+// Persistent outbound email queue. Request handlers and cron jobs only insert
+// into email_outbox; a background worker claims due messages in batches,
+// delivers them over the pooled transport with bounded concurrency, and
+// retries failures with exponential backoff until maxAttempts.
+
+const SENT_RETENTION_DAYS = 30;
+
+const stats = {
+    queued: 0,
+    sent: 0,
+    retried: 0,
+    failed: 0,
+    batches: 0,
+    sendMs: []          // recent delivery times
+};
+
+let draining = false;
+let drainAgain = false;
+let pollTimer = null;
+
+// Queue a message; returns its outbox id. Delivery starts right away in the background.
+const enqueueEmail = (kind, mailOptions, listingId = null) => {
+    const now = new Date().toISOString();
+    const result = statements.enqueueEmail.run(kind, listingId, mailOptions.to || null, JSON.stringify(mailOptions), now, now);
+    stats.queued++;
+    setImmediate(drain);
+    return result.lastInsertRowid;
+};
+
+const queueConfirmationEmail = (listing) => enqueueEmail('confirmation', buildConfirmationEmail(listing), listing.id);
+const queueReminderEmail = (listing) => enqueueEmail('reminder', buildReminderEmail(listing), listing.id);
+const queueAdminNotification = (listing) => enqueueEmail('admin-notification', buildAdminNotification(listing), listing.id);
+const queueContactEmail = (contactData) => enqueueEmail('contact', buildContactEmail(contactData));
+const queueInquiryToSeller = (listing, inquiry) => enqueueEmail('inquiry', buildInquiryEmail(listing, inquiry), listing.id);
+
+// Claim up to batchSize due messages in one transaction
+const claimBatch = db.transaction(() => {
+    const rows = statements.getDueEmails.all(new Date().toISOString(), config.emailOutbox.batchSize);
+    rows.forEach(row => statements.markEmailSending.run(row.id));
+    return rows;
+});
+
+const deliver = async (row) => {
+    const started = Date.now();
+    try {
+        await sendEmail(JSON.parse(row.message));
+        stats.sendMs.push(Date.now() - started);
+        if (stats.sendMs.length > 200) {
+            stats.sendMs.shift();
+        }
+        return { row, error: null };
+    } catch (error) {
+        return { row, error };
+    }
+};
+
+// Record a batch's outcomes in one transaction
+const recordOutcomes = db.transaction((outcomes) => {
+    const now = Date.now();
+    outcomes.forEach(({ row, error }) => {
+        if (!error) {
+            statements.markEmailSent.run(new Date(now).toISOString(), row.id);
+            stats.sent++;
+            return;
+        }
+        const attempts = row.attempts + 1;
+        const giveUp = attempts >= config.emailOutbox.maxAttempts;
+        const delay = config.emailOutbox.retryBaseSeconds * 1000 * 2 ** (attempts - 1);
+        statements.markEmailRetry.run(giveUp ? 'failed' : 'pending', String(error.message || error),
+            new Date(now + delay).toISOString(), row.id);
+        if (giveUp) {
+            stats.failed++;
+            console.error(`❌ Email #${row.id} (${row.kind}) to ${row.recipient} failed after ${attempts} attempt(s): ${error.message}`);
+        } else {
+            stats.retried++;
+            console.log(`⚠️  Email #${row.id} (${row.kind}) failed, retrying in ${Math.round(delay / 1000)}s: ${error.message}`);
+        }
+    });
+});
+
+// Send every due message, concurrency at a time, batch by batch
+const drain = async () => {
+    if (draining) {
+        drainAgain = true;
+        return;
+    }
+    draining = true;
+    try {
+        do {
+            drainAgain = false;
+            const batch = claimBatch();
+            if (batch.length === 0) {
+                break;
+            }
+            stats.batches++;
+            
+            const outcomes = [];
+            let next = 0;
+            const worker = async () => {
+                while (next < batch.length) {
+                    outcomes.push(await deliver(batch[next++]));
+                }
+            };
+            await Promise.all(Array.from({ length: Math.min(config.emailOutbox.concurrency, batch.length) }, worker));
+            recordOutcomes(outcomes);
+            
+            // A full batch means more may be waiting
+            drainAgain = drainAgain || batch.length === config.emailOutbox.batchSize;
+        } while (drainAgain);
+    } catch (error) {
+        console.error('❌ Email outbox error:', error);
+    } finally {
+        draining = false;
+    }
+};
+
+// Recover messages left mid-send by a previous run, then poll for retries
+const startOutboxWorker = () => {
+    const reset = statements.resetSendingEmails.run();
+    if (reset.changes > 0) {
+        console.log(`📬 Re-queued ${reset.changes} email(s) interrupted by the last shutdown`);
+    }
+    const cutoff = new Date(Date.now() - SENT_RETENTION_DAYS * 24 * 60 * 60 * 1000).toISOString();
+    statements.deleteSentEmailsBefore.run(cutoff);
+    
+    pollTimer = setInterval(drain, config.emailOutbox.pollSeconds * 1000);
+    pollTimer.unref();
+    drain();
+    console.log(`✅ Email outbox worker started (${config.emailOutbox.concurrency} concurrent sends)`);
+};
+
+// Resolves once nothing is due or in flight (or after timeoutMs)
+const flushOutbox = async (timeoutMs = 10000) => {
+    const deadline = Date.now() + timeoutMs;
+    await drain();
+    while (draining && Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, 50));
+    }
+};
+
+const getOutboxStats = () => {
+    const byStatus = { pending: 0, sending: 0, sent: 0, failed: 0 };
+    statements.countEmailsByStatus.all().forEach(row => {
+        byStatus[row.status] = row.count;
+    });
+    const times = [...stats.sendMs].sort((a, b) => a - b);
+    const pct = (p) => times.length ? times[Math.min(times.length - 1, Math.round(p / 100 * (times.length - 1)))] : null;
+    return {
+        ...byStatus,
+        queued: stats.queued,
+        delivered: stats.sent,
+        retried: stats.retried,
+        gaveUp: stats.failed,
+        batches: stats.batches,
+        sendP50Ms: pct(50),
+        sendP95Ms: pct(95)
+    };
+};
+
+module.exports = {
+    enqueueEmail,
+    queueConfirmationEmail,
+    queueReminderEmail,
+    queueAdminNotification,
+    queueContactEmail,
+    queueInquiryToSeller,
+    startOutboxWorker,
+    flushOutbox,
+    getOutboxStats
+};
@@ -6,6 +6,13 @@ let transporter;
 let sendgridClient;
 
 const initializeTransporter = () => {
+    // Keep SMTP connections open between outbox batches instead of one per message
+    const pooling = {
+        pool: true,
+        maxConnections: config.emailOutbox.concurrency,
+        maxMessages: 100
+    };
+    
     if (config.email.service === 'sendgrid' && config.email.sendgridApiKey) {
         // Use SendGrid Web API for reliable email delivery
         try {
@@ -20,6 +27,7 @@ const initializeTransporter = () => {
     } else if (config.email.service === 'gmail') {
         transporter = nodemailer.createTransport({
             service: 'gmail',
+            ...pooling,
             auth: {
                 user: config.email.user,
                 pass: config.email.password
@@ -31,14 +39,24 @@ const initializeTransporter = () => {
             host: config.email.host,
             port: config.email.port,
             secure: config.email.secure,
-            auth: {
+            ...pooling,
+            // Unauthenticated relays (e.g. a local SMTP stand-in) have no user
+            auth: config.email.user ? {
                 user: config.email.user,
                 pass: config.email.password
-            }
+            } : undefined
         });
     }
 };
 
+// Form input is untrusted; escape it before it goes into an HTML body
+const escapeHtml = (value) => String(value ?? '')
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;')
+    .replace(/'/g, '&#39;');
+
 // Helper function to send email using SendGrid Web API or nodemailer
 const sendEmail = async (mailOptions) => {
     if (sendgridClient) {
@@ -58,8 +76,8 @@ const sendEmail = async (mailOptions) => {
     }
 };
 
-// Send confirmation email to seller
-const sendConfirmationEmail = async (listing) => {
+// Confirmation email to seller
+const buildConfirmationEmail = (listing) => {
     const mailOptions = {
         from: `VDI Realty <${config.email.user}>`,
         to: listing.email,
@@ -87,23 +105,23 @@ const sendConfirmationEmail = async (listing) => {
                         <h1>✅ Listing Submitted Successfully!</h1>
                     </div>
                     <div class="content">
-                        <p>Hello ${listing.firstName},</p>
+                        <p>Hello ${escapeHtml(listing.firstName)},</p>
                         
                         <p>Thank you for listing your property with VDI Realty FSBO! Your listing has been submitted and will be reviewed shortly.</p>
                         
                         <div class="property-details">
                             <h3 style="margin-top: 0; color: #0F2027;">Property Details:</h3>
                             <div class="detail-row">
-                                <span class="detail-label">Address:</span> ${listing.address}, ${listing.city}, ${listing.state} ${listing.zip}
+                                <span class="detail-label">Address:</span> ${escapeHtml(listing.address)}, ${escapeHtml(listing.city)}, ${escapeHtml(listing.state)} ${escapeHtml(listing.zip)}
                             </div>
                             <div class="detail-row">
-                                <span class="detail-label">Type:</span> ${listing.propertyType}
+                                <span class="detail-label">Type:</span> ${escapeHtml(listing.propertyType)}
                             </div>
                             <div class="detail-row">
                                 <span class="detail-label">Price:</span> $${listing.price.toLocaleString()}
                             </div>
                             <div class="detail-row">
-                                <span class="detail-label">Beds/Baths:</span> ${listing.bedrooms} bed, ${listing.bathrooms} bath
+                                <span class="detail-label">Beds/Baths:</span> ${escapeHtml(listing.bedrooms)} bed, ${escapeHtml(listing.bathrooms)} bath
                             </div>
                             <div class="detail-row">
                                 <span class="detail-label">Square Feet:</span> ${listing.sqft.toLocaleString()} sq ft
@@ -138,18 +156,11 @@ const sendConfirmationEmail = async (listing) => {
         `
     };
 
-    try {
-        await sendEmail(mailOptions);
-        console.log(`✅ Confirmation email sent to ${listing.email}`);
-        return true;
-    } catch (error) {
-        console.error('❌ Error sending confirmation email:', error);
-        return false;
-    }
+    return mailOptions;
 };
 
-// Send expiration reminder email
-const sendReminderEmail = async (listing) => {
+// Expiration reminder email
+const buildReminderEmail = (listing) => {
     const daysRemaining = Math.ceil((new Date(listing.expirationDate) - new Date()) / (1000 * 60 * 60 * 24));
     
     const mailOptions = {
@@ -177,7 +188,7 @@ const sendReminderEmail = async (listing) => {
                         <h1>⏰ Listing Expiration Reminder</h1>
                     </div>
                     <div class="content">
-                        <p>Hello ${listing.firstName},</p>
+                        <p>Hello ${escapeHtml(listing.firstName)},</p>
                         
                         <div class="warning-box">
                             <strong>⚠️ Your property listing will expire in ${daysRemaining} days!</strong>
@@ -186,9 +197,9 @@ const sendReminderEmail = async (listing) => {
                         
                         <div class="property-info">
                             <h3 style="margin-top: 0; color: #0F2027;">Your Property:</h3>
-                            <p><strong>${listing.address}</strong><br>
-                            ${listing.city}, ${listing.state} ${listing.zip}<br>
-                            ${listing.bedrooms} bed, ${listing.bathrooms} bath | ${listing.sqft.toLocaleString()} sq ft<br>
+                            <p><strong>${escapeHtml(listing.address)}</strong><br>
+                            ${escapeHtml(listing.city)}, ${escapeHtml(listing.state)} ${escapeHtml(listing.zip)}<br>
+                            ${escapeHtml(listing.bedrooms)} bed, ${escapeHtml(listing.bathrooms)} bath | ${listing.sqft.toLocaleString()} sq ft<br>
                             <strong style="color: #C5A059; font-size: 1.2em;">$${listing.price.toLocaleString()}</strong></p>
                         </div>
                         
@@ -221,47 +232,35 @@ const sendReminderEmail = async (listing) => {
         `
     };
 
-    try {
-        await sendEmail(mailOptions);
-        console.log(`✅ Reminder email sent to ${listing.email}`);
-        return true;
-    } catch (error) {
-        console.error('❌ Error sending reminder email:', error);
-        return false;
-    }
+    return mailOptions;
 };
 
-// Send notification to admin
-const sendAdminNotification = async (listing) => {
+// New listing notification to admin
+const buildAdminNotification = (listing) => {
     const mailOptions = {
         from: `VDI Realty <${config.email.user}>`,
         to: config.adminEmail,
         subject: 'New FSBO Listing Submitted',
         html: `
             <h2>New FSBO Listing Submitted</h2>
-            <p><strong>Property:</strong> ${listing.address}, ${listing.city}, ${listing.state}</p>
-            <p><strong>Seller:</strong> ${listing.firstName} ${listing.lastName}</p>
-            <p><strong>Email:</strong> ${listing.email}</p>
-            <p><strong>Phone:</strong> ${listing.phone}</p>
+            <p><strong>Property:</strong> ${escapeHtml(listing.address)}, ${escapeHtml(listing.city)}, ${escapeHtml(listing.state)}</p>
+            <p><strong>Seller:</strong> ${escapeHtml(listing.firstName)} ${escapeHtml(listing.lastName)}</p>
+            <p><strong>Email:</strong> ${escapeHtml(listing.email)}</p>
+            <p><strong>Phone:</strong> ${escapeHtml(listing.phone)}</p>
             <p><strong>Price:</strong> $${listing.price.toLocaleString()}</p>
-            <p><strong>Type:</strong> ${listing.propertyType}</p>
-            <p><strong>Beds/Baths:</strong> ${listing.bedrooms}/${listing.bathrooms}</p>
+            <p><strong>Type:</strong> ${escapeHtml(listing.propertyType)}</p>
+            <p><strong>Beds/Baths:</strong> ${escapeHtml(listing.bedrooms)}/${escapeHtml(listing.bathrooms)}</p>
             <p><strong>Privacy:</strong> ${listing.privateContact ? 'Contact info is PRIVATE' : 'Contact info is PUBLIC'}</p>
             <hr>
             <p><a href="${config.websiteUrl}/fsbo-listings.html">View All Listings</a></p>
         `
     };
 
-    try {
-        await sendEmail(mailOptions);
-        console.log(`✅ Admin notification sent`);
-    } catch (error) {
-        console.error('❌ Error sending admin notification:', error);
-    }
+    return mailOptions;
 };
 
-// Send contact form email
-const sendContactEmail = async (contactData) => {
+// Contact form email to admin
+const buildContactEmail = (contactData) => {
     const mailOptions = {
         from: `VDI Realty Website <${config.email.user}>`,
         to: config.adminEmail,
@@ -292,22 +291,22 @@ const sendContactEmail = async (contactData) => {
                         <div class="info-box">
                             <h3 style="margin-top: 0; color: #0F2027;">Contact Information:</h3>
                             <div class="detail-row">
-                                <span class="detail-label">Name:</span> ${contactData.name}
+                                <span class="detail-label">Name:</span> ${escapeHtml(contactData.name)}
                             </div>
                             <div class="detail-row">
-                                <span class="detail-label">Email:</span> <a href="mailto:${contactData.email}">${contactData.email}</a>
+                                <span class="detail-label">Email:</span> <a href="mailto:${escapeHtml(contactData.email)}">${escapeHtml(contactData.email)}</a>
                             </div>
                             <div class="detail-row">
-                                <span class="detail-label">Phone:</span> ${contactData.phone}
+                                <span class="detail-label">Phone:</span> ${escapeHtml(contactData.phone)}
                             </div>
                             <div class="detail-row" style="border-bottom: none;">
-                                <span class="detail-label">Interest:</span> ${contactData.interest}
+                                <span class="detail-label">Interest:</span> ${escapeHtml(contactData.interest)}
                             </div>
                         </div>
                         
                         <div class="message-box">
                             <h3 style="margin-top: 0; color: #0F2027;">Message:</h3>
-                            <p style="white-space: pre-line;">${contactData.message}</p>
+                            <p style="white-space: pre-line;">${escapeHtml(contactData.message)}</p>
                         </div>
                         
                         <p style="font-size: 0.9em; color: #666;">
@@ -324,20 +323,39 @@ const sendContactEmail = async (contactData) => {
         `
     };
 
-    try {
-        await sendEmail(mailOptions);
-        console.log(`✅ Contact form email sent to ${config.adminEmail}`);
-        return true;
-    } catch (error) {
-        console.error('❌ Error sending contact form email:', error);
-        return false;
-    }
+    return mailOptions;
+};
+
+// Buyer inquiry forwarded to the seller (private listings)
+const buildInquiryEmail = (listing, inquiry) => {
+    const mailOptions = {
+        from: `VDI Realty <${config.email.user}>`,
+        to: listing.email,
+        replyTo: inquiry.email,
+        subject: `New Inquiry About ${listing.address} - VDI Realty`,
+        html: `
+            <h2>Someone is interested in your property</h2>
+            <p><strong>Property:</strong> ${escapeHtml(listing.address)}, ${escapeHtml(listing.city)}, ${escapeHtml(listing.state)}</p>
+            <p><strong>Name:</strong> ${escapeHtml(inquiry.name) || 'Not provided'}</p>
+            <p><strong>Email:</strong> <a href="mailto:${escapeHtml(inquiry.email)}">${escapeHtml(inquiry.email)}</a></p>
+            <p><strong>Phone:</strong> ${escapeHtml(inquiry.phone) || 'Not provided'}</p>
+            <p><strong>Message:</strong></p>
+            <p style="white-space: pre-line;">${escapeHtml(inquiry.message)}</p>
+            <hr>
+            <p>Reply to this email to respond directly to the buyer.</p>
+            <p>&copy; ${new Date().getFullYear()} VDI Realty</p>
+        `
+    };
+
+    return mailOptions;
 };
 
 module.exports = {
     initializeTransporter,
-    sendConfirmationEmail,
-    sendReminderEmail,
-    sendAdminNotification,
-    sendContactEmail
+    sendEmail,
+    buildConfirmationEmail,
+    buildReminderEmail,
+    buildAdminNotification,
+    buildContactEmail,
+    buildInquiryEmail
 };
@@ -0,0 +1,146 @@
+const crypto = require('crypto');
+const config = require('./config');
+const { statements } = require('./database');
+
+// Extraction results shared with extract_listings.py through the
+// extraction_cache table. Entries are keyed by canonical URL and hold a common
+// record (see RECORD_FIELDS), so either extractor can serve the other's
+// results. canonicalUrl(), toRecord() and fingerprint() must stay identical to
+// extraction_cache.py.
+
+const TRACKING_PARAMS = new Set(['gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'ref', 'referrer']);
+const RECORD_FIELDS = ['address', 'city', 'state', 'zip', 'price', 'bedrooms', 'bathrooms', 'sqft', 'description', 'mls', 'images'];
+const NUMBER_FIELDS = new Set(['price', 'bedrooms', 'bathrooms', 'sqft']);
+
+// Lookups served by this process
+const stats = {
+    hits: 0,
+    misses: 0,
+    stores: 0
+};
+
+const isTrackingParam = (name) => name.startsWith('utm_') || TRACKING_PARAMS.has(name);
+
+// Cache key for a listing URL: https, bare host, no tracking params, sorted query
+const canonicalUrl = (url) => {
+    const parsed = new URL(url.trim());
+    let host = parsed.hostname.toLowerCase().replace(/^www\./, '');
+    if (parsed.port && !['80', '443'].includes(parsed.port)) {
+        host += `:${parsed.port}`;
+    }
+    const path = parsed.pathname.length > 1 ? (parsed.pathname.replace(/\/+$/, '') || '/') : '/';
+    const params = parsed.search.slice(1).split('&')
+        .filter(param => param && !isTrackingParam(param.split('=')[0].toLowerCase()))
+        .sort();
+    return `https://${host}${path}` + (params.length ? `?${params.join('&')}` : '');
+};
+
+const toNumber = (value) => {
+    if (value === null || value === undefined || typeof value === 'boolean') {
+        return null;
+    }
+    if (typeof value !== 'number') {
+        const digits = String(value).replace(/[^0-9.]/g, '');
+        value = /^\d*\.?\d*$/.test(digits) && /\d/.test(digits) ? parseFloat(digits) : NaN;
+    }
+    return Number.isFinite(value) ? value : null;
+};
+
+// Common cache record from an extractor result (missing/empty values become null)
+const toRecord = (data) => {
+    const record = {};
+    RECORD_FIELDS.forEach(field => {
+        let value = data[field];
+        if (field === 'mls' && (value === null || value === undefined)) {
+            value = data.mlsNumber;
+        }
+        if (NUMBER_FIELDS.has(field)) {
+            value = toNumber(value);
+        } else if (field === 'images') {
+            value = (value || []).filter(Boolean).map(String);
+        } else {
+            value = value !== null && value !== undefined ? String(value).trim() : '';
+            value = value || null;
+        }
+        record[field] = value;
+    });
+    return record;
+};
+
+// Stable JSON text (sorted keys, no spaces), byte-identical to extraction_cache.py
+const serialize = (record) => JSON.stringify(record, Object.keys(record).sort());
+
+const fingerprint = (record) => crypto.createHash('sha256').update(serialize(record)).digest('hex');
+
+// Record -> the string fields parseData() returns to the /extract form
+const toFormData = (record) => {
+    const data = {};
+    RECORD_FIELDS.forEach(field => {
+        const value = record[field];
+        data[field] = field === 'images' ? (value || []) : (value === null || value === undefined ? '' : String(value));
+    });
+    return data;
+};
+
+// Fresh cached record for url (counted as a hit on the shared row), else null
+const lookup = (url) => {
+    if (!config.extractionCache.enabled) {
+        return null;
+    }
+    const key = canonicalUrl(url);
+    const now = new Date().toISOString();
+    const row = statements.getExtractionCache.get(key, now);
+    if (!row) {
+        stats.misses++;
+        return null;
+    }
+    statements.recordExtractionCacheHit.run(now, key);
+    stats.hits++;
+    return JSON.parse(row.data);
+};
+
+// Save a successful extraction; returns its record
+const store = (url, source, data) => {
+    const record = toRecord(data);
+    if (!config.extractionCache.enabled) {
+        return record;
+    }
+    const now = new Date();
+    statements.upsertExtractionCache.run({
+        canonicalUrl: canonicalUrl(url),
+        url,
+        source,
+        data: serialize(record),
+        fingerprint: fingerprint(record),
+        extractor: 'puppeteer',
+        extractedAt: now.toISOString(),
+        expiresAt: new Date(now.getTime() + config.extractionCache.ttlHours * 3600 * 1000).toISOString()
+    });
+    stats.stores++;
+    return record;
+};
+
+// This process's lookups plus shared totals (hit rate = hits / (hits + extractions))
+const getExtractionCacheStats = () => {
+    const lookups = stats.hits + stats.misses;
+    const shared = statements.getExtractionCacheTotals.get(new Date().toISOString());
+    const sharedLookups = shared.hits + shared.extractions;
+    return {
+        ...stats,
+        hitRate: lookups ? Math.round(stats.hits / lookups * 1000) / 1000 : null,
+        shared: {
+            ...shared,
+            hitRate: sharedLookups ? Math.round(shared.hits / sharedLookups * 1000) / 1000 : null
+        }
+    };
+};
+
+module.exports = {
+    canonicalUrl,
+    toRecord,
+    fingerprint,
+    toFormData,
+    lookup,
+    store,
+    getExtractionCacheStats
+};
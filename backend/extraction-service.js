@@ -1,4 +1,6 @@
-const puppeteer = require('puppeteer');
+const config = require('./config');
+const { pool } = require('./browser-pool');
+const extractionCache = require('./extraction-cache');
 
 /**
  * Extract listing data from real estate URLs using Puppeteer
@@ -217,6 +219,14 @@ async function extractPropertyData(page, source) {
         // Extract images
         const images = [];
         const seenUrls = new Set();
+
+        // The browser pool blocks image downloads, so img.width/height are only the
+        // broken-image box; size images by what the markup declares instead
+        const declaredSize = (img, name) => parseInt(img.getAttribute(name)) || 0;
+        const srcsetWidth = (srcset) => Math.max(0, ...(srcset || '').split(',')
+            .map(candidate => candidate.trim().match(/\s(\d+)w$/))
+            .filter(Boolean)
+            .map(match => parseInt(match[1])));
         
         // Look for images in multiple ways
         const imageSelectors = [
@@ -249,11 +259,14 @@ async function extractPropertyData(page, source) {
                                   img.alt?.toLowerCase().includes('logo') || 
                                   img.alt?.toLowerCase().includes('icon');
                     
-                    const width = parseInt(img.getAttribute('width')) || img.width || 0;
-                    const height = parseInt(img.getAttribute('height')) || img.height || 0;
+                    const width = declaredSize(img, 'width') ||
+                        srcsetWidth(img.getAttribute('srcset') || img.getAttribute('data-srcset'));
+                    const height = declaredSize(img, 'height');
+                    // Without a declared size, fall back to names that mark small images
+                    const isSmall = width === 0 && /thumb|sprite|placeholder|spacer|\.svg(\?|$)/i.test(src);
                     
                     // Only include larger images that look like property photos
-                    if (src.match(/^https?:\/\//i) && !isLogo && (width === 0 || width > 300) && (height === 0 || height > 200)) {
+                    if (src.match(/^https?:\/\//i) && !isLogo && !isSmall && (width === 0 || width > 300) && (height === 0 || height > 200)) {
                         images.push(src);
                         seenUrls.add(src);
                     }
@@ -613,7 +626,11 @@ function parseData(extractedData) {
  * @returns {Promise<Object>} - Extracted and parsed listing data
  */
 async function extractListing(url) {
-    let browser = null;
+    const started = Date.now();
+    const phase = (timings, name, since) => {
+        timings[name] = Date.now() - since;
+        return Date.now();
+    };
     
     try {
         console.log(`[Extraction] Starting extraction for: ${url}`);
@@ -621,116 +638,116 @@ async function extractListing(url) {
         const source = detectSource(url);
         console.log(`[Extraction] Detected source: ${source}`);
         
-        // Launch browser with appropriate options for EC2
-        browser = await puppeteer.launch({
-            headless: 'new',
-            args: [
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-accelerated-2d-canvas',
-                '--disable-gpu',
-                '--window-size=1920x1080'
-            ],
-            executablePath: '/snap/bin/chromium' // Use snap-installed Chromium
-        });
-
-        const page = await browser.newPage();
-        
-        // Set viewport
-        await page.setViewport({ width: 1920, height: 1080 });
-        
-        // Set user agent to avoid detection
-        await page.setUserAgent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36');
-        
-        console.log(`[Extraction] Navigating to URL...`);
-        
-        // Navigate to page with longer timeout and different wait strategy
-        try {
-            await page.goto(url, {
-                waitUntil: 'domcontentloaded', // Less strict than networkidle2
-                timeout: 60000 // 60 seconds
-            });
-        } catch (navError) {
-            console.log(`[Extraction] Navigation warning: ${navError.message}, continuing anyway...`);
-            // Some sites have resources that timeout but page still loads
+        // Served straight from the cache if either extractor saw this URL recently
+        const cached = extractionCache.lookup(url);
+        if (cached) {
+            console.log(`[Extraction] Cache hit for ${extractionCache.canonicalUrl(url)}`);
+            return {
+                success: true,
+                source: source,
+                data: extractionCache.toFormData(cached),
+                cached: true
+            };
         }
         
-        console.log(`[Extraction] Page loaded, waiting for content...`);
-        
-        // Wait for page to settle
-        await new Promise(resolve => setTimeout(resolve, 2000));
-        
-        // Scroll to trigger lazy loading
-        try {
-            await page.evaluate(async () => {
-                await new Promise((resolve) => {
-                    let totalHeight = 0;
-                    const distance = 300;
-                    const timer = setInterval(() => {
-                        const scrollHeight = document.body.scrollHeight;
-                        window.scrollBy(0, distance);
-                        totalHeight += distance;
+        // Borrow a warm page (viewport, user agent and resource blocking already set up)
+        return await pool.withPage(async (page, timings) => {
+            let mark = Date.now();
+            console.log(`[Extraction] Navigating to URL... (waited ${timings.queueMs}ms for a page)`);
+            
+            // Navigate to page with longer timeout and different wait strategy
+            try {
+                await page.goto(url, {
+                    waitUntil: 'domcontentloaded', // Less strict than networkidle2
+                    timeout: 60000 // 60 seconds
+                });
+            } catch (navError) {
+                console.log(`[Extraction] Navigation warning: ${navError.message}, continuing anyway...`);
+                // Some sites have resources that timeout but page still loads
+            }
+            mark = phase(timings, 'navigateMs', mark);
+            
+            console.log(`[Extraction] Page loaded, waiting for content...`);
+            
+            // Wait for page to settle
+            await new Promise(resolve => setTimeout(resolve, config.browserPool.settleMs));
+            
+            // Scroll to trigger lazy loading
+            try {
+                await page.evaluate(async () => {
+                    await new Promise((resolve) => {
+                        let totalHeight = 0;
+                        const distance = 300;
+                        const timer = setInterval(() => {
+                            const scrollHeight = document.body.scrollHeight;
+                            window.scrollBy(0, distance);
+                            totalHeight += distance;
 
-                        if (totalHeight >= scrollHeight){
-                            clearInterval(timer);
-                            window.scrollTo(0, 0); // Scroll back to top
-                            setTimeout(resolve, 1000);
-                        }
-                    }, 100);
+                            if (totalHeight >= scrollHeight){
+                                clearInterval(timer);
+                                window.scrollTo(0, 0); // Scroll back to top
+                                setTimeout(resolve, 1000);
+                            }
+                        }, 100);
+                    });
                 });
+            } catch (scrollError) {
+                console.log(`[Extraction] Scroll failed, continuing...`);
+            }
+            
+            console.log(`[Extraction] Content loaded, waiting additional time...`);
+            await new Promise(resolve => setTimeout(resolve, config.browserPool.settleMs));
+            mark = phase(timings, 'settleMs', mark);
+            
+            // Check for blocking/CAPTCHA
+            const bodyText = await page.evaluate(() => document.body.textContent.toLowerCase());
+            
+            if (bodyText.includes('verify you are a human') || 
+                bodyText.includes('security check') ||
+                bodyText.includes('access denied')) {
+                throw new Error('Site is blocking automated access. Please try a different listing or enter details manually.');
+            }
+            
+            console.log(`[Extraction] Extracting data...`);
+            
+            // Extract data
+            const extractedData = await extractPropertyData(page, source);
+            phase(timings, 'extractMs', mark);
+            
+            console.log(`[Extraction] Raw data extracted:`, {
+                address: extractedData.address ? extractedData.address.substring(0, 50) : 'none',
+                price: extractedData.price,
+                images: extractedData.images.length
             });
-        } catch (scrollError) {
-            console.log(`[Extraction] Scroll failed, continuing...`);
-        }
-        
-        console.log(`[Extraction] Content loaded, waiting additional time...`);
-        await new Promise(resolve => setTimeout(resolve, 2000));
-        
-        // Check for blocking/CAPTCHA
-        const pageContent = await page.content();
-        const bodyText = await page.evaluate(() => document.body.textContent.toLowerCase());
-        
-        if (bodyText.includes('verify you are a human') || 
-            bodyText.includes('security check') ||
-            bodyText.includes('access denied')) {
-            throw new Error('Site is blocking automated access. Please try a different listing or enter details manually.');
-        }
-        
-        console.log(`[Extraction] Extracting data...`);
-        
-        // Extract data
-        const extractedData = await extractPropertyData(page, source);
-        
-        console.log(`[Extraction] Raw data extracted:`, {
-            address: extractedData.address ? extractedData.address.substring(0, 50) : 'none',
-            price: extractedData.price,
-            images: extractedData.images.length
-        });
-        
-        // Parse and normalize data
-        const parsedData = parseData(extractedData);
-        
-        console.log(`[Extraction] Parsed data:`, {
-            address: parsedData.address,
-            city: parsedData.city,
-            price: parsedData.price,
-            images: parsedData.images.length
-        });
-        
-        // Validate we got meaningful data
-        if (!parsedData.address && !parsedData.price) {
+            
+            // Parse and normalize data
+            const parsedData = parseData(extractedData);
+            
+            console.log(`[Extraction] Parsed data:`, {
+                address: parsedData.address,
+                city: parsedData.city,
+                price: parsedData.price,
+                images: parsedData.images.length
+            });
+            
+            // Validate we got meaningful data
+            if (!parsedData.address && !parsedData.price) {
+                return {
+                    success: false,
+                    error: 'Could not extract listing data from this page. The page structure may not be supported yet. Please enter details manually.',
+                    timings
+                };
+            }
+            
+            extractionCache.store(url, source, parsedData);
+            
             return {
-                success: false,
-                error: 'Could not extract listing data from this page. The page structure may not be supported yet. Please enter details manually.'
+                success: true,
+                source: source,
+                data: parsedData,
+                timings
             };
-        }
-        
-        return {
-            success: true,
-            source: source,
-            data: parsedData
-        };
+        });
         
     } catch (error) {
         console.error(`[Extraction] Error:`, error.message);
@@ -744,6 +761,8 @@ async function extractListing(url) {
             errorMessage = 'Could not connect to the website. Please check the URL and try again.';
         } else if (error.message.includes('blocking')) {
             errorMessage = 'This website is blocking automated access. Please try a different listing or enter details manually.';
+        } else if (error.message.includes('queue is full')) {
+            errorMessage = 'The extractor is busy right now. Please try again in a minute or enter details manually.';
         }
         
         return {
@@ -751,13 +770,11 @@ async function extractListing(url) {
             error: errorMessage
         };
     } finally {
-        if (browser) {
-            await browser.close();
-            console.log(`[Extraction] Browser closed`);
-        }
+        console.log(`[Extraction] Finished in ${Date.now() - started}ms`);
     }
 }
 
 module.exports = {
-    extractListing
+    extractListing,
+    getExtractionStats: () => ({ ...pool.stats(), cache: extractionCache.getExtractionCacheStats() })
 };
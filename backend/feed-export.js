@@ -0,0 +1,299 @@
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+const crypto = require('crypto');
+const { promisify } = require('util');
+const config = require('./config');
+const { statements } = require('./database');
+const { photoView } = require('./photo-pipeline');
+const { onInvalidate } = require('./response-cache');
+
+// Static JSON feeds for the GitHub Pages site. Active listings (all, and one
+// feed per listingSource), extracted listings and market_data.json are written
+// to config.feeds.dir as content-hashed files (name.<hash>.json) with .gz and
+// .br copies next to them, plus a manifest.json naming the current file of
+// each feed. Hashed files never change, so they are served as immutable; only
+// the manifest has to be revalidated. Exports are debounced after every
+// response-cache invalidation, and a feed is only rewritten when its content
+// hash changes.
+
+const MANIFEST = 'manifest.json';
+const FEED_FILE = /^([a-z0-9-]+)\.([0-9a-f]{12})\.json(?:\.(gz|br))?$/;
+const SOURCE_NAME = /^[a-z0-9-]+$/;
+
+const gzip = promisify(zlib.gzip);
+const brotliCompress = promisify(zlib.brotliCompress);
+
+const feeds = {};       // name -> manifest entry of the current file
+let exporting = false;
+let exportAgain = false;
+let debounceTimer = null;
+let refreshTimer = null;
+
+const stats = {
+    exports: 0,
+    written: 0,
+    unchanged: 0,
+    failed: 0,
+    lastExportAt: null,
+    lastExportMs: null
+};
+
+// Feeds are static files that may be committed to the public site, so they
+// carry only the public columns selected by getFeedListings: no seller names,
+// email or phone (even for listings with public contact details; the cards
+// fall back to the inquiry form) and no commercial financials
+const activeListings = () => {
+    const listings = statements.getFeedListings.all();
+    const photosByListing = new Map(listings.map(listing => [listing.id, []]));
+    if (listings.length > 0) {
+        const ids = JSON.stringify(listings.map(listing => listing.id));
+        statements.getPhotosByListingIds.all(ids).forEach(photo => {
+            photosByListing.get(photo.listingId).push(photoView(photo));
+        });
+    }
+    return listings.map(listing => ({ ...listing, privateContact: 1, photos: photosByListing.get(listing.id) }));
+};
+
+const extractedView = ({ images, ...listing }) => ({
+    ...listing,
+    images: images ? JSON.parse(images) : []
+});
+
+// market_data.json is maintained by update_market_data.py; skipped if it isn't deployed
+const readMarketData = () => {
+    try {
+        return JSON.parse(fs.readFileSync(config.feeds.marketDataFile, 'utf8'));
+    } catch (error) {
+        if (error.code !== 'ENOENT') {
+            console.error('⚠️  Could not read market data for feeds:', error.message);
+        }
+        return null;
+    }
+};
+
+// Every feed's content, keyed by feed name
+const buildFeeds = () => {
+    const listings = activeListings();
+    const result = { listings: { listings } };
+
+    // Sources that disappear keep an (empty) feed so pages never see a missing name
+    const sources = new Set(['fsbo', 'partner']);
+    listings.forEach(listing => sources.add(listing.listingSource));
+    Object.keys(feeds).filter(name => name.startsWith('listings-')).forEach(name => sources.add(name.slice(9)));
+    [...sources].filter(source => SOURCE_NAME.test(source || '')).forEach(source => {
+        result[`listings-${source}`] = { listings: listings.filter(listing => listing.listingSource === source) };
+    });
+
+    result.extracted = { listings: statements.getActiveExtractedListings.all().map(extractedView) };
+
+    const market = readMarketData();
+    if (market) {
+        result.market = market;
+    }
+    return result;
+};
+
+// Write through a temp file so readers never see a partial file
+const writeFile = (filename, data) => {
+    const target = path.join(config.feeds.dir, filename);
+    fs.writeFileSync(`${target}.tmp`, data);
+    fs.renameSync(`${target}.tmp`, target);
+};
+
+// Returns true if the feed changed and a new generation was written
+const writeFeed = async (name, data) => {
+    const body = Buffer.from(JSON.stringify(data));
+    const hash = crypto.createHash('sha256').update(body).digest('hex').slice(0, 12);
+    const current = feeds[name];
+    if (current && current.hash === hash) {
+        stats.unchanged++;
+        return false;
+    }
+
+    const [gzipped, brotli] = await Promise.all([
+        gzip(body, { level: zlib.constants.Z_BEST_COMPRESSION }),
+        brotliCompress(body, {
+            params: {
+                [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+                [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+                [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length
+            }
+        })
+    ]);
+
+    // Compressed copies first: the .json file appearing means the generation is complete
+    const file = `${name}.${hash}.json`;
+    writeFile(`${file}.gz`, gzipped);
+    writeFile(`${file}.br`, brotli);
+    writeFile(file, body);
+
+    feeds[name] = {
+        file,
+        hash,
+        count: Array.isArray(data.listings) ? data.listings.length : undefined,
+        bytes: body.length,
+        gzipBytes: gzipped.length,
+        brotliBytes: brotli.length,
+        updatedAt: new Date().toISOString(),
+        previous: current ? current.file : undefined
+    };
+    stats.written++;
+    return true;
+};
+
+// Delete generations that are neither current nor previous (pages that loaded
+// the last manifest may still be fetching the previous file)
+const prune = () => {
+    const keep = new Set();
+    Object.values(feeds).forEach(feed => {
+        keep.add(feed.file);
+        if (feed.previous) {
+            keep.add(feed.previous);
+        }
+    });
+    fs.readdirSync(config.feeds.dir).forEach(filename => {
+        const match = filename.match(FEED_FILE);
+        if (match && !keep.has(filename.replace(/\.(gz|br)$/, ''))) {
+            fs.unlinkSync(path.join(config.feeds.dir, filename));
+        }
+    });
+};
+
+const exportFeeds = async (reason = 'manual export') => {
+    if (!config.feeds.enabled) {
+        return;
+    }
+    if (exporting) {
+        exportAgain = true;
+        return;
+    }
+    exporting = true;
+    const started = Date.now();
+    try {
+        const changed = [];
+        for (const [name, data] of Object.entries(buildFeeds())) {
+            if (await writeFeed(name, data)) {
+                changed.push(name);
+            }
+        }
+        if (changed.length > 0) {
+            writeFile(MANIFEST, JSON.stringify({ generatedAt: new Date().toISOString(), feeds }, null, 2));
+            prune();
+            console.log(`📦 Feeds updated (${changed.join(', ')}) in ${Date.now() - started}ms: ${reason}`);
+        }
+        stats.exports++;
+        stats.lastExportAt = new Date().toISOString();
+        stats.lastExportMs = Date.now() - started;
+    } catch (error) {
+        stats.failed++;
+        console.error('❌ Feed export failed:', error.message);
+    } finally {
+        exporting = false;
+        if (exportAgain) {
+            exportAgain = false;
+            scheduleExport('listings changed during export');
+        }
+    }
+};
+
+// Coalesce bursts of listing changes (batch imports, expiration sweeps) into one export
+const scheduleExport = (reason) => {
+    if (!config.feeds.enabled || debounceTimer) {
+        return;
+    }
+    debounceTimer = setTimeout(() => {
+        debounceTimer = null;
+        exportFeeds(reason);
+    }, config.feeds.debounceMs);
+    debounceTimer.unref();
+};
+
+// Pick up the files of the last run so unchanged feeds aren't rewritten after a restart
+const loadManifest = () => {
+    try {
+        const manifest = JSON.parse(fs.readFileSync(path.join(config.feeds.dir, MANIFEST), 'utf8'));
+        Object.entries(manifest.feeds || {}).forEach(([name, feed]) => {
+            if (fs.existsSync(path.join(config.feeds.dir, feed.file))) {
+                feeds[name] = feed;
+            }
+        });
+    } catch (error) {
+        // No manifest yet (first run) or unreadable: every feed is written fresh
+    }
+};
+
+const startFeedExport = () => {
+    if (!config.feeds.enabled) {
+        console.log('ℹ️  Feed export disabled (FEED_EXPORT=off)');
+        return;
+    }
+    fs.mkdirSync(config.feeds.dir, { recursive: true });
+    loadManifest();
+    onInvalidate(scheduleExport);
+
+    // Listings also leave the feeds by passing their expirationDate, and
+    // market_data.json changes outside the API
+    refreshTimer = setInterval(() => exportFeeds('periodic refresh'), config.feeds.refreshMinutes * 60 * 1000);
+    refreshTimer.unref();
+    exportFeeds('startup');
+    console.log(`✅ Feed export started (${config.feeds.dir})`);
+};
+
+/**
+ * Middleware for /feeds: serves manifest.json (revalidated on every use) and
+ * hashed feed files (immutable), picking the .br or .gz copy when the client
+ * accepts it.
+ */
+const serveFeeds = (req, res, next) => {
+    const filename = req.path.slice(1);
+    if ((req.method !== 'GET' && req.method !== 'HEAD') || (filename !== MANIFEST && !FEED_FILE.test(filename))) {
+        return next();
+    }
+
+    // Explicit .gz/.br requests (e.g. a CDN origin pull) get the raw file;
+    // .json requests get the best precompressed copy the client accepts
+    const match = filename.match(FEED_FILE);
+    let served = filename;
+    let type = 'application/json';
+    if (match && match[3]) {
+        type = match[3] === 'br' ? 'application/x-brotli' : 'application/gzip';
+    } else if (match) {
+        const encoding = req.acceptsEncodings('br', 'gzip', 'identity');
+        if (encoding === 'br' || encoding === 'gzip') {
+            served = `${filename}.${encoding === 'br' ? 'br' : 'gz'}`;
+            res.set('Content-Encoding', encoding);
+        }
+        res.set('Vary', 'Accept-Encoding');
+    }
+
+    const filePath = path.join(config.feeds.dir, served);
+    if (!fs.existsSync(filePath)) {
+        res.removeHeader('Content-Encoding');
+        return res.status(404).json({ error: 'Feed not found' });
+    }
+
+    res.type(type);
+    res.set('Cache-Control', filename === MANIFEST ? 'no-cache' : 'public, max-age=31536000, immutable');
+    res.sendFile(filePath);
+};
+
+const getFeedStats = () => ({
+    ...stats,
+    enabled: config.feeds.enabled,
+    pending: Boolean(debounceTimer) || exporting,
+    feeds: Object.fromEntries(Object.entries(feeds).map(([name, feed]) => [name, {
+        file: feed.file,
+        count: feed.count,
+        bytes: feed.bytes,
+        brotliBytes: feed.brotliBytes
+    }]))
+});
+
+module.exports = {
+    startFeedExport,
+    exportFeeds,
+    scheduleExport,
+    serveFeeds,
+    getFeedStats
+};
@@ -0,0 +1,92 @@
+const fs = require('fs');
+const config = require('./config');
+
+/**
+ * Offline ZIP geocoder: approximate listing coordinates from a local
+ * ZIP-centroid table (same data and rules as geocode.py).
+ * Accepts zip,lat,lon CSV or the US Census ZCTA Gazetteer (tab separated).
+ */
+
+const EARTH_RADIUS_MILES = 3958.8;
+
+let centroids = null;
+
+const loadCentroids = () => {
+    if (centroids) {
+        return centroids;
+    }
+    
+    centroids = new Map();
+    if (!fs.existsSync(config.zipCentroidsFile)) {
+        console.error(`⚠️  ZIP centroid table not found: ${config.zipCentroidsFile}`);
+        return centroids;
+    }
+    
+    const lines = fs.readFileSync(config.zipCentroidsFile, 'utf8').split(/\r?\n/).filter(Boolean);
+    const delimiter = lines[0].includes('\t') ? '\t' : ',';
+    const header = lines[0].split(delimiter).map(name => name.trim());
+    const column = (...names) => header.findIndex(name => names.includes(name));
+    const zipCol = column('zip', 'GEOID');
+    const latCol = column('lat', 'INTPTLAT');
+    const lonCol = column('lon', 'INTPTLONG');
+    
+    lines.slice(1).forEach(line => {
+        const values = line.split(delimiter);
+        const lat = parseFloat(values[latCol]);
+        const lon = parseFloat(values[lonCol]);
+        if (values[zipCol] && Number.isFinite(lat) && Number.isFinite(lon)) {
+            centroids.set(values[zipCol].trim().padStart(5, '0'), { lat, lon });
+        }
+    });
+    
+    console.log(`📍 Loaded ${centroids.size} ZIP centroids`);
+    return centroids;
+};
+
+// ZIP from the zip/zipCode field, else the last 5-digit number in the address
+const listingZip = (listing) => {
+    for (const value of [listing.zip, listing.zipCode]) {
+        const match = String(value || '').match(/\b(\d{5})(?:-\d{4})?\b/);
+        if (match) {
+            return match[1];
+        }
+    }
+    const matches = String(listing.address || '').match(/\b\d{5}\b/g);
+    return matches ? matches[matches.length - 1] : null;
+};
+
+// { lat, lon } for a ZIP or listing, or null if unknown
+const geocodeZip = (zip) => loadCentroids().get(zip) || null;
+const geocodeListing = (listing) => {
+    const zip = listingZip(listing);
+    return zip ? geocodeZip(zip) : null;
+};
+
+// Great-circle (haversine) distance in miles
+const distanceMiles = (lat1, lon1, lat2, lon2) => {
+    const toRad = (deg) => deg * Math.PI / 180;
+    const a = Math.sin(toRad(lat2 - lat1) / 2) ** 2 +
+        Math.cos(toRad(lat1)) * Math.cos(toRad(lat2)) * Math.sin(toRad(lon2 - lon1) / 2) ** 2;
+    return 2 * EARTH_RADIUS_MILES * Math.asin(Math.sqrt(a));
+};
+
+// Lat/lon box that contains every point within radius miles of (lat, lon)
+const boundingBox = (lat, lon, radiusMiles) => {
+    const latDelta = radiusMiles / 69.0;
+    const lonDelta = radiusMiles / (69.0 * Math.max(Math.cos(lat * Math.PI / 180), 0.01));
+    return {
+        minLat: lat - latDelta,
+        maxLat: lat + latDelta,
+        minLon: lon - lonDelta,
+        maxLon: lon + lonDelta
+    };
+};
+
+module.exports = {
+    loadCentroids,
+    listingZip,
+    geocodeZip,
+    geocodeListing,
+    distanceMiles,
+    boundingBox
+};
@@ -0,0 +1,174 @@
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+const sharp = require('sharp');
+const config = require('./config');
+const { statements } = require('./database');
+
+/**
+ * Photo pipeline for uploaded listing photos.
+ *
+ * Uploads are renamed to <sha256>.<ext> (content-addressed), so identical
+ * photos are stored once no matter how often they're uploaded. Resized WebP
+ * variants (<sha256>-<size>.webp) are generated in the background by a small
+ * in-process queue; until a variant exists /photo serves the original.
+ */
+
+const CONTENT_NAME = /^([0-9a-f]{64})(?:-([a-z]+))?\.[a-z0-9]+$/;
+
+const queue = [];
+const pending = new Set();
+let running = 0;
+
+const stats = {
+    stored: 0,
+    deduplicated: 0,
+    processed: 0,
+    failed: 0
+};
+
+const variantName = (hash, size) => `${hash}-${size}.webp`;
+const variantPath = (hash, size) => path.join(config.uploadDir, variantName(hash, size));
+
+// Stream a file through SHA-256
+const hashFile = (filePath) => new Promise((resolve, reject) => {
+    const hash = crypto.createHash('sha256');
+    fs.createReadStream(filePath)
+        .on('error', reject)
+        .on('data', chunk => hash.update(chunk))
+        .on('end', () => resolve(hash.digest('hex')));
+});
+
+/**
+ * Move a multer upload to its content-addressed name. Returns a file object
+ * shaped like multer's (filename, path, size, ...) plus contentHash.
+ */
+const storeUpload = async (file) => {
+    const contentHash = await hashFile(file.path);
+    const ext = (path.extname(file.originalname) || '.jpg').toLowerCase();
+    const filename = `${contentHash}${ext}`;
+    const target = path.join(config.uploadDir, filename);
+    
+    if (fs.existsSync(target)) {
+        await fs.promises.unlink(file.path);
+        stats.deduplicated++;
+    } else {
+        await fs.promises.rename(file.path, target);
+        stats.stored++;
+    }
+    return { ...file, filename, path: target, contentHash };
+};
+
+const storeUploads = (files) => Promise.all(files.map(storeUpload));
+
+// Write every configured size (never upscaled), then record them on the photo rows
+const processPhoto = async (contentHash, sourcePath) => {
+    const variants = {};
+    for (const [size, width] of Object.entries(config.photoSizes)) {
+        const target = variantPath(contentHash, size);
+        if (!fs.existsSync(target)) {
+            const tmp = `${target}.${process.pid}.tmp`;
+            await sharp(sourcePath)
+                .rotate() // Apply EXIF orientation before the metadata is stripped
+                .resize({ width, withoutEnlargement: true })
+                .webp({ quality: config.photoQuality })
+                .toFile(tmp);
+            await fs.promises.rename(tmp, target);
+        }
+        variants[size] = variantName(contentHash, size);
+    }
+    statements.setPhotoVariants.run(JSON.stringify(variants), contentHash);
+};
+
+const runQueue = () => {
+    while (running < config.photoConcurrency && queue.length > 0) {
+        const { contentHash, sourcePath } = queue.shift();
+        running++;
+        processPhoto(contentHash, sourcePath)
+            .then(() => stats.processed++)
+            .catch(error => {
+                stats.failed++;
+                console.error(`❌ Photo processing failed for ${contentHash}:`, error.message);
+            })
+            .finally(() => {
+                running--;
+                pending.delete(contentHash);
+                runQueue();
+            });
+    }
+};
+
+// Queue resizing for an upload (no-op if it's already queued)
+const enqueue = ({ contentHash, path: sourcePath }) => {
+    if (!contentHash || pending.has(contentHash)) {
+        return;
+    }
+    pending.add(contentHash);
+    queue.push({ contentHash, sourcePath });
+    setImmediate(runQueue);
+};
+
+// Re-queue uploads whose variants were never generated (e.g. server restarted mid-queue)
+const resumePending = () => {
+    const photos = statements.getPhotosMissingVariants.all();
+    photos.forEach(photo => enqueue({ contentHash: photo.contentHash, path: photo.path }));
+    if (photos.length > 0) {
+        console.log(`🖼️  Queued ${photos.length} photo(s) for resizing`);
+    }
+};
+
+/**
+ * Resolve a /photo request to a file on disk.
+ * Returns { filePath, size, immutable } or null for an invalid name.
+ */
+const resolvePhoto = (filename, size) => {
+    if (filename.includes('..') || filename.includes('/') || filename.includes('\\')) {
+        return null;
+    }
+    
+    const match = filename.match(CONTENT_NAME);
+    if (match && size && config.photoSizes[size] && !match[2]) {
+        const variant = variantPath(match[1], size);
+        if (fs.existsSync(variant)) {
+            return { filePath: variant, size, immutable: true };
+        }
+    }
+    return { filePath: path.join(config.uploadDir, filename), size: 'original', immutable: Boolean(match) };
+};
+
+// Public photo URL: extracted photos keep their source URL, uploads go through /photo
+// (card-sized by default; `sizes` lists every size for uploads)
+const photoUrl = (photo, size = 'card') => photo.path.startsWith('http')
+    ? photo.path
+    : `/api/fsbo/photo/${photo.filename}${size === 'original' ? '' : `?size=${size}`}`;
+
+const photoSizes = (photo) => {
+    if (photo.path.startsWith('http')) {
+        return undefined;
+    }
+    const sizes = { original: photoUrl(photo, 'original') };
+    Object.keys(config.photoSizes).forEach(size => {
+        sizes[size] = photoUrl(photo, size);
+    });
+    return sizes;
+};
+
+// Photo as returned by the API
+const photoView = (photo) => ({
+    id: photo.id,
+    filename: photo.filename,
+    url: photoUrl(photo),
+    sizes: photoSizes(photo)
+});
+
+const getPhotoStats = () => ({ ...stats, queued: queue.length, processing: running });
+
+module.exports = {
+    storeUploads,
+    enqueue,
+    resumePending,
+    resolvePhoto,
+    photoUrl,
+    photoView,
+    getPhotoStats
+};
@@ -0,0 +1,106 @@
+const crypto = require('crypto');
+const config = require('./config');
+
+// In-process cache of serialized JSON responses for public listing reads.
+// Entries are keyed by the full request URL (path + query string), served with
+// a strong ETag, and dropped whenever listings change (submit, delete,
+// expiration job). A short TTL also bounds staleness for listings that pass
+// their expirationDate between expiration runs.
+const entries = new Map();
+const listeners = [];
+
+const stats = {
+    hits: 0,
+    misses: 0,
+    notModified: 0,
+    invalidations: 0
+};
+
+const makeEtag = (body) => `"${crypto.createHash('sha1').update(body).digest('base64url')}"`;
+
+// True if the request's If-None-Match already names this ETag
+const isFresh = (req, etag) => {
+    const header = req.headers['if-none-match'];
+    if (!header) {
+        return false;
+    }
+    return header.trim() === '*' || header.split(',').some(tag => tag.trim() === etag);
+};
+
+const sendEntry = (req, res, entry) => {
+    res.set('ETag', entry.etag);
+    res.set('Cache-Control', 'no-cache');
+    if (isFresh(req, entry.etag)) {
+        stats.notModified++;
+        return res.status(304).end();
+    }
+    res.type('application/json').send(entry.body);
+};
+
+const store = (key, body) => {
+    // Map keeps insertion order, so the first key is the least recently used
+    if (entries.size >= config.responseCache.maxEntries) {
+        entries.delete(entries.keys().next().value);
+    }
+    const entry = { body, etag: makeEtag(body), expiresAt: Date.now() + config.responseCache.ttlSeconds * 1000 };
+    entries.set(key, entry);
+    return entry;
+};
+
+// Middleware: serve GETs from the cache, or capture the route's 200 JSON response
+const cacheResponse = (req, res, next) => {
+    if (!config.responseCache.enabled || req.method !== 'GET') {
+        return next();
+    }
+    
+    const key = req.originalUrl;
+    const cached = entries.get(key);
+    if (cached && cached.expiresAt > Date.now()) {
+        stats.hits++;
+        entries.delete(key);
+        entries.set(key, cached);
+        return sendEntry(req, res, cached);
+    }
+    
+    stats.misses++;
+    entries.delete(key);
+    res.json = (payload) => {
+        const body = JSON.stringify(payload);
+        if (res.statusCode !== 200) {
+            return res.type('application/json').send(body);
+        }
+        return sendEntry(req, res, store(key, body));
+    };
+    next();
+};
+
+// Drop every cached response (any listing change can affect every page)
+const invalidate = (reason) => {
+    if (entries.size > 0) {
+        console.log(`🧹 Response cache cleared (${entries.size} entries): ${reason}`);
+    }
+    entries.clear();
+    stats.invalidations++;
+    listeners.forEach(listener => listener(reason));
+};
+
+// Call listener(reason) after every invalidation (e.g. to regenerate feed-export.js files)
+const onInvalidate = (listener) => {
+    listeners.push(listener);
+};
+
+const getCacheStats = () => {
+    const lookups = stats.hits + stats.misses;
+    return {
+        ...stats,
+        entries: entries.size,
+        hitRate: lookups > 0 ? Number((stats.hits / lookups).toFixed(3)) : 0
+    };
+};
+
+module.exports = {
+    cacheResponse,
+    invalidate,
+    onInvalidate,
+    getCacheStats
+};
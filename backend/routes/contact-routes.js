@@ -1,11 +1,11 @@
 const express = require('express');
-const { sendContactEmail } = require('../email-service');
+const { queueContactEmail } = require('../email-outbox');
 const config = require('../config');
 
 const router = express.Router();
 
 // Submit contact form
-router.post('/submit', async (req, res) => {
+router.post('/submit', (req, res) => {
     try {
         const { name, email, phone, interest, message } = req.body;
         
@@ -39,13 +39,9 @@ router.post('/submit', async (req, res) => {
         // Send email to admin only if email credentials are configured
         const hasEmailConfig = (config.email.user && config.email.password) || config.email.sendgridApiKey;
         if (hasEmailConfig) {
-            try {
-                await sendContactEmail(contactData);
-                console.log(`✅ Contact email sent to ${config.adminEmail}`);
-            } catch (emailError) {
-                console.error('Failed to send contact email:', emailError.message);
-                // Continue anyway - don't fail the submission
-            }
+            // Delivered (with retries) by the outbox worker
+            queueContactEmail(contactData);
+            console.log(`📬 Contact email queued for ${config.adminEmail}`);
         } else {
             console.log('⚠️ Email not configured - contact form data logged only');
             console.log('Contact submission:', contactData);
@@ -2,10 +2,15 @@ const express = require('express');
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
-const { statements } = require('../database');
-const { sendConfirmationEmail, sendAdminNotification } = require('../email-service');
+const { db, statements, listingFilters, listingColumns, summaryColumns, findActiveListings, searchListings, findListingsInBox } = require('../database');
+const { geocodeListing, geocodeZip, distanceMiles, boundingBox } = require('../geocoder');
+const { queueConfirmationEmail, queueAdminNotification, queueInquiryToSeller } = require('../email-outbox');
 const config = require('../config');
 const { extractListing } = require('../extraction-service');
+const { cacheResponse, invalidate } = require('../response-cache');
+const { scheduleExport } = require('../feed-export');
+const photoPipeline = require('../photo-pipeline');
+const { photoUrl, photoView } = photoPipeline;
 
 const router = express.Router();
 
@@ -67,7 +72,9 @@ router.post('/extract', async (req, res) => {
             res.json({
                 success: true,
                 source: result.source,
-                data: result.data
+                data: result.data,
+                cached: Boolean(result.cached),
+                timings: result.timings
             });
         } else {
             res.status(500).json({
@@ -85,6 +92,118 @@ router.post('/extract', async (req, res) => {
     }
 });
 
+// Validate listing fields, returns an error message or null
+const validateListing = (data) => {
+    if (!data.firstName || !data.lastName || !data.email || !data.phone || 
+        !data.address || !data.city || !data.zip || !data.propertyType ||
+        !data.price || !data.sqft || !data.description) {
+        return 'Missing required fields';
+    }
+    
+    // For non-commercial properties, bedrooms and bathrooms are required
+    if (data.propertyType !== 'Commercial' && (!data.bedrooms || !data.bathrooms)) {
+        return 'Bedrooms and bathrooms are required for residential properties';
+    }
+    
+    return null;
+};
+
+// Calculate submission and expiration dates for a new listing
+const listingDates = () => {
+    const submissionDate = new Date();
+    const expirationDate = new Date(submissionDate);
+    expirationDate.setDate(expirationDate.getDate() + config.listingDurationDays);
+    return { submissionDate, expirationDate };
+};
+
+// Insert a listing and its photos, returns the new listing ID
+const insertListingWithPhotos = (data, files, { submissionDate, expirationDate }) => {
+    const point = geocodeListing(data);
+    const result = statements.insertListing.run(
+        data.firstName,
+        data.lastName,
+        data.email,
+        data.phone,
+        data.address,
+        data.city,
+        data.state || 'WA',
+        data.zip,
+        data.propertyType,
+        parseInt(data.price),
+        parseInt(data.sqft),
+        data.bedrooms ? parseInt(data.bedrooms) : null,
+        data.bathrooms ? parseFloat(data.bathrooms) : null,
+        data.yearBuilt ? parseInt(data.yearBuilt) : null,
+        data.lotSize ? parseFloat(data.lotSize) : null,
+        data.features || '',
+        data.description,
+        data.privateContact === true || data.privateContact === 'true' || data.privateContact === 'on' ? 1 : 0,
+        submissionDate.toISOString(),
+        expirationDate.toISOString(),
+        data.buildingClass || null,
+        data.zoning || null,
+        data.occupancyRate ? parseFloat(data.occupancyRate) : null,
+        data.capRate ? parseFloat(data.capRate) : null,
+        data.grossIncome ? parseInt(data.grossIncome) : null,
+        data.operatingExpenses ? parseInt(data.operatingExpenses) : null,
+        data.numberOfUnits ? parseInt(data.numberOfUnits) : null,
+        data.parkingSpaces ? parseInt(data.parkingSpaces) : null,
+        data.leaseType || null,
+        data.mlsNumber || null,
+        data.externalUrl || null,
+        data.listingSource || 'fsbo',
+        point ? point.lat : null,
+        point ? point.lon : null
+    );
+    
+    const listingId = result.lastInsertRowid;
+    
+    // Insert uploaded photos
+    files.forEach((file, index) => {
+        statements.insertPhoto.run(
+            listingId,
+            file.filename,
+            file.originalname,
+            file.path,
+            file.size,
+            file.mimetype,
+            index,
+            file.contentHash || null
+        );
+    });
+    
+    // Insert extracted photo URLs (from listing extraction)
+    if (data.photoUrls) {
+        try {
+            const photoUrls = Array.isArray(data.photoUrls) ? data.photoUrls : JSON.parse(data.photoUrls);
+            photoUrls.forEach((url, index) => {
+                // For URL-based photos, store URL as the path
+                statements.insertPhoto.run(
+                    listingId,
+                    `extracted-${index}.jpg`, // Placeholder filename
+                    `Extracted Photo ${index + 1}`, // Original name
+                    url, // Store URL as path
+                    0, // Size unknown
+                    'image/jpeg', // Default mime type
+                    files.length + index, // Order after uploaded files
+                    null // Not stored locally, so no content hash
+                );
+            });
+        } catch (e) {
+            console.error('Error parsing photoUrls:', e);
+        }
+    }
+    
+    return listingId;
+};
+
+// Queue confirmation and admin emails for a new listing (sent by the outbox worker)
+const notifyNewListing = (listingId) => {
+    const listing = statements.getListingById.get(listingId);
+    queueConfirmationEmail(listing);
+    queueAdminNotification(listing);
+};
+
 // Submit new FSBO listing
 router.post('/submit', upload.array('photos', config.maxFiles), async (req, res) => {
     try {
@@ -92,120 +211,39 @@ router.post('/submit', upload.array('photos', config.maxFiles), async (req, res)
         const files = req.files || [];
         
         // Validate required fields
-        const isCommercial = data.propertyType === 'Commercial';
-        
-        if (!data.firstName || !data.lastName || !data.email || !data.phone || 
-            !data.address || !data.city || !data.zip || !data.propertyType ||
-            !data.price || !data.sqft || !data.description) {
-            return res.status(400).json({ error: 'Missing required fields' });
-        }
-        
-        // For non-commercial properties, bedrooms and bathrooms are required
-        if (!isCommercial && (!data.bedrooms || !data.bathrooms)) {
-            return res.status(400).json({ error: 'Bedrooms and bathrooms are required for residential properties' });
-        }
-        
-        // Calculate dates
-        const submissionDate = new Date();
-        const expirationDate = new Date(submissionDate);
-        expirationDate.setDate(expirationDate.getDate() + config.listingDurationDays);
-        
-        // Insert listing
-        const result = statements.insertListing.run(
-            data.firstName,
-            data.lastName,
-            data.email,
-            data.phone,
-            data.address,
-            data.city,
-            data.state || 'WA',
-            data.zip,
-            data.propertyType,
-            parseInt(data.price),
-            parseInt(data.sqft),
-            data.bedrooms ? parseInt(data.bedrooms) : null,
-            data.bathrooms ? parseFloat(data.bathrooms) : null,
-            data.yearBuilt ? parseInt(data.yearBuilt) : null,
-            data.lotSize ? parseFloat(data.lotSize) : null,
-            data.features || '',
-            data.description,
-            data.privateContact === 'true' || data.privateContact === 'on' ? 1 : 0,
-            submissionDate.toISOString(),
-            expirationDate.toISOString(),
-            data.buildingClass || null,
-            data.zoning || null,
-            data.occupancyRate ? parseFloat(data.occupancyRate) : null,
-            data.capRate ? parseFloat(data.capRate) : null,
-            data.grossIncome ? parseInt(data.grossIncome) : null,
-            data.operatingExpenses ? parseInt(data.operatingExpenses) : null,
-            data.numberOfUnits ? parseInt(data.numberOfUnits) : null,
-            data.parkingSpaces ? parseInt(data.parkingSpaces) : null,
-            data.leaseType || null,
-            data.mlsNumber || null,
-            data.externalUrl || null,
-            data.listingSource || 'fsbo'
-        );
-        
-        const listingId = result.lastInsertRowid;
-        
-        // Insert uploaded photos
-        if (files.length > 0) {
-            files.forEach((file, index) => {
-                statements.insertPhoto.run(
-                    listingId,
-                    file.filename,
-                    file.originalname,
-                    file.path,
-                    file.size,
-                    file.mimetype,
-                    index
-                );
-            });
+        const validationError = validateListing(data);
+        if (validationError) {
+            return res.status(400).json({ error: validationError });
         }
         
-        // Insert extracted photo URLs (from listing extraction)
-        if (data.photoUrls) {
-            try {
-                const photoUrls = JSON.parse(data.photoUrls);
-                photoUrls.forEach((url, index) => {
-                    // For URL-based photos, store URL as the path
-                    statements.insertPhoto.run(
-                        listingId,
-                        `extracted-${index}.jpg`, // Placeholder filename
-                        `Extracted Photo ${index + 1}`, // Original name
-                        url, // Store URL as path
-                        0, // Size unknown
-                        'image/jpeg', // Default mime type
-                        files.length + index // Order after uploaded files
-                    );
-                });
-            } catch (e) {
-                console.error('Error parsing photoUrls:', e);
-            }
-        }
+        // Content-address the uploads (identical photos are stored once)
+        const storedFiles = await photoPipeline.storeUploads(files);
         
-        // Get complete listing data
-        const listing = statements.getListingById.get(listingId);
+        const dates = listingDates();
+        const listingId = insertListingWithPhotos(data, storedFiles, dates);
+        invalidate(`listing ${listingId} submitted`);
         
-        // Send emails (don't wait for them)
-        sendConfirmationEmail(listing).catch(err => console.error('Email error:', err));
-        sendAdminNotification(listing).catch(err => console.error('Admin email error:', err));
+        // Resize in the background; /photo serves the original until then
+        storedFiles.forEach(file => photoPipeline.enqueue(file));
+        
+        notifyNewListing(listingId);
         
         res.json({
             success: true,
             message: 'Listing submitted successfully',
             listingId: listingId,
-            expirationDate: expirationDate.toISOString()
+            expirationDate: dates.expirationDate.toISOString()
         });
         
     } catch (error) {
         console.error('Error submitting listing:', error);
         
-        // Clean up uploaded files on error
+        // Clean up uploaded files on error (already-stored files may be shared, so
+        // only the temporary upload names are removed)
         if (req.files) {
             req.files.forEach(file => {
                 fs.unlink(file.path, err => {
-                    if (err) console.error('Error deleting file:', err);
+                    if (err && err.code !== 'ENOENT') console.error('Error deleting file:', err);
                 });
             });
         }
@@ -214,37 +252,212 @@ router.post('/submit', upload.array('photos', config.maxFiles), async (req, res)
     }
 });
 
-// Get all active listings
-router.get('/listings', (req, res) => {
+// Submit many listings (JSON only, photos as photoUrls) in a single transaction
+router.post('/submit-batch', (req, res) => {
+    try {
+        const { listings } = req.body;
+        
+        if (!Array.isArray(listings) || listings.length === 0) {
+            return res.status(400).json({ error: 'listings must be a non-empty array' });
+        }
+        
+        if (listings.length > config.maxBatchSize) {
+            return res.status(400).json({ error: `A batch can contain at most ${config.maxBatchSize} listings` });
+        }
+        
+        const dates = listingDates();
+        
+        // Each item runs in its own savepoint so one bad row doesn't undo the others
+        const insertOne = db.transaction((data) => insertListingWithPhotos(data, [], dates));
+        const insertAll = db.transaction((items) => items.map((data, index) => {
+            const validationError = validateListing(data || {});
+            if (validationError) {
+                return { index, success: false, error: validationError };
+            }
+            try {
+                return { index, success: true, listingId: insertOne(data) };
+            } catch (error) {
+                return { index, success: false, error: error.message };
+            }
+        }));
+        
+        const results = insertAll(listings);
+        invalidate('batch submitted');
+        
+        // One commit for the whole batch's outbox rows
+        db.transaction(() => {
+            results.filter(result => result.success).forEach(result => notifyNewListing(result.listingId));
+        })();
+        
+        const created = results.filter(result => result.success).length;
+        res.json({
+            success: created > 0,
+            created: created,
+            failed: results.length - created,
+            expirationDate: dates.expirationDate.toISOString(),
+            results: results
+        });
+    } catch (error) {
+        console.error('Error submitting listing batch:', error);
+        res.status(500).json({ error: 'Failed to submit listings', details: error.message });
+    }
+});
+
+// Fields of a listing_summaries row as returned by the API (first photo as `photo`)
+const summaryFields = [...summaryColumns.filter(col => col !== 'photoPath' && col !== 'photoFilename'), 'photo'];
+
+const summaryView = ({ photoPath, photoFilename, ...summary }) => ({
+    ...summary,
+    photo: photoPath ? photoUrl({ path: photoPath, filename: photoFilename }) : null
+});
+
+// Load photos for many listings in one query, grouped by listing ID
+const getPhotosForListings = (listings) => {
+    const photosByListing = new Map(listings.map(listing => [listing.id, []]));
+    if (listings.length === 0) {
+        return photosByListing;
+    }
+    
+    const ids = JSON.stringify(listings.map(listing => listing.id));
+    statements.getPhotosByListingIds.all(ids).forEach(photo => {
+        photosByListing.get(photo.listingId).push(photoView(photo));
+    });
+    return photosByListing;
+};
+
+// Pagination cursor: base64url JSON of [createdAt, id] of the last listing on a page
+const encodeCursor = (listing) => Buffer.from(JSON.stringify([listing.createdAt, listing.id])).toString('base64url');
+
+const decodeCursor = (cursor) => {
+    try {
+        const [createdAt, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString());
+        if (typeof createdAt === 'string' && Number.isInteger(id)) {
+            return { createdAt, id };
+        }
+    } catch (e) {
+        // Fall through to invalid cursor
+    }
+    return null;
+};
+
+const numericFilters = ['minPrice', 'maxPrice', 'beds'];
+
+// Parse the structured filters shared by /listings and /search
+const parseListingFilters = (query) => {
+    const filters = {};
+    for (const name of Object.keys(listingFilters)) {
+        const value = query[name];
+        if (value === undefined || value === '') {
+            continue;
+        }
+        if (numericFilters.includes(name)) {
+            if (!/^\d+$/.test(value)) {
+                return { error: `${name} must be a whole number` };
+            }
+            filters[name] = parseInt(value);
+        } else {
+            filters[name] = String(value);
+        }
+    }
+    return { filters };
+};
+
+// Parse ?limit, ?cursor, filters, ?view and ?fields; returns { error } on bad input
+const parseListingsQuery = (query) => {
+    const limit = query.limit === undefined ? config.listingsPageSize : Number(query.limit);
+    if (!Number.isInteger(limit) || limit < 1 || limit > config.maxListingsPageSize) {
+        return { error: `limit must be an integer between 1 and ${config.maxListingsPageSize}` };
+    }
+    
+    let after = null;
+    if (query.cursor) {
+        after = decodeCursor(query.cursor);
+        if (!after) {
+            return { error: 'Invalid cursor' };
+        }
+    }
+    
+    const { error, filters } = parseListingFilters(query);
+    if (error) {
+        return { error };
+    }
+    
+    // view=summary: compact rows from listing_summaries
+    if (query.view !== undefined && query.view !== 'summary') {
+        return { error: 'view must be "summary"' };
+    }
+    const summaryRequested = query.view === 'summary';
+    
+    // fields=: listing columns plus "photos" (summary fields with view=summary); id is always returned
+    let fields = null;
+    if (query.fields) {
+        fields = String(query.fields).split(',').map(field => field.trim()).filter(Boolean);
+        const allowed = summaryRequested ? summaryFields : [...listingColumns, 'photos'];
+        const unknown = fields.filter(field => !allowed.includes(field));
+        if (unknown.length > 0) {
+            return { error: `Unknown field(s): ${unknown.join(', ')}` };
+        }
+        fields = [...new Set(['id', ...fields])];
+    }
+    
+    // Projections the summary table covers are served from it too
+    const summary = summaryRequested || (fields !== null && fields.every(field => summaryColumns.includes(field)));
+    
+    return { limit, after, filters, fields, summary };
+};
+
+// Get active listings, newest first, one page at a time
+// Query: ?limit=&cursor=&city=&zip=&minPrice=&maxPrice=&beds=&propertyType=&source=&fields=&view=summary
+router.get('/listings', cacheResponse, (req, res) => {
     try {
-        const { source } = req.query;
+        const { error, limit, after, filters, fields, summary } = parseListingsQuery(req.query);
+        if (error) {
+            return res.status(400).json({ success: false, error });
+        }
+        
+        // createdAt/id drive the cursor and privateContact the contact masking,
+        // so select them even when the client didn't ask for them
+        let columns = listingColumns;
+        if (summary) {
+            columns = summaryColumns;
+        } else if (fields) {
+            columns = [...new Set([...fields.filter(field => field !== 'photos'), 'createdAt', 'privateContact'])];
+        }
         
-        // Get listings filtered by source if provided
-        const listings = source 
-            ? statements.getActiveListingsBySource.all(source, source)
-            : statements.getActiveListings.all();
+        // Fetch one extra row to know whether there is a next page
+        const rows = findActiveListings({ filters, columns, after, limit: limit + 1, summary });
+        const listings = rows.slice(0, limit);
+        const nextCursor = rows.length > limit ? encodeCursor(listings[listings.length - 1]) : null;
         
-        // Attach photos to each listing
-        const listingsWithPhotos = listings.map(listing => {
-            const photos = statements.getPhotosByListingId.all(listing.id);
-            return {
+        // Attach photos (single query for the whole page) unless projected away
+        const includePhotos = !summary && (!fields || fields.includes('photos'));
+        const photosByListing = includePhotos ? getPhotosForListings(listings) : null;
+        
+        const page = listings.map(listing => {
+            if (summary) {
+                const result = summaryView(listing);
+                return fields ? Object.fromEntries(fields.map(field => [field, result[field]])) : result;
+            }
+            const result = {
                 ...listing,
-                photos: photos.map(photo => ({
-                    id: photo.id,
-                    filename: photo.filename,
-                    // If path is a URL (extracted photo), use it directly; otherwise use local endpoint
-                    url: photo.path.startsWith('http') ? photo.path : `/api/fsbo/photo/${photo.filename}`
-                })),
                 // Hide contact info if private
                 email: listing.privateContact ? null : listing.email,
                 phone: listing.privateContact ? null : listing.phone
             };
+            if (includePhotos) {
+                result.photos = photosByListing.get(listing.id);
+            }
+            if (!fields) {
+                return result;
+            }
+            return Object.fromEntries(fields.map(field => [field, result[field]]));
         });
         
         res.json({
             success: true,
-            count: listingsWithPhotos.length,
-            listings: listingsWithPhotos
+            count: page.length,
+            listings: page,
+            nextCursor
         });
     } catch (error) {
         console.error('Error fetching listings:', error);
@@ -252,8 +465,115 @@ router.get('/listings', (req, res) => {
     }
 });
 
+// Turn free text into a safe FTS5 query: every word must match, the last one
+// as a prefix (so "hardwood gar" finds "garage"). FTS5 operators are not exposed.
+const toFtsQuery = (text) => {
+    const words = (String(text).match(/[\p{L}\p{N}]+/gu) || []).slice(0, 12);
+    if (words.length === 0) {
+        return null;
+    }
+    return words.map((word, index) => `"${word}"${index === words.length - 1 ? '*' : ''}`).join(' ');
+};
+
+// Ranked keyword search across active listings and extracted listings
+// Query: ?q=&limit=&offset= plus the /listings filters (source may also be "extracted")
+router.get('/search', (req, res) => {
+    try {
+        const match = toFtsQuery(req.query.q || '');
+        if (!match) {
+            return res.status(400).json({ success: false, error: 'q (search text) is required' });
+        }
+        
+        const { error, filters } = parseListingFilters(req.query);
+        if (error) {
+            return res.status(400).json({ success: false, error });
+        }
+        
+        const limit = req.query.limit === undefined ? config.searchPageSize : Number(req.query.limit);
+        const offset = req.query.offset === undefined ? 0 : Number(req.query.offset);
+        if (!Number.isInteger(limit) || limit < 1 || limit > config.maxListingsPageSize) {
+            return res.status(400).json({ success: false, error: `limit must be an integer between 1 and ${config.maxListingsPageSize}` });
+        }
+        if (!Number.isInteger(offset) || offset < 0) {
+            return res.status(400).json({ success: false, error: 'offset must be a non-negative integer' });
+        }
+        
+        const results = searchListings({ match, filters, limit, offset });
+        
+        res.json({
+            success: true,
+            query: req.query.q,
+            count: results.length,
+            results: results
+        });
+    } catch (error) {
+        console.error('Error searching listings:', error);
+        res.status(500).json({ error: 'Failed to search listings' });
+    }
+});
+
+// Listings near a point or inside a box, nearest first
+// Query: ?lat=&lon=&radius= (miles) | ?zip=&radius= | ?bbox=minLon,minLat,maxLon,maxLat
+//        plus the /listings filters (source may also be "extracted") and ?limit=
+router.get('/nearby', (req, res) => {
+    try {
+        const { error, filters } = parseListingFilters(req.query);
+        if (error) {
+            return res.status(400).json({ success: false, error });
+        }
+        
+        const limit = req.query.limit === undefined ? config.listingsPageSize : Number(req.query.limit);
+        if (!Number.isInteger(limit) || limit < 1 || limit > config.maxListingsPageSize) {
+            return res.status(400).json({ success: false, error: `limit must be an integer between 1 and ${config.maxListingsPageSize}` });
+        }
+        
+        let center, box, radius = null;
+        if (req.query.bbox) {
+            const [minLon, minLat, maxLon, maxLat] = String(req.query.bbox).split(',').map(Number);
+            if (![minLon, minLat, maxLon, maxLat].every(Number.isFinite) || minLon > maxLon || minLat > maxLat) {
+                return res.status(400).json({ success: false, error: 'bbox must be minLon,minLat,maxLon,maxLat' });
+            }
+            box = { minLat, maxLat, minLon, maxLon };
+            center = { lat: (minLat + maxLat) / 2, lon: (minLon + maxLon) / 2 };
+        } else {
+            center = req.query.zip
+                ? geocodeZip(String(req.query.zip))
+                : { lat: Number(req.query.lat), lon: Number(req.query.lon) };
+            if (!center) {
+                return res.status(400).json({ success: false, error: `Unknown ZIP code: ${req.query.zip}` });
+            }
+            if (!Number.isFinite(center.lat) || !Number.isFinite(center.lon)) {
+                return res.status(400).json({ success: false, error: 'lat and lon (or zip, or bbox) are required' });
+            }
+            radius = req.query.radius === undefined ? 5 : Number(req.query.radius);
+            if (!(radius > 0 && radius <= config.maxNearbyRadiusMiles)) {
+                return res.status(400).json({ success: false, error: `radius must be between 0 and ${config.maxNearbyRadiusMiles} miles` });
+            }
+            box = boundingBox(center.lat, center.lon, radius);
+        }
+        
+        // The R-tree returns everything in the box; trim the corners to the circle
+        const results = findListingsInBox(box, filters)
+            .map(row => ({ ...row, distanceMiles: Number(distanceMiles(center.lat, center.lon, row.lat, row.lon).toFixed(2)) }))
+            .filter(row => radius === null || row.distanceMiles <= radius)
+            .sort((a, b) => a.distanceMiles - b.distanceMiles);
+        
+        res.json({
+            success: true,
+            center: center,
+            radiusMiles: radius,
+            total: results.length,
+            count: Math.min(results.length, limit),
+            results: results.slice(0, limit)
+        });
+    } catch (error) {
+        console.error('Error finding nearby listings:', error);
+        res.status(500).json({ error: 'Failed to find nearby listings' });
+    }
+});
+
 // Get single listing by ID
-router.get('/listing/:id', (req, res) => {
+router.get('/listing/:id', cacheResponse, (req, res) => {
     try {
         const listing = statements.getListingById.get(req.params.id);
         
@@ -271,12 +591,7 @@ router.get('/listing/:id', (req, res) => {
             success: true,
             listing: {
                 ...listing,
-                photos: photos.map(photo => ({
-                    id: photo.id,
-                    filename: photo.filename,
-                    // If path is a URL (extracted photo), use it directly; otherwise use local endpoint
-                    url: photo.path.startsWith('http') ? photo.path : `/api/fsbo/photo/${photo.filename}`
-                })),
+                photos: photos.map(photoView),
                 // Hide contact info if private
                 email: listing.privateContact ? null : listing.email,
                 phone: listing.privateContact ? null : listing.phone
@@ -288,25 +603,28 @@ router.get('/listing/:id', (req, res) => {
     }
 });
 
-// Serve photo files
+// Serve photo files: ?size=thumb|card|large picks a resized variant when ready
 router.get('/photo/:filename', (req, res) => {
-    const filename = req.params.filename;
-    const filepath = path.join(config.uploadDir, filename);
-    
-    // Security: prevent directory traversal
-    if (filename.includes('..') || filename.includes('/') || filename.includes('\\')) {
+    // Rejects directory traversal
+    const photo = photoPipeline.resolvePhoto(req.params.filename, req.query.size);
+    if (!photo) {
         return res.status(400).json({ error: 'Invalid filename' });
     }
     
-    res.sendFile(path.resolve(filepath), (err) => {
-        if (err) {
+    // Content-addressed files never change, so caches may keep them forever.
+    // The original stands in for a missing variant, so don't pin that answer.
+    const immutable = photo.immutable && (photo.size !== 'original' || !req.query.size);
+    res.set('X-Photo-Size', photo.size);
+    const cacheOptions = immutable ? { maxAge: '365d', immutable: true } : { maxAge: '1h' };
+    res.sendFile(path.resolve(photo.filePath), cacheOptions, (err) => {
+        if (err && !res.headersSent) {
             res.status(404).json({ error: 'Photo not found' });
         }
     });
 });
 
 // Contact seller (for private listings)
-router.post('/contact/:listingId', async (req, res) => {
+router.post('/contact/:listingId', (req, res) => {
     try {
         const { name, email, phone, message } = req.body;
         const listing = statements.getListingById.get(req.params.listingId);
@@ -315,9 +633,12 @@ router.post('/contact/:listingId', async (req, res) => {
             return res.status(404).json({ error: 'Listing not found' });
         }
         
-        // Forward inquiry to seller
-        const { sendInquiryToSeller } = require('../email-service');
-        await sendInquiryToSeller(listing, { name, email, phone, message });
+        if (!email || !message) {
+            return res.status(400).json({ error: 'Email and message are required' });
+        }
+        
+        // Forward inquiry to seller (delivered by the outbox worker)
+        queueInquiryToSeller(listing, { name, email, phone, message });
         
         res.json({ success: true, message: 'Your inquiry has been sent to the seller' });
     } catch (error) {
@@ -341,18 +662,12 @@ router.get('/admin/listings', adminAuth, (req, res) => {
     try {
         const listings = statements.getAllListings.all();
         
-        // Get photos for each listing
-        const listingsWithPhotos = listings.map(listing => {
-            const photos = statements.getPhotosByListingId.all(listing.id);
-            return {
-                ...listing,
-                photos: photos.map(photo => ({
-                    id: photo.id,
-                    filename: photo.filename,
-                    url: photo.path.startsWith('http') ? photo.path : `/api/fsbo/photo/${photo.filename}`
-                }))
-            };
-        });
+        // Get photos for all listings in one query
+        const photosByListing = getPhotosForListings(listings);
+        const listingsWithPhotos = listings.map(listing => ({
+            ...listing,
+            photos: photosByListing.get(listing.id)
+        }));
         
         res.json({ success: true, listings: listingsWithPhotos });
     } catch (error) {
@@ -361,6 +676,82 @@ router.get('/admin/listings', adminAuth, (req, res) => {
     }
 });
 
+// Map one extract_listings.py record onto the extracted_listings columns
+const toExtractedRow = (item) => {
+    const number = (value, parse) => {
+        const parsed = parse(String(value ?? '').replace(/[$,]/g, ''));
+        return Number.isFinite(parsed) ? parsed : null;
+    };
+    const images = item.images || item.photoUrls || [];
+    const lat = number(item.lat, parseFloat);
+    const lon = number(item.lon, parseFloat);
+    const point = lat !== null && lon !== null ? { lat, lon } : geocodeListing(item);
+    return {
+        sourceUrl: item.sourceUrl || item.externalUrl,
+        source: item.source || null,
+        address: item.address || null,
+        city: item.city || null,
+        state: item.state || null,
+        zip: item.zip || item.zipCode || null,
+        propertyType: item.propertyType || null,
+        price: number(item.price, parseInt),
+        sqft: number(item.sqft, parseInt),
+        bedrooms: number(item.bedrooms, parseInt),
+        bathrooms: number(item.bathrooms, parseFloat),
+        features: Array.isArray(item.features) ? item.features.join(', ') : (item.features || null),
+        description: item.description || null,
+        mlsNumber: item.mlsNumber || item.mls || null,
+        images: JSON.stringify(Array.isArray(images) ? images : JSON.parse(images)),
+        status: String(item.status || 'active').toLowerCase(),
+        extractedAt: item.extractedAt || null,
+        lat: point ? point.lat : null,
+        lon: point ? point.lon : null
+    };
+};
+
+// Admin: Import extract_listings.py output into the search index (upsert on sourceUrl)
+router.post('/admin/extracted-listings', adminAuth, (req, res) => {
+    try {
+        const { listings } = req.body;
+        
+        if (!Array.isArray(listings) || listings.length === 0) {
+            return res.status(400).json({ error: 'listings must be a non-empty array' });
+        }
+        
+        if (listings.length > config.maxBatchSize) {
+            return res.status(400).json({ error: `A batch can contain at most ${config.maxBatchSize} listings` });
+        }
+        
+        const importAll = db.transaction((items) => items.map((item, index) => {
+            if (!item || !(item.sourceUrl || item.externalUrl)) {
+                return { index, success: false, error: 'sourceUrl is required' };
+            }
+            try {
+                statements.upsertExtractedListing.run(toExtractedRow(item));
+                return { index, success: true };
+            } catch (error) {
+                return { index, success: false, error: error.message };
+            }
+        }));
+        
+        const results = importAll(listings);
+        const imported = results.filter(result => result.success).length;
+        if (imported > 0) {
+            scheduleExport(`${imported} extracted listing(s) imported`);
+        }
+        
+        res.json({
+            success: imported > 0,
+            imported: imported,
+            failed: results.length - imported,
+            errors: results.filter(result => !result.success)
+        });
+    } catch (error) {
+        console.error('Error importing extracted listings:', error);
+        res.status(500).json({ error: 'Failed to import extracted listings', details: error.message });
+    }
+});
+
 // Admin: Remove a listing (soft delete)
 router.delete('/listing/:id', adminAuth, (req, res) => {
     try {
@@ -374,6 +765,7 @@ router.delete('/listing/:id', adminAuth, (req, res) => {
         
         // Soft delete: update status to 'removed'
         statements.updateListingStatus.run('removed', id);
+        invalidate(`listing ${id} removed`);
         
         res.json({ success: true, message: 'Listing removed successfully' });
     } catch (error) {
@@ -0,0 +1,198 @@
+// Query-shape audit: seeds a throwaway database with listings, then runs
+// EXPLAIN QUERY PLAN and times every hot statement (listing pages, photo
+// lookups, cron jobs, email outbox). Exits with 1 if a statement scans a whole
+// table or sorts through a temp b-tree without an allowance below, so an index
+// change that sends a query back to a full scan fails here first.
+//
+// Usage (from backend/):
+//   node scripts/check-query-plans.js                      # 100,000 listings
+//   node scripts/check-query-plans.js --listings 20000
+//   node scripts/check-query-plans.js --db data/fsbo.db    # Plans only, against an existing database
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const argValue = (name, fallback) => {
+    const index = process.argv.indexOf(name);
+    return index === -1 ? fallback : process.argv[index + 1];
+};
+
+const existingDb = argValue('--db');
+const listingCount = parseInt(argValue('--listings', '100000'));
+const tempDir = existingDb ? null : fs.mkdtempSync(path.join(os.tmpdir(), 'vdi-query-plans-'));
+
+// database.js opens config.dbPath as soon as it is required
+process.env.DB_PATH = existingDb ? path.resolve(existingDb) : path.join(tempDir, 'fsbo.db');
+if (tempDir) {
+    process.env.UPLOAD_DIR = path.join(tempDir, 'uploads');
+}
+
+const config = require('../config');
+const { db, statements, summaryColumns, activeListingsQuery } = require('../database');
+
+// Table scans without an index; walking an index in ORDER BY order is fine (it stops at LIMIT)
+const FULL_SCAN = /^SCAN (listings|listing_summaries|photos|extracted_listings|email_outbox|extraction_cache)\b(?! USING (COVERING )?INDEX)/;
+const TEMP_SORT = /USE TEMP B-TREE/;
+const CITIES = [['Seattle', '98101'], ['Bellevue', '98004'], ['Kirkland', '98033'], ['Redmond', '98052'], ['Bothell', '98011']];
+const DAY = 24 * 60 * 60 * 1000;
+
+const sqliteTimestamp = (date) => date.toISOString().replace('T', ' ').slice(0, 19);
+
+// Listings spread over the last 90 days: mostly active, some expiring soon,
+// some already past their expiration date, a few removed
+const seed = (count) => {
+    const insertListing = db.prepare(`
+        INSERT INTO listings (
+            firstName, lastName, email, phone, address, city, state, zip, propertyType,
+            price, sqft, bedrooms, bathrooms, description, privateContact, submissionDate,
+            expirationDate, status, reminderSent, listingSource, createdAt
+        ) VALUES (?, ?, ?, ?, ?, ?, 'WA', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    `);
+    const insertPhoto = db.prepare(`
+        INSERT INTO photos (listingId, filename, path, displayOrder, contentHash, variants)
+        VALUES (?, ?, ?, ?, ?, ?)
+    `);
+    const insertEmail = db.prepare(`
+        INSERT INTO email_outbox (kind, listingId, recipient, message, status, createdAt, nextAttemptAt, sentAt)
+        VALUES ('confirmation', ?, ?, '{}', ?, ?, ?, ?)
+    `);
+
+    const now = Date.now();
+    db.transaction(() => {
+        for (let i = 0; i < count; i++) {
+            const [city, zip] = CITIES[i % CITIES.length];
+            const created = new Date(now - (count - i) * (90 * DAY / count));
+            const expires = new Date(created.getTime() + config.listingDurationDays * DAY);
+            const status = i % 50 === 0 ? 'removed' : (expires.getTime() < now && i % 3 === 0 ? 'expired' : 'active');
+            const { lastInsertRowid: id } = insertListing.run(
+                'Seed', `Seller${i}`, `seed${i}@example.com`, '(206) 555-0100', `${100 + i} Plan Avenue`,
+                city, zip, i % 4 === 0 ? 'Condo' : 'Single Family', 400000 + (i * 7919) % 1600000,
+                900 + (i * 37) % 3100, 1 + i % 5, 1 + (i % 4) * 0.5, `Seeded listing ${i} for query plan checks`,
+                i % 3 === 0 ? 1 : 0, created.toISOString(), expires.toISOString(), status,
+                expires.getTime() - now < 2 * DAY ? i % 2 : 0, i % 4 === 0 ? 'partner' : 'fsbo',
+                sqliteTimestamp(created)
+            );
+            for (let n = 0; n < 3; n++) {
+                const hash = `${i}-${n}`;
+                insertPhoto.run(id, `${hash}.jpg`, `uploads/${hash}.jpg`, n, hash, i % 50 === 0 ? null : '{}');
+            }
+            if (i % 10 === 0) {
+                insertEmail.run(id, `seed${i}@example.com`, 'sent', created.toISOString(), created.toISOString(), created.toISOString());
+            }
+        }
+    })();
+};
+
+// Every statement the routes and cron jobs run per request or per sweep.
+// allow: plan steps that are expected for this shape, with the reason.
+const buildChecks = () => {
+    const now = new Date().toISOString();
+    const middle = db.prepare(`SELECT id, createdAt FROM listings WHERE status = 'active' ORDER BY id LIMIT 1 OFFSET ?`)
+        .get(Math.floor(listingCount / 2)) || { id: 1, createdAt: sqliteTimestamp(new Date()) };
+    const ids = JSON.stringify(Array.from({ length: 50 }, (_, n) => middle.id + n));
+    const page = (filters, after = null, summary = false) => {
+        const columns = summary ? summaryColumns : undefined;
+        const { sql, params } = activeListingsQuery({ filters, after, columns, summary });
+        return { sql, params: [...params, config.listingsPageSize + 1] };
+    };
+    const statement = (name, ...params) => ({ sql: statements[name].source, params });
+
+    return [
+        { name: 'GET /listings', ...page({}) },
+        { name: 'GET /listings?city=', ...page({ city: 'bellevue' }) },
+        { name: 'GET /listings?zip=', ...page({ zip: '98033' }) },
+        { name: 'GET /listings?source=', ...page({ source: 'partner' }) },
+        { name: 'GET /listings?after= (page 2)', ...page({}, middle) },
+        { name: 'GET /listings?beds=&propertyType=', ...page({ beds: 3, propertyType: 'Condo' }) },
+        {
+            name: 'GET /listings?minPrice=&maxPrice=', ...page({ minPrice: 500000, maxPrice: 550000 }),
+            allow: { sort: 'price range comes from idx_listings_status_price; only matching rows are sorted' }
+        },
+        { name: 'GET /listings?view=summary', ...page({}, null, true) },
+        { name: 'GET /listings?view=summary&city=', ...page({ city: 'bellevue' }, null, true) },
+        { name: 'GET /listings?view=summary&source=', ...page({ source: 'partner' }, middle, true) },
+        {
+            name: 'GET /listings?view=summary&minPrice=&maxPrice=', ...page({ minPrice: 500000, maxPrice: 550000 }, null, true),
+            allow: { sort: 'price range comes from idx_summaries_price; only matching rows are sorted' }
+        },
+        { name: 'getActiveListings', ...statement('getActiveListings') },
+        { name: 'getFeedListings', ...statement('getFeedListings') },
+        { name: 'getActiveListingsBySource', ...statement('getActiveListingsBySource', 'fsbo') },
+        { name: 'getListingById', ...statement('getListingById', middle.id) },
+        { name: 'getPhotosByListingId', ...statement('getPhotosByListingId', middle.id) },
+        { name: 'getPhotosByListingIds', ...statement('getPhotosByListingIds', ids) },
+        { name: 'getPhotosMissingVariants', ...statement('getPhotosMissingVariants') },
+        { name: 'setPhotoVariants', ...statement('setPhotoVariants', '{}', `${listingCount - 1}-0`), write: true },
+        { name: 'cron: expireOldListings', ...statement('expireOldListings'), write: true },
+        { name: 'cron: getListingsNeedingReminder', ...statement('getListingsNeedingReminder', config.reminderDaysBefore) },
+        { name: 'cron: markReminderSent', ...statement('markReminderSent', middle.id), write: true },
+        {
+            name: 'getAllListings (admin)', ...statement('getAllListings'),
+            allow: { scan: 'admin panel returns every listing', sort: 'sorted once per admin page load' }
+        },
+        {
+            name: 'feeds: getActiveExtractedListings', ...statement('getActiveExtractedListings'),
+            allow: { scan: 'feed export writes every active extracted listing', sort: 'once per export, not per request' }
+        },
+        { name: 'outbox: getDueEmails', ...statement('getDueEmails', now, config.emailOutbox.batchSize) },
+        { name: 'outbox: deleteSentEmailsBefore', ...statement('deleteSentEmailsBefore', now), write: true },
+        { name: 'getExtractionCache', ...statement('getExtractionCache', 'https://zillow.com/homedetails/1', now) }
+    ];
+};
+
+// Median milliseconds over a few runs; writes are rolled back after each run
+const time = (check, runs = 3) => {
+    const prepared = db.prepare(check.sql);
+    const samples = [];
+    for (let run = 0; run < runs; run++) {
+        if (check.write) {
+            db.exec('SAVEPOINT plan_check');
+        }
+        const started = process.hrtime.bigint();
+        prepared.reader ? prepared.all(...check.params) : prepared.run(...check.params);
+        samples.push(Number(process.hrtime.bigint() - started) / 1e6);
+        if (check.write) {
+            db.exec('ROLLBACK TO plan_check; RELEASE plan_check');
+        }
+    }
+    return samples.sort((a, b) => a - b)[Math.floor(runs / 2)];
+};
+
+const main = () => {
+    if (!existingDb) {
+        console.log(`🌱 Seeding ${listingCount.toLocaleString()} listings...`);
+        const started = Date.now();
+        seed(listingCount);
+        console.log(`✅ Seeded in ${((Date.now() - started) / 1000).toFixed(1)}s`);
+    }
+
+    let failures = 0;
+    buildChecks().forEach(check => {
+        const plan = db.prepare(`EXPLAIN QUERY PLAN ${check.sql}`).all(...check.params).map(row => row.detail);
+        const allow = check.allow || {};
+        const problems = [];
+        if (!allow.scan && plan.some(step => FULL_SCAN.test(step))) {
+            problems.push('full table scan');
+        }
+        if (!allow.sort && plan.some(step => TEMP_SORT.test(step))) {
+            problems.push('temp b-tree sort');
+        }
+        const ms = existingDb ? null : time(check);
+
+        failures += problems.length ? 1 : 0;
+        console.log(`\n${problems.length ? '❌' : '✅'} ${check.name}${ms === null ? '' : `  (${ms.toFixed(2)} ms)`}`);
+        plan.forEach(step => console.log(`     ${step}`));
+        problems.forEach(problem => console.log(`     ⚠️  ${problem}`));
+        Object.values(allow).forEach(reason => console.log(`     ℹ️  allowed: ${reason}`));
+    });
+
+    db.close();
+    if (tempDir) {
+        fs.rmSync(tempDir, { recursive: true, force: true });
+    }
+    console.log(failures ? `\n❌ ${failures} statement(s) need an index` : '\n✅ All hot statements use indexes');
+    process.exit(failures ? 1 : 0);
+};
+
+main();
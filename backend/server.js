@@ -7,6 +7,12 @@ const path = require('path');
 const config = require('./config');
 const { initDatabase } = require('./database');
 const { initializeTransporter } = require('./email-service');
+const { startOutboxWorker, flushOutbox, getOutboxStats } = require('./email-outbox');
+const { getCacheStats } = require('./response-cache');
+const { startFeedExport, serveFeeds, getFeedStats } = require('./feed-export');
+const { resumePending, getPhotoStats } = require('./photo-pipeline');
+const { pool: browserPool } = require('./browser-pool');
+const { getExtractionStats } = require('./extraction-service');
 const { scheduleExpirationCheck, scheduleReminderEmails, runImmediateChecks } = require('./cron-jobs');
 const fsboRoutes = require('./routes/fsbo-routes');
 const contactRoutes = require('./routes/contact-routes');
@@ -40,6 +46,9 @@ app.use(express.urlencoded({ extended: true, limit: '50mb' }));
 // Serve uploaded files
 app.use('/uploads', express.static(path.join(__dirname, 'uploads')));
 
+// Static listing feeds (see feed-export.js)
+app.use('/feeds', serveFeeds);
+
 // API Routes
 app.use('/api/fsbo', fsboRoutes);
 app.use('/api/contact', contactRoutes);
@@ -50,7 +59,12 @@ app.get('/api/health', (req, res) => {
         status: 'ok',
         autoDeployed: true, // GitHub Actions auto-deployment active 
         message: 'VDI Realty FSBO API is running',
-        timestamp: new Date().toISOString()
+        timestamp: new Date().toISOString(),
+        responseCache: getCacheStats(),
+        photos: getPhotoStats(),
+        extraction: getExtractionStats(),
+        emailOutbox: getOutboxStats(),
+        feeds: getFeedStats()
     });
 });
 
@@ -68,6 +82,9 @@ try {
     console.log('ℹ️  Server will continue without email functionality');
 }
 
+// Deliver queued emails in the background
+startOutboxWorker();
+
 // Schedule cron jobs
 console.log('⏰ Scheduling automated tasks...');
 scheduleExpirationCheck();
@@ -76,6 +93,19 @@ scheduleReminderEmails();
 // Run immediate checks on startup
 runImmediateChecks();
 
+// Finish resizing photos left over from a previous run
+resumePending();
+
+// Write the static listing feeds and keep them in step with listing changes
+startFeedExport();
+
+// Launch the extraction browser now instead of on the first /extract request
+if (config.browserPool.warmOnStart) {
+    browserPool.warmUp().catch(error => {
+        console.error('⚠️  Extraction browser failed to start:', error.message);
+    });
+}
+
 // Start server
 const PORT = config.port;
 app.listen(PORT, () => {
@@ -91,12 +121,16 @@ app.listen(PORT, () => {
     console.log('');
     console.log('Available Endpoints:');
     console.log(`  POST   /api/fsbo/submit          - Submit new listing`);
+    console.log(`  POST   /api/fsbo/submit-batch    - Submit many listings at once`);
     console.log(`  GET    /api/fsbo/listings        - Get all active listings`);
+    console.log(`  GET    /api/fsbo/search?q=       - Search listings`);
+    console.log(`  GET    /api/fsbo/nearby          - Listings within a radius or box`);
     console.log(`  GET    /api/fsbo/listing/:id     - Get single listing`);
     console.log(`  GET    /api/fsbo/photo/:filename - Get listing photo`);
     console.log(`  POST   /api/fsbo/contact/:id     - Contact seller`);
     console.log(`  POST   /api/contact/submit       - Submit contact form`);
     console.log(`  GET    /api/health               - Health check`);
+    console.log(`  GET    /feeds/manifest.json      - Static listing feeds`);
     console.log('═══════════════════════════════════════════════════');
     console.log('');
 });
@@ -113,10 +147,10 @@ process.on('unhandledRejection', (reason, promise) => {
 // Graceful shutdown
 process.on('SIGTERM', () => {
     console.log('🛑 SIGTERM received, shutting down gracefully...');
-    process.exit(0);
+    Promise.allSettled([flushOutbox(5000), browserPool.close()]).finally(() => process.exit(0));
 });
 
 process.on('SIGINT', () => {
     console.log('🛑 SIGINT received, shutting down gracefully...');
-    process.exit(0);
+    Promise.allSettled([flushOutbox(5000), browserPool.close()]).finally(() => process.exit(0));
 });
@@ -0,0 +1,175 @@
+"""
+VDI Realty - Listing Extraction Benchmark
+
+Serves fixture listing pages from a local HTTP server (each page pulls in
+slow photos, a web font and an analytics script, like the real listing sites)
+and runs POST /api/fsbo/extract against them on a local backend, reporting
+extractions/sec, latency percentiles and the backend's browser pool stats.
+
+The backend runs with EXTRACT_SETTLE_MS=0 so the fixed settle waits don't
+swamp the browser launch and page load time being measured. To compare with
+the launch-a-browser-per-request extractor, check out the older version in a
+git worktree and pass it with --compare (it still sleeps between steps, so
+expect its latency to include ~4s of waiting):
+
+    git worktree add ../vdirealty-before <old-commit>
+    python benchmark_extraction.py --compare ../vdirealty-before/backend
+
+Set CHROMIUM_PATH if Chromium isn't at /snap/bin/chromium (otherwise the
+backend falls back to Puppeteer's bundled browser).
+
+Usage:
+    python benchmark_extraction.py                       # 24 extractions, 4 at a time
+    python benchmark_extraction.py --extractions 100 --concurrency 8
+    python benchmark_extraction.py --asset-delay 1.0     # Slower photos/fonts
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+from local_backend import BACKEND_DIR, free_port, start_backend, latency_stats
+
+FIXTURE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>{address} - Fixture Listing</title>
+    <link rel="stylesheet" href="/assets/fonts.css">
+    <script src="/assets/analytics.js"></script>
+</head>
+<body>
+    <h1 class="property-address">{address}, {city}, WA {zip}</h1>
+    <div class="price">${price:,}</div>
+    <span class="beds">{beds} Beds</span>
+    <span class="baths">{baths} Baths</span>
+    <span class="sqft">{sqft:,} sqft</span>
+    <div class="description">Fixture listing {i}: bright {beds} bedroom home with a fenced yard.</div>
+    <div class="gallery">
+        {images}
+    </div>
+</body>
+</html>
+"""
+
+
+def fixture_page(i, base_url):
+    """HTML for fixture listing i; its photos are served slowly by the fixture server"""
+    images = '\n        '.join(
+        f'<img src="{base_url}/photos/{i}-{n}.jpg" width="1024" height="768" alt="photo {n}">'
+        for n in range(8)
+    )
+    return FIXTURE_TEMPLATE.format(i=i, address=f"{1000 + i} Benchmark Ave NE", city='Bothell',
+                                   zip='98011', price=650000 + i * 1000, beds=3 + i % 3,
+                                   baths=2 + i % 2, sqft=1800 + i * 10, images=images)
+
+
+def start_fixture_server(asset_delay):
+    """Serve /listing/<i> pages plus slow /photos, /assets; returns (server, base_url)"""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/listing/'):
+                body = fixture_page(int(self.path.rsplit('/', 1)[-1]), base_url).encode('utf-8')
+                content_type = 'text/html; charset=utf-8'
+            elif self.path.startswith('/photos/') or self.path.startswith('/assets/'):
+                # Stand-in for heavy photos, fonts and trackers the pool should never fetch
+                time.sleep(asset_delay)
+                body = b'/* fixture */' if self.path.endswith(('.css', '.js')) else b'\0' * 200000
+                content_type = 'text/css' if self.path.endswith('.css') else 'application/octet-stream'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url
+
+
+def run(backend_dir, fixtures_url, args):
+    env = {'EXTRACT_SETTLE_MS': '0', 'EXTRACT_CONCURRENCY': str(args.pool_size)}
+    with start_backend(backend_dir, env=env) as api:
+        def extract(i):
+            start = time.perf_counter()
+            response = requests.post(f"{api.url}/api/fsbo/extract",
+                                     json={'url': f"{fixtures_url}/listing/{i}"}, timeout=300)
+            ok = response.ok and response.json().get('success')
+            return time.perf_counter() - start, ok
+
+        # One untimed extraction so both runs start with Chromium on disk cache
+        extract(0)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            outcomes = list(executor.map(extract, range(1, args.extractions + 1)))
+        elapsed = time.perf_counter() - started
+
+        health = requests.get(f"{api.url}/api/health", timeout=10).json()
+        samples = [seconds for seconds, _ in outcomes]
+        return {'rate': len(outcomes) / elapsed,
+                'errors': sum(1 for _, ok in outcomes if not ok),
+                'pool': health.get('extraction'),
+                **latency_stats(samples)}
+
+
+def print_result(label, result):
+    print(f"\n📊 {label}")
+    print(f"   Extractions/sec: {result['rate']:.2f}  ({result['count']} extractions, {result['errors']} failed)")
+    print(f"   Latency ms:      p50 {result['p50']:.0f} | p95 {result['p95']:.0f} | max {result['max']:.0f}")
+    if result['pool']:
+        pool = result['pool']
+        print(f"   Browser pool:    {pool['browserLaunches']} launch(es), {pool['pagesCreated']} page(s), "
+              f"{pool['pagesRecycled']} recycled, {pool['blockedRequests']} request(s) blocked")
+        if pool['recentTimings']['last']:
+            print(f"   Last timings:    {json.dumps(pool['recentTimings']['last'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark POST /api/fsbo/extract against local fixture pages')
+    parser.add_argument('--extractions', type=int, default=24, help='Extractions to time')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients')
+    parser.add_argument('--pool-size', type=int, default=4, help='Pages in the backend browser pool')
+    parser.add_argument('--asset-delay', type=float, default=0.5,
+                        help='Seconds the fixture server takes per photo/font/script')
+    parser.add_argument('--compare', metavar='BACKEND_DIR', help='Older backend checkout to compare against')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Listing Extraction Benchmark")
+    print("=" * 60)
+    print(f"{args.extractions} extractions, {args.concurrency} clients, "
+          f"pool of {args.pool_size}, {args.asset_delay}s per asset")
+
+    server, fixtures_url = start_fixture_server(args.asset_delay)
+    try:
+        results = []
+        if args.compare:
+            results.append(('Before (' + args.compare + ')', run(args.compare, fixtures_url, args)))
+        results.append(('Current backend', run(BACKEND_DIR, fixtures_url, args)))
+    finally:
+        server.shutdown()
+
+    for label, result in results:
+        print_result(label, result)
+    if len(results) == 2:
+        before, after = results[0][1]['rate'], results[1][1]['rate']
+        print(f"\n🚀 Speedup: {after / before:.2f}x extractions/sec")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
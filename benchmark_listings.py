@@ -0,0 +1,119 @@
+"""
+VDI Realty - Listings Endpoint Benchmark
+
+Seeds a local backend (temporary SQLite database) with listings and photos,
+then hammers GET /api/fsbo/listings from concurrent clients and reports
+requests/sec and latency percentiles.
+
+To compare before/after a backend change, check out the older version in a
+git worktree and pass it with --compare; both run the identical workload:
+
+    git worktree add ../vdirealty-before <old-commit>
+    python benchmark_listings.py --compare ../vdirealty-before/backend
+
+Usage:
+    python benchmark_listings.py                         # 1,000 listings, 10s
+    python benchmark_listings.py --listings 5000 --photos 8 --duration 20
+    python benchmark_listings.py --path "/api/fsbo/listings?source=fsbo"
+    python benchmark_listings.py --path "/api/fsbo/listings?view=summary"
+    python benchmark_listings.py --conditional          # Send If-None-Match (304 path)
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+import requests
+
+from local_backend import BACKEND_DIR, start_backend, seed_listings, latency_stats
+
+
+def hammer(url, duration, concurrency, etag=None):
+    """Issue GETs from concurrency threads for duration seconds (conditional if etag given)"""
+    samples, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker():
+        local_samples, local_errors = [], 0
+        with requests.Session() as session:
+            if etag:
+                session.headers['If-None-Match'] = etag
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                try:
+                    response = session.get(url, timeout=30)
+                    response.content
+                    if not response.ok and response.status_code != 304:
+                        local_errors += 1
+                except requests.exceptions.RequestException:
+                    local_errors += 1
+                local_samples.append(time.perf_counter() - start)
+        with lock:
+            samples.extend(local_samples)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {'rps': len(samples) / elapsed, 'errors': sum(errors), **latency_stats(samples)}
+
+
+def run(backend_dir, args):
+    with start_backend(backend_dir) as api:
+        seed_listings(api.url, args.listings, photos=args.photos)
+        url = f"{api.url}{args.path}"
+        payload = requests.get(url, timeout=60)
+        etag = payload.headers.get('ETag') if args.conditional else None
+        # Warm up the statement and response caches before measuring
+        hammer(url, 1, 1, etag)
+        result = hammer(url, args.duration, args.concurrency, etag)
+        result['bytes'] = len(payload.content)
+        return result
+
+
+def print_result(label, result):
+    print(f"\n📊 {label}")
+    print(f"   Requests/sec: {result['rps']:.1f}  ({result['count']} requests, {result['errors']} errors)")
+    print(f"   Latency ms:   p50 {result['p50']:.1f} | p95 {result['p95']:.1f} | p99 {result['p99']:.1f} | max {result['max']:.1f}")
+    print(f"   Payload:      {result['bytes'] / 1024:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark GET /api/fsbo/listings on a local backend')
+    parser.add_argument('--listings', type=int, default=1000, help='Listings to seed')
+    parser.add_argument('--photos', type=int, default=5, help='Photos per listing')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to measure')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--path', default='/api/fsbo/listings', help='Endpoint path to request')
+    parser.add_argument('--conditional', action='store_true',
+                        help='Send If-None-Match with the first response\'s ETag')
+    parser.add_argument('--compare', metavar='BACKEND_DIR', help='Older backend checkout to compare against')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Listings Endpoint Benchmark")
+    print("=" * 60)
+    print(f"Seeding {args.listings} listings x {args.photos} photos, "
+          f"{args.concurrency} clients for {args.duration:.0f}s on {args.path}")
+
+    results = []
+    if args.compare:
+        results.append(('Before (' + args.compare + ')', run(args.compare, args)))
+    results.append(('Current backend', run(BACKEND_DIR, args)))
+
+    for label, result in results:
+        print_result(label, result)
+    if len(results) == 2:
+        before, after = results[0][1]['rps'], results[1][1]['rps']
+        print(f"\n🚀 Speedup: {after / before:.2f}x requests/sec")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+VDI Realty - Listing Import Size Benchmark
+
+Generates batches of realistic extracted listings (descriptions, features,
+15-30 photo URLs, spread over sources and Puget Sound cities) and compares the
+single indented listings_import.js the extractor used to write with the
+compact shards from listing_shards.py: bytes on disk and gzipped, the UTF-16
+bytes the old import put in localStorage (quota is ~5 MB per origin), and the
+time to parse everything versus one city's shards. Parse times use Node's
+JSON.parse when node is on the PATH (closest to the browser), Python's
+json.loads otherwise.
+
+Usage:
+    python benchmark_shards.py                           # 100, 1,000, 5,000 and 20,000 listings
+    python benchmark_shards.py --sizes 500 2000 --max-shard 250
+"""
+
+import sys
+import gzip
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from listing_shards import write_shards, MAX_SHARD_LISTINGS
+
+SOURCES = ['Zillow', 'Realtor.com', 'Century 21', 'Compass', 'Whittlesey Properties', 'New Construction']
+CITIES = [('Seattle', '98101'), ('Bellevue', '98004'), ('Kirkland', '98033'), ('Redmond', '98052'),
+          ('Bothell', '98011'), ('Renton', '98057'), ('Kent', '98032'), ('Tacoma', '98402'),
+          ('Everett', '98201'), ('Sammamish', '98074'), ('Issaquah', '98027'), ('Lynnwood', '98036')]
+FEATURES = ['Hardwood floors', 'Updated kitchen', 'Quartz counters', 'Fenced yard', 'Two-car garage',
+            'Mountain view', 'Heat pump', 'Walk-in closet', 'Covered patio', 'EV charger', 'Bonus room']
+WORDS = ('bright spacious home quiet street close to parks schools light rail open floor plan '
+         'vaulted ceilings primary suite landscaped yard newly remodeled move in ready').split()
+KB = 1024
+MB = 1024 * 1024
+
+
+def make_listings(count, seed=7):
+    rng = random.Random(seed)
+    listings = []
+    for i in range(count):
+        source = SOURCES[(i * 7) % len(SOURCES)] if rng.random() < 0.8 else rng.choice(SOURCES)
+        city, zip_code = CITIES[min(int(rng.expovariate(0.35)), len(CITIES) - 1)]
+        photos = rng.randint(15, 30)
+        listings.append({
+            'source': source,
+            'sourceUrl': f"https://www.example-{source.split()[0].lower()}.com/homedetails/{i}-{city.lower()}/{100000 + i}_zpid/",
+            'address': f"{rng.randint(100, 29999)} {rng.choice(['NE', 'SE', 'NW', 'SW'])} {rng.randint(1, 200)}th St",
+            'city': city,
+            'state': 'WA',
+            'zip': zip_code,
+            'price': rng.randrange(350000, 3500000, 1000),
+            'bedrooms': rng.randint(1, 6),
+            'bathrooms': rng.choice([1, 1.5, 2, 2.5, 3, 3.5]),
+            'sqft': rng.randint(600, 5200),
+            'propertyType': rng.choice(['Single Family', 'Condo', 'Townhouse']),
+            'features': rng.sample(FEATURES, rng.randint(3, 8)),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(60, 160))).capitalize() + '.',
+            'mls': str(2000000 + i),
+            'images': [f"https://photos.example-cdn.com/p/{i:06d}/{n:02d}-{rng.getrandbits(48):012x}-cc_ft_1536.jpg"
+                       for n in range(photos)],
+            'extractedAt': f"2026-10-{rng.randint(1, 19):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+            'status': 'Active',
+            'lat': round(47.6 + rng.uniform(-0.4, 0.4), 4),
+            'lon': round(-122.2 + rng.uniform(-0.3, 0.3), 4)
+        })
+    return listings
+
+
+NODE_PARSE = """
+const fs = require('fs');
+const texts = JSON.parse(fs.readFileSync(0, 'utf8')).map(file => fs.readFileSync(file, 'utf8'));
+const runs = [];
+for (let run = 0; run < 5; run++) {
+    const started = process.hrtime.bigint();
+    texts.forEach(text => JSON.parse(text));
+    runs.push(Number(process.hrtime.bigint() - started) / 1e6);
+}
+console.log(runs.sort((a, b) => a - b)[2]);
+"""
+
+
+def parse_ms(files):
+    """Median milliseconds to parse the given JSON files (Node if available)"""
+    if shutil.which('node'):
+        result = subprocess.run(['node', '-e', NODE_PARSE], input=json.dumps([str(f) for f in files]),
+                                capture_output=True, text=True, check=True)
+        return float(result.stdout)
+    texts = [Path(f).read_text(encoding='utf-8') for f in files]
+    runs = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for text in texts:
+            json.loads(text)
+        runs.append((time.perf_counter() - started) * 1000)
+    return sorted(runs)[2]
+
+
+def measure(count, max_shard, workdir):
+    listings = make_listings(count)
+    old_body = json.dumps(listings, indent=2)
+    old_file = workdir / f"old-{count}.json"
+    old_file.write_text(old_body, encoding='utf-8')
+
+    out = workdir / f"shards-{count}"
+    manifest = write_shards(listings, out, workdir / f"loader-{count}.js", max_shard)
+    shards = manifest['shards']
+    seattle = [out / shard['file'] for shard in shards if shard['city'] == 'Seattle']
+    largest = max(shards, key=lambda shard: shard['bytes'])
+
+    return {
+        'count': count,
+        'old_bytes': len(old_body.encode('utf-8')),
+        'old_gzip': len(gzip.compress(old_body.encode('utf-8'))),
+        'old_storage': len(json.dumps(listings, separators=(',', ':'))) * 2,
+        'shards': len(shards),
+        'shard_bytes': sum(shard['bytes'] for shard in shards),
+        'shard_gzip': sum(len(gzip.compress((out / shard['file']).read_bytes())) for shard in shards),
+        'largest': largest['bytes'],
+        'loader_bytes': (workdir / f"loader-{count}.js").stat().st_size,
+        'old_parse': parse_ms([old_file]),
+        'all_parse': parse_ms([out / shard['file'] for shard in shards]),
+        'city_parse': parse_ms(seattle),
+        'city_bytes': sum(path.stat().st_size for path in seattle)
+    }
+
+
+def print_report(results, parser_name):
+    print("\n" + "=" * 60)
+    print("📋 RESULTS")
+    print("=" * 60)
+    for r in results:
+        quota = '❌ over' if r['old_storage'] > 5 * MB else '✅ under'
+        print(f"\n{r['count']:,} listings")
+        print(f"   Old listings_import.js   {r['old_bytes'] / KB:10,.0f} KB  gzip {r['old_gzip'] / KB:8,.0f} KB")
+        print(f"     localStorage copy      {r['old_storage'] / KB:10,.0f} KB  ({quota} the ~5 MB quota)")
+        print(f"     parse everything       {r['old_parse']:10.1f} ms")
+        print(f"   Shards ({r['shards']:>3})             {r['shard_bytes'] / KB:10,.0f} KB  gzip {r['shard_gzip'] / KB:8,.0f} KB "
+              f"({1 - r['shard_bytes'] / r['old_bytes']:.0%} smaller)")
+        print(f"     loader + manifest      {r['loader_bytes'] / KB:10,.1f} KB")
+        print(f"     largest shard          {r['largest'] / KB:10,.0f} KB")
+        print(f"     parse every shard      {r['all_parse']:10.1f} ms")
+        print(f"     parse Seattle only     {r['city_parse']:10.1f} ms  ({r['city_bytes'] / KB:,.0f} KB)")
+    print(f"\nParse times: median of 5 runs with {parser_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the single listings_import.js with sharded output')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000, 20000], help='Batch sizes to measure')
+    parser.add_argument('--max-shard', type=int, default=MAX_SHARD_LISTINGS,
+                        help=f'Listings per shard (default: {MAX_SHARD_LISTINGS})')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Listing Import Size Benchmark")
+    print("=" * 60)
+
+    workdir = Path(tempfile.mkdtemp(prefix='vdi-shards-'))
+    try:
+        results = []
+        for count in args.sizes:
+            print(f"⏱️  {count:,} listings...")
+            results.append(measure(count, args.max_shard, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results, 'Node JSON.parse' if shutil.which('node') else 'Python json.loads')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
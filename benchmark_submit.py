@@ -0,0 +1,111 @@
+"""
+VDI Realty - Submit Endpoint Benchmark
+
+Starts a local SMTP stand-in that takes --smtp-delay seconds per message (like
+a real relay or SendGrid), points a local backend at it, submits listings to
+POST /api/fsbo/submit from concurrent clients and reports submit latency
+percentiles. Each submit sends a confirmation and an admin email, so when
+handlers wait on email the SMTP delay shows up in p95; with the outbox it
+should not. It then waits for every email to arrive and reports how long the
+outbox took to deliver them.
+
+To compare before/after a backend change, check out the older version in a
+git worktree and pass it with --compare:
+
+    git worktree add ../vdirealty-before <old-commit>
+    python benchmark_submit.py --compare ../vdirealty-before/backend
+
+Usage:
+    python benchmark_submit.py                          # 200 submits, 8 clients
+    python benchmark_submit.py --submits 1000 --concurrency 16 --smtp-delay 0.5
+    python benchmark_submit.py --fail-rate 0.2          # Exercise outbox retries
+"""
+
+import sys
+import time
+import argparse
+
+import requests
+
+from bulk_submit import submit_all
+from local_backend import BACKEND_DIR, start_backend, make_listing, latency_stats
+from local_smtp import start_smtp, backend_env
+
+EMAILS_PER_SUBMIT = 2  # Seller confirmation + admin notification
+
+
+def wait_for_emails(smtp, expected, timeout):
+    """Seconds until the stand-in has received expected messages (None on timeout)"""
+    started = time.perf_counter()
+    while len(smtp.messages) < expected:
+        if time.perf_counter() - started > timeout:
+            return None
+        time.sleep(0.05)
+    return time.perf_counter() - started
+
+
+def run(backend_dir, args):
+    with start_smtp(delay=args.smtp_delay, fail_rate=args.fail_rate) as smtp:
+        env = dict(backend_env(smtp), EMAIL_RETRY_BASE_SECONDS='1', EMAIL_POLL_SECONDS='1')
+        with start_backend(backend_dir, env=env) as api:
+            listings = [(i, make_listing(i, photos=0)) for i in range(args.submits)]
+            started = time.perf_counter()
+            results = submit_all(listings, api.url, args.concurrency, progress=False)
+            elapsed = time.perf_counter() - started
+
+            expected = sum(1 for r in results if r['ok']) * EMAILS_PER_SUBMIT
+            delivery = wait_for_emails(smtp, expected, args.email_timeout)
+            outbox = requests.get(f"{api.url}/api/health", timeout=10).json().get('emailOutbox')
+            return {'rps': len(results) / elapsed,
+                    'errors': sum(1 for r in results if not r['ok']),
+                    'emails': len(smtp.messages), 'expected': expected,
+                    'smtpConnections': smtp.connections, 'rejected': smtp.rejected,
+                    'deliverySeconds': delivery, 'outbox': outbox,
+                    **latency_stats([r['seconds'] for r in results])}
+
+
+def print_result(label, result):
+    print(f"\n📊 {label}")
+    print(f"   Submits/sec:  {result['rps']:.1f}  ({result['count']} submits, {result['errors']} errors)")
+    print(f"   Latency ms:   p50 {result['p50']:.1f} | p95 {result['p95']:.1f} | p99 {result['p99']:.1f} | max {result['max']:.1f}")
+    delivered = (f"all delivered {result['deliverySeconds']:.1f}s after the last submit"
+                 if result['deliverySeconds'] is not None else "timed out waiting for delivery")
+    print(f"   Emails:       {result['emails']}/{result['expected']} over {result['smtpConnections']} "
+          f"SMTP connection(s), {result['rejected']} rejected; {delivered}")
+    if result['outbox']:
+        outbox = result['outbox']
+        print(f"   Outbox:       {outbox['sent']} sent, {outbox['pending']} pending, {outbox['failed']} failed, "
+              f"{outbox['retried']} retried in {outbox['batches']} batch(es)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark POST /api/fsbo/submit with a slow local SMTP server')
+    parser.add_argument('--submits', type=int, default=200, help='Listings to submit')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--smtp-delay', type=float, default=0.3, help='Seconds the SMTP stand-in takes per message')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of messages the stand-in rejects')
+    parser.add_argument('--email-timeout', type=float, default=120, help='Seconds to wait for all emails')
+    parser.add_argument('--compare', metavar='BACKEND_DIR', help='Older backend checkout to compare against')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Submit Endpoint Benchmark")
+    print("=" * 60)
+    print(f"{args.submits} submits, {args.concurrency} clients, SMTP delay {args.smtp_delay}s, "
+          f"fail rate {args.fail_rate:.0%}")
+
+    results = []
+    if args.compare:
+        results.append(('Before (' + args.compare + ')', run(args.compare, args)))
+    results.append(('Current backend', run(BACKEND_DIR, args)))
+
+    for label, result in results:
+        print_result(label, result)
+    if len(results) == 2:
+        before, after = results[0][1]['p95'], results[1][1]['p95']
+        print(f"\n🚀 Submit p95: {before:.0f} ms -> {after:.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+VDI Realty - Bulk Listing Submitter
+
+Submits many listings to /api/fsbo/submit from a CSV, JSONL or JSON file
+(including extracted_listings.json from extract_listings.py). Rows are
+validated locally with the same rules as the backend, then submitted by a
+bounded pool of workers sharing one pooled HTTP session.
+
+Usage:
+    python bulk_submit.py partner.csv --defaults partner_contact.json
+    python bulk_submit.py extracted_listings.json --defaults partner_contact.json --yes
+    python bulk_submit.py listings.jsonl --api http://localhost:3000 --concurrency 8
+    python bulk_submit.py listings.jsonl --batch-size 100   # Use /api/fsbo/submit-batch
+    python bulk_submit.py listings.jsonl --dry-run          # Validate only
+
+--defaults is a JSON object merged under every row, e.g. the partner's
+contact details, which extracted listings don't have.
+"""
+
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from address_parser import fill_address_fields
+
+API_BASE_URL = 'https://api.vdirealty.com'
+DEFAULT_CONCURRENCY = 4
+
+REQUIRED_FIELDS = ['firstName', 'lastName', 'email', 'phone', 'address', 'city', 'zip',
+                   'propertyType', 'price', 'sqft', 'description']
+INTEGER_FIELDS = ['price', 'sqft', 'bedrooms', 'yearBuilt', 'grossIncome', 'operatingExpenses',
+                  'numberOfUnits', 'parkingSpaces']
+FLOAT_FIELDS = ['bathrooms', 'lotSize', 'occupancyRate', 'capRate']
+EMAIL_PATTERN = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+
+
+def read_rows(path):
+    """Read listing rows from .csv, .jsonl or .json (a list of objects)"""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix.lower() == '.csv':
+            return [dict(row) for row in csv.DictReader(f)]
+        if path.suffix.lower() == '.jsonl':
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+        return data if isinstance(data, list) else [data]
+
+
+def to_number(value, integer=True):
+    """'$540,000' -> 540000, '2.5' -> 2.5; values that aren't numbers are returned unchanged"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value) if integer and float(value).is_integer() else value
+    text = str(value).strip().replace('$', '').replace(',', '').replace(' ', '')
+    try:
+        number = float(text)
+    except ValueError:
+        return value
+    return int(number) if integer and number.is_integer() else number
+
+
+def to_submission(row, defaults=None):
+    """Map a row (submit-form fields or extractor output) onto the submit payload"""
+    listing = dict(defaults or {})
+    listing.update({key: value for key, value in row.items() if value not in (None, '')})
+
+    # Extractor output uses 'images'/'sourceUrl'; the API expects 'photoUrls'/'externalUrl'
+    if 'images' in listing and 'photoUrls' not in listing:
+        listing['photoUrls'] = listing.pop('images')
+    if isinstance(listing.get('photoUrls'), list):
+        listing['photoUrls'] = json.dumps(listing['photoUrls'])
+    if 'sourceUrl' in listing and not listing.get('externalUrl'):
+        listing['externalUrl'] = listing.pop('sourceUrl')
+    if 'mls' in listing and not listing.get('mlsNumber'):
+        listing['mlsNumber'] = listing.pop('mls')
+    # One-line addresses ("123 Main St, Seattle, WA 98101") fill in city/state/zip
+    fill_address_fields(listing)
+    listing.setdefault('state', 'WA')
+    listing.setdefault('listingSource', 'partner')
+
+    # The backend stores parseInt(price): "$540,000" would become 540, so send plain numbers
+    for field in INTEGER_FIELDS + FLOAT_FIELDS:
+        if listing.get(field) not in (None, ''):
+            listing[field] = to_number(listing[field], integer=field in INTEGER_FIELDS)
+
+    for key in ('source', 'extractedAt', 'status', 'photoIds', 'confidence'):
+        listing.pop(key, None)
+    return listing
+
+
+def validate_listing(listing):
+    """Return a list of problems, using the same rules as POST /api/fsbo/submit"""
+    errors = [f"missing {field}" for field in REQUIRED_FIELDS if not listing.get(field)]
+
+    if listing.get('propertyType') != 'Commercial':
+        if not listing.get('bedrooms') or not listing.get('bathrooms'):
+            errors.append('bedrooms and bathrooms are required for residential properties')
+
+    for field in INTEGER_FIELDS + FLOAT_FIELDS:
+        value = listing.get(field)
+        if value in (None, ''):
+            continue
+        # Must already be a plain number (to_submission converts "$540,000")
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            errors.append(f"{field} is not a number: {value!r}")
+
+    if listing.get('email') and not EMAIL_PATTERN.match(str(listing['email'])):
+        errors.append(f"invalid email: {listing['email']}")
+    return errors
+
+
+def make_session(concurrency):
+    """One keep-alive session with a connection pool sized to the worker count"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency, max_retries=2)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Content-Type'] = 'application/json'
+    return session
+
+
+def submit_one(session, api_base, listing):
+    """Submit one listing; returns a result dict (never raises)"""
+    start = time.perf_counter()
+    try:
+        response = session.post(f"{api_base}/api/fsbo/submit", json=listing, timeout=30)
+        data = response.json() if response.text else {}
+        if response.ok and data.get('success'):
+            return {'ok': True, 'listingId': data['listingId'], 'seconds': time.perf_counter() - start}
+        error = data.get('error') or f"HTTP {response.status_code}"
+        if data.get('details'):
+            error += f" ({data['details']})"
+        return {'ok': False, 'error': error, 'seconds': time.perf_counter() - start}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return {'ok': False, 'error': str(e), 'seconds': time.perf_counter() - start}
+
+
+def submit_batch(session, api_base, listings):
+    """Submit a chunk of listings to /submit-batch; returns one result dict per listing"""
+    start = time.perf_counter()
+    try:
+        response = session.post(f"{api_base}/api/fsbo/submit-batch", json={'listings': listings}, timeout=120)
+        data = response.json() if response.text else {}
+        seconds = time.perf_counter() - start
+        if not response.ok or 'results' not in data:
+            error = data.get('error') or f"HTTP {response.status_code}"
+            return [{'ok': False, 'error': error, 'seconds': seconds} for _ in listings]
+        return [{'ok': True, 'listingId': item['listingId'], 'seconds': seconds} if item['success']
+                else {'ok': False, 'error': item['error'], 'seconds': seconds}
+                for item in sorted(data['results'], key=lambda item: item['index'])]
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return [{'ok': False, 'error': str(e), 'seconds': time.perf_counter() - start} for _ in listings]
+
+
+def submit_all(listings, api_base=API_BASE_URL, concurrency=DEFAULT_CONCURRENCY, progress=True, batch_size=0):
+    """
+    Submit (row number, listing) pairs concurrently; returns results in row order.
+    With batch_size > 0 each request carries that many listings via /submit-batch.
+    """
+    if batch_size > 0:
+        chunks = [listings[i:i + batch_size] for i in range(0, len(listings), batch_size)]
+    else:
+        chunks = [[item] for item in listings]
+
+    def send(chunk):
+        payloads = [listing for _, listing in chunk]
+        if batch_size > 0:
+            return submit_batch(session, api_base, payloads)
+        return [submit_one(session, api_base, payloads[0])]
+
+    results = {}
+    with make_session(concurrency) as session, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(send, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            for (row, _), outcome in zip(futures[future], future.result()):
+                result = dict(row=row, **outcome)
+                results[row] = result
+                if progress:
+                    status = f"✅ ID {result['listingId']}" if result['ok'] else f"❌ {result['error']}"
+                    print(f"  [{len(results)}/{len(listings)}] row {row}: {status}")
+    return [results[row] for row in sorted(results)]
+
+
+def latency_percentiles(samples):
+    """p50/p95/max of request times in seconds, as milliseconds"""
+    ordered = sorted(samples) or [0.0]
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {'p50': pct(50), 'p95': pct(95), 'max': ordered[-1] * 1000}
+
+
+def write_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-submit listings to the VDI Realty API')
+    parser.add_argument('input', help='Listings file (.csv, .jsonl or .json)')
+    parser.add_argument('--api', default=API_BASE_URL, help=f'API base URL (default: {API_BASE_URL})')
+    parser.add_argument('--defaults', help='JSON file of default fields merged into every row')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Parallel requests')
+    parser.add_argument('--batch-size', type=int, default=0,
+                        help='Listings per /submit-batch request (0 = one /submit call per listing)')
+    parser.add_argument('--results', default='bulk_submit_results.jsonl', help='Per-row results file')
+    parser.add_argument('--dry-run', action='store_true', help='Validate only, submit nothing')
+    parser.add_argument('--yes', '-y', action='store_true', help='Do not ask for confirmation')
+    args = parser.parse_args()
+
+    print("\n" + "═"*70)
+    print("  VDI REALTY - BULK LISTING SUBMISSION")
+    print("═"*70)
+
+    defaults = {}
+    if args.defaults:
+        with open(args.defaults, 'r', encoding='utf-8') as f:
+            defaults = json.load(f)
+
+    rows = read_rows(args.input)
+    valid, results = [], []
+    for row_number, row in enumerate(rows, 1):
+        listing = to_submission(row, defaults)
+        errors = validate_listing(listing)
+        if errors:
+            results.append({'row': row_number, 'ok': False, 'error': '; '.join(errors)})
+        else:
+            valid.append((row_number, listing))
+
+    print(f"\n📋 {len(rows)} row(s) read from {args.input}")
+    print(f"   Valid:   {len(valid)}")
+    print(f"   Invalid: {len(results)}")
+    for result in results[:10]:
+        print(f"   ❌ row {result['row']}: {result['error']}")
+
+    if args.dry_run or not valid:
+        write_results(results, args.results)
+        print(f"\n📝 Validation results: {args.results}")
+        return 0 if not results else 1
+
+    mode = f"batches of {args.batch_size}" if args.batch_size > 0 else "one request per listing"
+    print(f"\nAPI Endpoint: {args.api}  (concurrency {args.concurrency}, {mode})")
+    if not args.yes:
+        response = input(f"Submit {len(valid)} listing(s)? (y/n): ").lower()
+        if response != 'y':
+            print("\n❌ Submission cancelled.")
+            return 1
+
+    start = time.perf_counter()
+    results += submit_all(valid, args.api, args.concurrency, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    results.sort(key=lambda r: r['row'])
+    write_results(results, args.results)
+
+    submitted = sum(1 for r in results if r['ok'])
+    latency = latency_percentiles([r['seconds'] for r in results if 'seconds' in r])
+    print("\n" + "="*70)
+    print(f"✅ Submitted {submitted}/{len(rows)} listing(s) in {elapsed:.1f}s "
+          f"({len(valid) / elapsed:.1f} listings/sec)")
+    print(f"⏱️  Request latency: p50 {latency['p50']:.0f} ms | p95 {latency['p95']:.0f} ms | max {latency['max']:.0f} ms")
+    print(f"📝 Per-row results: {args.results}")
+    print("="*70 + "\n")
+    return 0 if submitted == len(rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+VDI Realty - Static Feed Mirror
+
+Copies the backend's static listing feeds (backend/feed-export.js) into the
+site's feeds/ directory so GitHub Pages can serve them without touching the
+backend. Only feeds whose content hash changed are downloaded; each file is
+verified against the hash in its name, generations that are neither current
+nor previous are removed, and manifest.json is written last so the site never
+points at a missing file. The .gz/.br copies are not mirrored: Pages gzips
+responses itself and would serve them as plain downloads.
+
+Point the pages at the mirrored copies by setting FEED_BASE_URL: 'feeds' in
+js/config.js, then commit feeds/.
+
+Usage:
+    python export_feeds.py                               # From https://api.vdirealty.com
+    python export_feeds.py --api http://localhost:3000
+    python export_feeds.py --out feeds --dry-run
+"""
+
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+import requests
+
+DEFAULT_API = 'https://api.vdirealty.com'
+FEED_FILE = re.compile(r'^([a-z0-9-]+)\.([0-9a-f]{12})\.json$')
+
+
+def fetch(session, url):
+    response = session.get(url, timeout=60)
+    response.raise_for_status()
+    return response.content
+
+
+def mirror(api, out, dry_run=False):
+    """Sync out/ with the backend's manifest; returns (downloaded, removed) file names"""
+    base = f"{api.rstrip('/')}/feeds"
+    downloaded, removed = [], []
+
+    with requests.Session() as session:
+        manifest_body = fetch(session, f"{base}/manifest.json")
+        manifest = json.loads(manifest_body)
+        feeds = manifest.get('feeds', {})
+
+        for name, feed in feeds.items():
+            target = out / feed['file']
+            if target.exists():
+                continue
+            body = fetch(session, f"{base}/{feed['file']}")
+            if hashlib.sha256(body).hexdigest()[:12] != feed['hash']:
+                raise ValueError(f"{feed['file']} does not match its hash (feed changed mid-download?)")
+            if not dry_run:
+                target.write_bytes(body)
+            downloaded.append(feed['file'])
+            count = f"{feed['count']:,} listings, " if feed.get('count') is not None else ''
+            print(f"   ⬇️  {name:<18} {feed['file']}  ({count}{len(body) / 1024:,.1f} KB)")
+
+    # Keep the previous generation for pages that loaded the old manifest
+    keep = {feed['file'] for feed in feeds.values()} | {feed['previous'] for feed in feeds.values() if feed.get('previous')}
+    for path in sorted(out.glob('*.json')):
+        if FEED_FILE.match(path.name) and path.name not in keep:
+            if not dry_run:
+                path.unlink()
+            removed.append(path.name)
+
+    if not dry_run:
+        (out / 'manifest.json').write_bytes(manifest_body)
+    return downloaded, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mirror the backend\'s static listing feeds into the site')
+    parser.add_argument('--api', default=DEFAULT_API, help=f'Backend base URL (default: {DEFAULT_API})')
+    parser.add_argument('--out', default=str(Path(__file__).parent / 'feeds'), help='Output directory (default: feeds/)')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would change without writing files')
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("VDI Realty - Static Feed Mirror")
+    print("=" * 60)
+    print(f"🌐 {args.api} → {out}")
+
+    try:
+        downloaded, removed = mirror(args.api, out, args.dry_run)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"❌ Mirror failed: {e}")
+        return 1
+
+    for name in removed:
+        print(f"   🗑️  {name}")
+    if not downloaded and not removed:
+        print("✅ Feeds already up to date")
+    else:
+        verb = 'Would update' if args.dry_run else 'Updated'
+        print(f"✅ {verb}: {len(downloaded)} downloaded, {len(removed)} removed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,19 +2,47 @@
 VDI Realty - Listing Extractor
 Extracts property data from real estate listing URLs and saves to JSON
 
+Results are shared with the backend's /api/fsbo/extract through the
+extraction cache in its SQLite database (see extraction_cache.py), so URLs
+either side extracted in the last 24 hours are not fetched again.
+
 Usage:
     python extract_listings.py urls.txt              # Process URLs from file
     python extract_listings.py [URL]                 # Process single URL
     python extract_listings.py [URL1] [URL2] [URL3]  # Process multiple URLs
+    python extract_listings.py urls.txt --refresh    # Re-fetch even if cached
+    python extract_listings.py urls.txt --cache-db /app/data/fsbo.db
+    python extract_listings.py urls.txt --min-confidence 0.5   # Drop doubtful fields
+
+Each field is picked from every strategy's candidates (JSON-LD, selectors,
+page text; see listing_candidates.py) and its score is kept under
+'confidence'. Results served from the cache carry no scores.
 """
 
-import sys
 import json
-import re
+import argparse
+from datetime import datetime
 from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
 
+from geocode import attach_coordinates
+from extraction_cache import ExtractionCache, DEFAULT_DB, DEFAULT_TTL_HOURS
+from listing_shards import write_shards, SHARD_DIR, LOADER_FILE
+from address_parser import fill_address_fields
+from listing_candidates import FieldCandidates
+
+# Fields scored below this are flagged in the summary for review
+LOW_CONFIDENCE = 0.5
+
+SOURCE_NAMES = {
+    'century21': 'Century 21',
+    'zillow': 'Zillow',
+    'realtor': 'Realtor.com',
+    'compass': 'Compass',
+    'whittlesey': 'Whittlesey Properties',
+}
+
 
 def detect_source(url):
     """Detect the listing source from URL"""
@@ -60,353 +88,112 @@ def extract_json_ld(soup):
     return None
 
 
-def clean_number(text):
-    """Extract number from text"""
-    if not text:
-        return None
-    # Remove everything except digits, decimal point, and commas
-    cleaned = re.sub(r'[^\d.,]', '', str(text))
-    cleaned = cleaned.replace(',', '')
-    try:
-        if '.' in cleaned:
-            return float(cleaned)
-        return int(cleaned)
-    except:
-        return None
-
-
-def extract_century21(url, soup):
-    """Extract data from Century 21 listings"""
-    data = {
-        'source': 'Century 21',
-        'sourceUrl': url
-    }
+def collect_candidates(url, soup, source, selectors):
+    """Collect every strategy's values in one pass, then keep the best per field"""
+    candidates = FieldCandidates()
     
-    # Try JSON-LD first
     json_ld = extract_json_ld(soup)
     if json_ld:
         print("  ✓ Found JSON-LD data")
-        
-        # Address from "name" field (e.g., "16454 108th Avenue NE Bothell WA 98011")
-        if 'name' in json_ld:
-            name = json_ld['name']
-            # Parse address components
-            parts = name.split()
-            if len(parts) >= 4:
-                # Try to find state (2 letters) and zip (5 digits)
-                state_idx = None
-                for i, part in enumerate(parts):
-                    if len(part) == 2 and part.isupper():
-                        state_idx = i
-                        break
-                
-                if state_idx and state_idx + 1 < len(parts):
-                    data['state'] = parts[state_idx]
-                    data['zip'] = parts[state_idx + 1]
-                    data['city'] = parts[state_idx - 1] if state_idx > 0 else ''
-                    data['address'] = ' '.join(parts[:state_idx - 1]) if state_idx > 1 else parts[0]
-        
-        # Price
-        if 'offers' in json_ld and 'price' in json_ld['offers']:
-            data['price'] = clean_number(json_ld['offers']['price'])
-        elif 'price' in json_ld:
-            data['price'] = clean_number(json_ld['price'])
-        
-        # Description
-        if 'description' in json_ld:
-            desc = json_ld['description']
-            data['description'] = desc
-            
-            # Try to extract beds/baths/sqft from description
-            beds_match = re.search(r'(\d+)\s+(?:bedroom|bed|br)s?\b', desc, re.I)
-            if beds_match:
-                data['bedrooms'] = int(beds_match.group(1))
-            
-            baths_match = re.search(r'(\d+(?:\.\d+)?)\s+(?:bathroom|bath|ba)s?\b', desc, re.I)
-            if baths_match:
-                data['bathrooms'] = float(baths_match.group(1))
-            
-            sqft_match = re.search(r'([\d,]+)\s+(?:square\s+feet|sq\.?\s*ft|sqft)\b', desc, re.I)
-            if sqft_match:
-                data['sqft'] = clean_number(sqft_match.group(1))
-        
-        # Images
-        if 'image' in json_ld:
-            images = json_ld['image']
-            if isinstance(images, list):
-                data['images'] = images[:5]  # First 5 images
-            elif isinstance(images, str):
-                data['images'] = [images]
-    
-    # Fallback to HTML parsing
-    if 'address' not in data:
-        # Try to find address in HTML
-        address_elem = soup.select_one('h1, [class*="address"]')
-        if address_elem:
-            data['address'] = address_elem.get_text(strip=True)
+    candidates.add_json_ld(json_ld)
+    candidates.add_selectors(soup, selectors)
+    candidates.add_text(soup.get_text(' '))
     
+    values, confidence = candidates.resolve()
+    data = {
+        'source': source,
+        'sourceUrl': url
+    }
+    data.update(values)
+    data['confidence'] = confidence
     return data
 
 
+def extract_century21(url, soup):
+    """Extract data from Century 21 listings"""
+    # JSON-LD "name" is the full address (e.g., "16454 108th Avenue NE Bothell WA 98011");
+    # extract_listing() splits it with address_parser
+    return collect_candidates(url, soup, 'Century 21', {
+        'address': ['h1', '[class*="address"]']
+    })
+
+
 def extract_zillow(url, soup):
     """Extract data from Zillow listings"""
-    data = {
-        'source': 'Zillow',
-        'sourceUrl': url
-    }
-    
-    # Try JSON-LD
-    json_ld = extract_json_ld(soup)
-    if json_ld:
-        if 'name' in json_ld:
-            data['address'] = json_ld['name']
-        if 'offers' in json_ld and 'price' in json_ld['offers']:
-            data['price'] = clean_number(json_ld['offers']['price'])
-        if 'description' in json_ld:
-            data['description'] = json_ld['description']
-    
-    # HTML selectors
-    selectors = {
+    return collect_candidates(url, soup, 'Zillow', {
         'address': ['h1[data-test="home-details-summary-headline"]', 'h1.ds-address-container'],
         'price': ['span[data-test="property-floorplan-price"]', 'span.ds-price'],
-        'beds': ['span[data-testid="bed-count"]'],
-        'baths': ['span[data-testid="bath-count"]'],
+        'bedrooms': ['span[data-testid="bed-count"]'],
+        'bathrooms': ['span[data-testid="bath-count"]'],
         'sqft': ['span[data-testid="sqft-value"]']
-    }
-    
-    for key, sels in selectors.items():
-        if key not in data:
-            for sel in sels:
-                elem = soup.select_one(sel)
-                if elem:
-                    text = elem.get_text(strip=True)
-                    if key in ['beds', 'baths', 'sqft', 'price']:
-                        data[key if key != 'beds' else 'bedrooms'] = clean_number(text)
-                    else:
-                        data[key] = text
-                    break
-    
-    return data
+    })
 
 
 def extract_realtor(url, soup):
     """Extract data from Realtor.com listings"""
-    data = {
-        'source': 'Realtor.com',
-        'sourceUrl': url
-    }
-    
-    json_ld = extract_json_ld(soup)
-    if json_ld:
-        if 'name' in json_ld:
-            data['address'] = json_ld['name']
-        if 'offers' in json_ld and 'price' in json_ld['offers']:
-            data['price'] = clean_number(json_ld['offers']['price'])
-    
-    selectors = {
+    return collect_candidates(url, soup, 'Realtor.com', {
         'address': ['h1[data-testid="property-street"]', 'h1.address'],
         'price': ['div[data-testid="price"]', 'span[data-label="pc-price"]'],
-        'beds': ['li[data-testid="property-meta-beds"]'],
-        'baths': ['li[data-testid="property-meta-baths"]'],
+        'bedrooms': ['li[data-testid="property-meta-beds"]'],
+        'bathrooms': ['li[data-testid="property-meta-baths"]'],
         'sqft': ['li[data-testid="property-meta-sqft"]']
-    }
-    
-    for key, sels in selectors.items():
-        if key not in data:
-            for sel in sels:
-                elem = soup.select_one(sel)
-                if elem:
-                    text = elem.get_text(strip=True)
-                    if key in ['beds', 'baths', 'sqft', 'price']:
-                        data[key if key != 'beds' else 'bedrooms'] = clean_number(text)
-                    else:
-                        data[key] = text
-                    break
-    
-    return data
+    })
 
 
 def extract_compass(url, soup):
     """Extract data from Compass listings"""
-    data = {
-        'source': 'Compass',
-        'sourceUrl': url
-    }
-    
-    # Try JSON-LD first
-    json_ld = extract_json_ld(soup)
-    if json_ld:
-        if 'name' in json_ld:
-            data['address'] = json_ld['name']
-        if 'offers' in json_ld and 'price' in json_ld['offers']:
-            data['price'] = clean_number(json_ld['offers']['price'])
-        if 'description' in json_ld:
-            data['description'] = json_ld['description']
-        if 'numberOfBedrooms' in json_ld:
-            data['bedrooms'] = clean_number(json_ld['numberOfBedrooms'])
-        if 'numberOfBathroomsTotal' in json_ld:
-            data['bathrooms'] = clean_number(json_ld['numberOfBathroomsTotal'])
-    
-    # Try common selectors
-    selectors = {
+    return collect_candidates(url, soup, 'Compass', {
         'address': ['h1[data-tn="pdp-address"]', 'h1'],
         'price': ['div[data-tn="pdp-price"]', 'span[data-tn="pdp-price"]'],
-        'beds': ['div:contains("Beds")', 'span:contains("Beds")'],
-        'baths': ['div:contains("Baths")', 'span:contains("Baths")'],
-        'sqft': ['div:contains("Sq Ft")', 'span:contains("Sq Ft")']
-    }
-    
-    for key, sels in selectors.items():
-        if key not in data:
-            for sel in sels:
-                elem = soup.select_one(sel)
-                if elem:
-                    text = elem.get_text(strip=True)
-                    if key in ['beds', 'baths', 'sqft', 'price']:
-                        data[key if key != 'beds' else 'bedrooms'] = clean_number(text)
-                    else:
-                        data[key] = text
-                    break
-    
-    return data
+        'bedrooms': ['div:-soup-contains("Beds")', 'span:-soup-contains("Beds")'],
+        'bathrooms': ['div:-soup-contains("Baths")', 'span:-soup-contains("Baths")'],
+        'sqft': ['div:-soup-contains("Sq Ft")', 'span:-soup-contains("Sq Ft")']
+    })
 
 
 def extract_whittlesey(url, soup):
     """Extract data from Whittlesey Properties listings"""
-    data = {
-        'source': 'Whittlesey Properties',
-        'sourceUrl': url
-    }
-    
-    # Try JSON-LD first
-    json_ld = extract_json_ld(soup)
-    if json_ld:
-        if 'name' in json_ld:
-            data['address'] = json_ld['name']
-        if 'offers' in json_ld and 'price' in json_ld['offers']:
-            data['price'] = clean_number(json_ld['offers']['price'])
-        if 'description' in json_ld:
-            data['description'] = json_ld['description']
-    
-    # Try common selectors and text patterns
-    # Look for address in h1, title, or meta tags
-    if 'address' not in data:
-        for sel in ['h1', 'title', '.address', '.property-address']:
-            elem = soup.select_one(sel)
-            if elem:
-                text = elem.get_text(strip=True)
-                if text and len(text) > 5:
-                    data['address'] = text
-                    break
-    
-    # Look for price
-    if 'price' not in data:
-        price_patterns = [r'\$[\d,]+', r'Price:\s*\$?([\d,]+)']
-        text = soup.get_text()
-        for pattern in price_patterns:
-            match = re.search(pattern, text)
-            if match:
-                data['price'] = clean_number(match.group(0))
-                break
-    
-    # Look for beds/baths/sqft
-    text_content = soup.get_text()
-    if 'bedrooms' not in data:
-        beds_match = re.search(r'(\d+)\s+(?:Bed(?:room)?s?|BR)', text_content, re.I)
-        if beds_match:
-            data['bedrooms'] = int(beds_match.group(1))
-    
-    if 'bathrooms' not in data:
-        baths_match = re.search(r'(\d+(?:\.\d+)?)\s+(?:Bath(?:room)?s?|BA)', text_content, re.I)
-        if baths_match:
-            data['bathrooms'] = float(baths_match.group(1))
-    
-    if 'sqft' not in data:
-        sqft_match = re.search(r'([\d,]+)\s+(?:Sq\.?\s*Ft|Square\s+Feet)', text_content, re.I)
-        if sqft_match:
-            data['sqft'] = clean_number(sqft_match.group(1))
-    
-    return data
+    # Address in h1, title, or address blocks; price, beds, baths and sqft come from page text
+    return collect_candidates(url, soup, 'Whittlesey Properties', {
+        'address': ['h1', 'title', '.address', '.property-address']
+    })
 
 
 def extract_generic(url, soup):
     """Generic extraction for unknown sources - tries multiple methods"""
+    return collect_candidates(url, soup, 'Unknown', {
+        'address': ['h1', 'title', '.address', '.property-address', '[itemprop="address"]'],
+        'price': ['[itemprop="price"]', '[class*="price"]'],
+        'bedrooms': ['[itemprop="numberOfBedrooms"]', '[class*="beds"]'],
+        'bathrooms': ['[itemprop="numberOfBathroomsTotal"]', '[class*="baths"]'],
+        'sqft': ['[itemprop="floorSize"]', '[class*="sqft"]']
+    })
+
+
+def from_cache(url, record):
+    """Listing dict in this script's format from a shared cache record"""
     data = {
-        'source': 'Unknown',
+        'source': SOURCE_NAMES.get(detect_source(url), 'Unknown'),
         'sourceUrl': url
     }
-    
-    # Try JSON-LD first (most reliable)
-    json_ld = extract_json_ld(soup)
-    if json_ld:
-        if 'name' in json_ld:
-            data['address'] = json_ld['name']
-        if 'offers' in json_ld and 'price' in json_ld['offers']:
-            data['price'] = clean_number(json_ld['offers']['price'])
-        if 'description' in json_ld:
-            data['description'] = json_ld['description']
-        if 'numberOfBedrooms' in json_ld:
-            data['bedrooms'] = clean_number(json_ld['numberOfBedrooms'])
-        if 'numberOfBathroomsTotal' in json_ld:
-            data['bathrooms'] = clean_number(json_ld['numberOfBathroomsTotal'])
-        if 'floorSize' in json_ld:
-            if isinstance(json_ld['floorSize'], dict) and 'value' in json_ld['floorSize']:
-                data['sqft'] = clean_number(json_ld['floorSize']['value'])
-            else:
-                data['sqft'] = clean_number(json_ld['floorSize'])
-    
-    # Try common HTML selectors
-    if 'address' not in data:
-        for sel in ['h1', 'title', '.address', '.property-address', '[itemprop="address"]']:
-            elem = soup.select_one(sel)
-            if elem:
-                text = elem.get_text(strip=True)
-                # Basic validation - address should have some length
-                if text and len(text) > 5 and len(text) < 200:
-                    data['address'] = text
-                    break
-    
-    # Try to find price in page text
-    if 'price' not in data:
-        text_content = soup.get_text()
-        price_match = re.search(r'\$\s*([\d,]+(?:\.\d{2})?)', text_content)
-        if price_match:
-            price_val = clean_number(price_match.group(1))
-            # Sanity check - price should be reasonable
-            if price_val and price_val >= 1000 and price_val <= 100000000:
-                data['price'] = price_val
-    
-    # Find beds/baths/sqft with text patterns
-    text_content = soup.get_text()
-    
-    if 'bedrooms' not in data:
-        beds_match = re.search(r'(\d+)\s+(?:Bed(?:room)?s?|BR)\b', text_content, re.I)
-        if beds_match:
-            beds_val = int(beds_match.group(1))
-            if beds_val >= 0 and beds_val <= 20:
-                data['bedrooms'] = beds_val
-    
-    if 'bathrooms' not in data:
-        baths_match = re.search(r'(\d+(?:\.\d+)?)\s+(?:Bath(?:room)?s?|BA)\b', text_content, re.I)
-        if baths_match:
-            baths_val = float(baths_match.group(1))
-            if baths_val >= 0 and baths_val <= 20:
-                data['bathrooms'] = baths_val
-    
-    if 'sqft' not in data:
-        sqft_match = re.search(r'([\d,]+)\s+(?:Sq\.?\s*Ft|Square\s+Feet|sqft)\b', text_content, re.I)
-        if sqft_match:
-            sqft_val = clean_number(sqft_match.group(1))
-            if sqft_val and sqft_val >= 100 and sqft_val <= 50000:
-                data['sqft'] = sqft_val
-    
+    data.update({field: value for field, value in record.items() if value not in (None, '', [])})
+    fill_address_fields(data)
+    data['extractedAt'] = datetime.now().isoformat()
+    data['status'] = 'Active'
     return data
 
 
-def extract_listing(url):
-    """Extract listing data from URL"""
+def extract_listing(url, cache=None):
+    """Extract listing data from URL (served from the shared cache when fresh)"""
     print(f"\n📥 Processing: {url}")
     
+    if cache:
+        record = cache.lookup(url)
+        if record:
+            data = from_cache(url, record)
+            print(f"  ⚡ Cached: {data.get('address', 'No address')}")
+            return data
+    
     try:
         # Fetch the page
         headers = {
@@ -435,11 +222,16 @@ def extract_listing(url):
             # Use enhanced generic extraction
             data = extract_generic(url, soup)
         
+        # Split one-line addresses (JSON-LD names, page headers) into city/state/zip
+        fill_address_fields(data)
+        
         # Add timestamp
-        from datetime import datetime
         data['extractedAt'] = datetime.now().isoformat()
         data['status'] = 'Active'
         
+        if cache and (data.get('address') or data.get('price')):
+            cache.store(url, source, data)
+        
         print(f"  ✅ Extracted: {data.get('address', 'No address')} - ${data.get('price', 'No price'):,}" if data.get('price') else "  ✅ Extracted")
         
         return data
@@ -452,61 +244,95 @@ def extract_listing(url):
         return None
 
 
+def drop_low_confidence(listing, threshold):
+    """Remove fields scored below threshold; returns the dropped field names"""
+    confidence = listing.get('confidence', {})
+    dropped = [field for field, score in confidence.items() if score < threshold and field in listing]
+    for field in dropped:
+        listing.pop(field)
+        if field == 'address':
+            # city/state/zip were split from the same string
+            for key in ('city', 'state', 'zip'):
+                listing.pop(key, None)
+    return dropped
+
+
 def main():
     """Main function"""
     print("=" * 60)
     print("VDI Realty - Listing Extractor")
     print("=" * 60)
     
-    # Get URLs from command line or file
-    urls = []
-    
-    if len(sys.argv) < 2:
-        print("\n❌ Error: No URLs provided")
-        print("\nUsage:")
-        print("  python extract_listings.py urls.txt              # From file")
-        print("  python extract_listings.py [URL]                 # Single URL")
-        print("  python extract_listings.py [URL1] [URL2] [URL3]  # Multiple URLs")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Extract property data from listing URLs')
+    parser.add_argument('inputs', nargs='+', metavar='URL_OR_FILE', help='Listing URLs, or a file with one URL per line')
+    parser.add_argument('--cache-db', default=str(DEFAULT_DB),
+                        help=f'Backend database holding the shared extraction cache (default: {DEFAULT_DB})')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL_HOURS, help='Hours a new cache entry stays fresh')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached results (still stores new ones)')
+    parser.add_argument('--no-cache', action='store_true', help='Neither read nor write the extraction cache')
+    parser.add_argument('--min-confidence', type=float, default=0.0,
+                        help='Drop fields whose confidence is below this (0-1, default: keep everything)')
+    args = parser.parse_args()
     
     # Check if first argument is a file
-    if Path(sys.argv[1]).exists():
-        print(f"\n📄 Reading URLs from: {sys.argv[1]}")
-        with open(sys.argv[1], 'r') as f:
+    if Path(args.inputs[0]).exists():
+        print(f"\n📄 Reading URLs from: {args.inputs[0]}")
+        with open(args.inputs[0], 'r') as f:
             urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
     else:
         # URLs from command line
-        urls = sys.argv[1:]
+        urls = args.inputs
     
     print(f"\n📊 Processing {len(urls)} URL(s)")
     
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ExtractionCache(args.cache_db, ttl_hours=args.cache_ttl)
+        except Exception as e:
+            print(f"⚠️  Extraction cache unavailable ({e}); fetching every URL")
+    
     # Extract all listings
     listings = []
     for url in urls:
-        data = extract_listing(url)
+        if cache and args.refresh:
+            data = extract_listing(url)
+            if data and (data.get('address') or data.get('price')):
+                cache.store(url, detect_source(url), data)
+        else:
+            data = extract_listing(url, cache)
         if data:
+            dropped = drop_low_confidence(data, args.min_confidence)
+            if dropped:
+                print(f"  🗑️  Dropped low-confidence field(s): {', '.join(dropped)}")
             listings.append(data)
     
+    if cache:
+        stats = cache.stats
+        lookups = stats['hits'] + stats['misses']
+        if lookups:
+            print(f"\n⚡ Extraction cache: {stats['hits']}/{lookups} hit(s) ({stats['hits'] / lookups:.0%}), "
+                  f"{stats['stores']} stored")
+        cache.close()
+    
     # Save results
     if listings:
+        # Approximate coordinates from the offline ZIP table (for radius search)
+        geocoded = attach_coordinates(listings)
+        print(f"\n📍 Geocoded {geocoded} of {len(listings)} listing(s) by ZIP")
+
         output_file = 'extracted_listings.json'
         with open(output_file, 'w') as f:
             json.dump(listings, f, indent=2)
 
-        # Generate listings_import.js for localStorage import
-        js_file = 'listings_import.js'
-        js_code = f"// Auto-generated on {__import__('datetime').datetime.now().isoformat()}\n" + \
-            "// Run this in your browser console or include in your site to import listings into localStorage\n" + \
-            "const listings = " + json.dumps(listings, indent=2) + ";\n" + \
-            "localStorage.setItem('listings', JSON.stringify(listings));\n" + \
-            "console.log('Imported ' + listings.length + ' listings to localStorage.');\n"
-        with open(js_file, 'w') as f:
-            f.write(js_code)
+        # Compact shards by source/city plus the listings_import.js loader (see listing_shards.py)
+        manifest = write_shards(listings)
+        js_file = LOADER_FILE
 
         print("\n" + "=" * 60)
         print(f"✅ SUCCESS! Extracted {len(listings)} listing(s)")
         print(f"📁 Saved to: {output_file}")
-        print(f"📝 JS Import file: {js_file}")
+        print(f"📝 JS Import file: {js_file} ({len(manifest['shards'])} shard(s) in {SHARD_DIR}/)")
         print("=" * 60)
 
         # Show summary
@@ -515,11 +341,16 @@ def main():
             addr = listing.get('address', 'Unknown Address')
             price = f"${listing.get('price', 0):,}" if listing.get('price') else 'No price'
             print(f"  {i}. {addr} - {price}")
+            doubtful = [f"{field} {score:.2f}" for field, score in listing.get('confidence', {}).items()
+                        if score < LOW_CONFIDENCE and field in listing]
+            if doubtful:
+                print(f"     ⚠️  Low confidence: {', '.join(doubtful)}")
 
         print(f"\n💡 Next steps:")
         print(f"  1. Open extracted_listings.json for review")
-        print(f"  2. To import listings, open listings_import.js in your browser console or include it in your site.")
-        print(f"  3. Listings will be available in localStorage for your site.")
+        print(f"  2. Include listings_import.js in your site and call loadListingShards({{ source, city }})")
+        print(f"     to fetch only the shards a page needs (publish {SHARD_DIR}/ next to it).")
+        print(f"  3. Or run importListingShards() in the browser console to copy them into localStorage.")
     else:
         print("\n❌ No listings extracted")
 
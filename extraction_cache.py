@@ -0,0 +1,249 @@
+"""
+VDI Realty - Shared Extraction Cache
+Reads and writes the extraction_cache table in the backend's SQLite database,
+the same table POST /api/fsbo/extract uses (backend/extraction-cache.js). A
+URL extracted by either side is served from the cache to the other until its
+entry expires.
+
+Entries are keyed by canonical URL (https, no www., no tracking parameters,
+sorted query, no trailing slash) and store the listing as a common record:
+address, city, state, zip, price, bedrooms, bathrooms, sqft, description, mls,
+images. canonical_url(), to_record() and fingerprint() must stay identical to
+their JavaScript counterparts.
+
+Usage:
+    python extraction_cache.py                       # Hit-rate stats for backend/fsbo.db
+    python extraction_cache.py --db /app/data/fsbo.db
+    python extraction_cache.py --url "https://www.zillow.com/homedetails/..."
+
+From Python:
+    from extraction_cache import ExtractionCache
+    with ExtractionCache() as cache:
+        record = cache.lookup(url)
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, quote
+
+DEFAULT_DB = Path(os.environ.get('DB_PATH') or Path(__file__).parent / 'backend' / 'fsbo.db')
+DEFAULT_TTL_HOURS = 24
+
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'ref', 'referrer'}
+RECORD_FIELDS = ('address', 'city', 'state', 'zip', 'price', 'bedrooms', 'bathrooms',
+                 'sqft', 'description', 'mls', 'images')
+NUMBER_FIELDS = {'price', 'bedrooms', 'bathrooms', 'sqft'}
+
+# Characters the WHATWG URL parser (used by the backend) leaves unescaped
+PATH_SAFE = "!$%&'()*+,-./:;=?@[\\]^_|~"
+QUERY_SAFE = PATH_SAFE.replace("'", '')
+
+# Keep in sync with initExtractionCache() in backend/database.js
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS extraction_cache (
+        canonicalUrl TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        source TEXT,
+        data TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        extractor TEXT NOT NULL,
+        extractedAt TEXT NOT NULL,
+        changedAt TEXT NOT NULL,
+        expiresAt TEXT NOT NULL,
+        extractions INTEGER NOT NULL DEFAULT 1,
+        hits INTEGER NOT NULL DEFAULT 0,
+        lastHitAt TEXT
+    )
+"""
+
+UPSERT = """
+    INSERT INTO extraction_cache (
+        canonicalUrl, url, source, data, fingerprint, extractor, extractedAt, changedAt, expiresAt
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(canonicalUrl) DO UPDATE SET
+        url = excluded.url, source = excluded.source, data = excluded.data,
+        changedAt = CASE WHEN fingerprint = excluded.fingerprint THEN changedAt ELSE excluded.changedAt END,
+        fingerprint = excluded.fingerprint, extractor = excluded.extractor,
+        extractedAt = excluded.extractedAt, expiresAt = excluded.expiresAt,
+        extractions = extractions + 1
+"""
+
+
+def timestamp(when=None):
+    """UTC time as the backend writes it (Date.toISOString), so strings compare in order"""
+    when = when or datetime.now(timezone.utc)
+    return when.strftime('%Y-%m-%dT%H:%M:%S.') + f"{when.microsecond // 1000:03d}Z"
+
+
+def canonical_url(url):
+    """Cache key for a listing URL: https, bare host, no tracking params, sorted query"""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = quote(parts.path or '/', safe=PATH_SAFE)
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    params = sorted(
+        quote(param, safe=QUERY_SAFE) for param in parts.query.split('&')
+        if param and not _is_tracking_param(param.split('=', 1)[0].lower())
+    )
+    return f"https://{host}{path}" + (f"?{'&'.join(params)}" if params else '')
+
+
+def _is_tracking_param(name):
+    return name.startswith('utm_') or name in TRACKING_PARAMS
+
+
+def _number(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if not isinstance(value, (int, float)):
+        digits = re.sub(r'[^0-9.]', '', str(value))
+        try:
+            value = float(digits)
+        except ValueError:
+            return None
+    return int(value) if float(value).is_integer() else value
+
+
+def to_record(data):
+    """Common cache record from an extractor result (missing/empty values become None)"""
+    record = {}
+    for field in RECORD_FIELDS:
+        value = data.get(field)
+        if field == 'mls' and value is None:
+            value = data.get('mlsNumber')
+        if field in NUMBER_FIELDS:
+            value = _number(value)
+        elif field == 'images':
+            value = [str(image) for image in (value or []) if image]
+        else:
+            value = str(value).strip() if value is not None else ''
+            value = value or None
+        record[field] = value
+    return record
+
+
+def serialize(record):
+    """Stable JSON text (sorted keys, no spaces), byte-identical to the backend's"""
+    return json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def fingerprint(record):
+    """SHA-256 of the serialized record; changes only when the listing content does"""
+    return hashlib.sha256(serialize(record).encode('utf-8')).hexdigest()
+
+
+class ExtractionCache:
+    """Extraction cache backed by the backend's SQLite database"""
+
+    def __init__(self, path=DEFAULT_DB, ttl_hours=DEFAULT_TTL_HOURS, extractor='python'):
+        self.path = Path(path)
+        self.ttl = timedelta(hours=ttl_hours)
+        self.extractor = extractor
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The backend may hold the database open; wait out its writes
+        self.conn = sqlite3.connect(self.path, timeout=10)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def lookup(self, url):
+        """Fresh cached record for url (counted as a hit), else None"""
+        key = canonical_url(url)
+        now = timestamp()
+        row = self.conn.execute(
+            'SELECT data FROM extraction_cache WHERE canonicalUrl = ? AND expiresAt > ?', (key, now)
+        ).fetchone()
+        if not row:
+            self.stats['misses'] += 1
+            return None
+        self.conn.execute('UPDATE extraction_cache SET hits = hits + 1, lastHitAt = ? WHERE canonicalUrl = ?',
+                          (now, key))
+        self.conn.commit()
+        self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def store(self, url, source, data):
+        """Save an extraction result; returns its record"""
+        record = to_record(data)
+        now = datetime.now(timezone.utc)
+        self.conn.execute(UPSERT, (canonical_url(url), url, source, serialize(record), fingerprint(record),
+                                   self.extractor, timestamp(now), timestamp(now), timestamp(now + self.ttl)))
+        self.conn.commit()
+        self.stats['stores'] += 1
+        return record
+
+    def summary(self):
+        """Shared totals across both extractors (hit rate = hits / (hits + extractions))"""
+        entries, fresh, hits, extractions = self.conn.execute(
+            'SELECT COUNT(*), COUNT(CASE WHEN expiresAt > ? THEN 1 END), '
+            'COALESCE(SUM(hits), 0), COALESCE(SUM(extractions), 0) FROM extraction_cache',
+            (timestamp(),)
+        ).fetchone()
+        by_extractor = {
+            extractor: {'entries': count, 'hits': extractor_hits}
+            for extractor, count, extractor_hits in self.conn.execute(
+                'SELECT extractor, COUNT(*), SUM(hits) FROM extraction_cache GROUP BY extractor')
+        }
+        lookups = hits + extractions
+        return {'entries': entries, 'fresh': fresh, 'hits': hits, 'extractions': extractions,
+                'hitRate': round(hits / lookups, 3) if lookups else None, 'byExtractor': by_extractor}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the shared extraction cache')
+    parser.add_argument('--db', default=str(DEFAULT_DB), help=f'Backend SQLite database (default: {DEFAULT_DB})')
+    parser.add_argument('--url', help='Show the cached record for this listing URL')
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"❌ Database not found: {args.db}")
+        return 1
+
+    with ExtractionCache(args.db) as cache:
+        if args.url:
+            print(f"🔑 {canonical_url(args.url)}")
+            row = cache.conn.execute(
+                'SELECT data, extractor, extractedAt, expiresAt, hits FROM extraction_cache WHERE canonicalUrl = ?',
+                (canonical_url(args.url),)
+            ).fetchone()
+            if not row:
+                print("❌ Not cached")
+                return 1
+            data, extractor, extracted_at, expires_at, hits = row
+            print(f"📦 Extracted by {extractor} at {extracted_at}, expires {expires_at}, {hits} hit(s)")
+            print(json.dumps(json.loads(data), indent=2))
+            return 0
+
+        summary = cache.summary()
+        print(f"📦 {summary['entries']} cached URL(s), {summary['fresh']} fresh")
+        rate = f"{summary['hitRate']:.1%}" if summary['hitRate'] is not None else 'n/a'
+        print(f"🎯 Hit rate: {rate} ({summary['hits']} hit(s), {summary['extractions']} extraction(s))")
+        for extractor, counts in summary['byExtractor'].items():
+            print(f"   {extractor}: {counts['entries']} entries, {counts['hits']} hit(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+VDI Realty - Offline ZIP Geocoder
+Attaches approximate coordinates to listings from a local ZIP-centroid table
+(no network calls). Every listing in a ZIP gets the same point, which is
+plenty for "homes within N miles" searches.
+
+The bundled table, backend/data/zip_centroids.csv (zip,city,lat,lon), covers
+the Puget Sound ZIPs we list in. For wider coverage, point --centroids (or
+the backend's ZIP_CENTROIDS_FILE) at the US Census ZCTA Gazetteer file
+(2020_Gaz_zcta_national.txt); both formats are read.
+
+Usage:
+    python geocode.py extracted_listings.json          # Adds lat/lon in place
+    python geocode.py listings.json --centroids 2020_Gaz_zcta_national.txt
+
+From Python:
+    from geocode import attach_coordinates
+    attach_coordinates(listings)
+"""
+
+import re
+import sys
+import csv
+import json
+import math
+import argparse
+from functools import lru_cache
+from pathlib import Path
+
+CENTROIDS_FILE = Path(__file__).parent / 'backend' / 'data' / 'zip_centroids.csv'
+EARTH_RADIUS_MILES = 3958.8
+
+ZIP_PATTERN = re.compile(r'\b(\d{5})(?:-\d{4})?\b')
+
+
+@lru_cache(maxsize=4)
+def load_centroids(path=CENTROIDS_FILE):
+    """Read {zip: (lat, lon)} from zip,lat,lon CSV or the Census Gazetteer (tab separated)"""
+    centroids = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        first_line = f.readline()
+        delimiter = '\t' if '\t' in first_line else ','
+        f.seek(0)
+        for row in csv.DictReader(f, delimiter=delimiter):
+            row = {key.strip(): value for key, value in row.items() if key}
+            zip_code = row.get('zip') or row.get('GEOID')
+            lat = row.get('lat') or row.get('INTPTLAT')
+            lon = row.get('lon') or row.get('INTPTLONG')
+            if zip_code and lat and lon:
+                centroids[zip_code.strip().zfill(5)] = (float(lat), float(lon))
+    return centroids
+
+
+def listing_zip(listing):
+    """ZIP from the zip/zipCode field, else the last 5-digit number in the address"""
+    for value in (listing.get('zip'), listing.get('zipCode')):
+        match = ZIP_PATTERN.search(str(value or ''))
+        if match:
+            return match.group(1)
+    matches = ZIP_PATTERN.findall(str(listing.get('address') or ''))
+    return matches[-1] if matches else None
+
+
+def geocode(listing, centroids=None):
+    """(lat, lon) for a listing, or None if its ZIP is unknown"""
+    zip_code = listing_zip(listing)
+    return (centroids or load_centroids()).get(zip_code) if zip_code else None
+
+
+def attach_coordinates(listings, centroids=None):
+    """Set lat/lon on listings that lack them; returns how many were geocoded"""
+    centroids = centroids or load_centroids()
+    count = 0
+    for listing in listings:
+        if listing.get('lat') is not None and listing.get('lon') is not None:
+            continue
+        point = geocode(listing, centroids)
+        if point:
+            listing['lat'], listing['lon'] = point
+            count += 1
+    return count
+
+
+def distance_miles(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance in miles"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add lat/lon to listings from ZIP centroids (offline)')
+    parser.add_argument('input', help='JSON file with a list of listings (updated in place)')
+    parser.add_argument('--centroids', default=str(CENTROIDS_FILE), help='ZIP centroid table')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        listings = json.load(f)
+
+    count = attach_coordinates(listings, load_centroids(args.centroids))
+    missing = sum(1 for listing in listings if listing.get('lat') is None)
+
+    with open(args.input, 'w', encoding='utf-8') as f:
+        json.dump(listings, f, indent=2)
+
+    print(f"📍 Geocoded {count} listing(s) in {args.input}")
+    if missing:
+        print(f"⚠️  {missing} listing(s) have no known ZIP")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
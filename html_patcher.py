@@ -0,0 +1,92 @@
+"""
+VDI Realty - HTML Stat Patcher
+Replaces the text of elements identified by their id attribute, e.g.
+
+    <span class="local-stat-num" id="medianPrice">$540k</span>
+
+All requested ids on a page are located in a single regex pass over the file,
+and the page is rewritten atomically (temp file + rename) only when its
+content actually changed. Target elements must not contain a nested element
+with the same tag name (stat spans, strongs and small divs are fine).
+
+Usage (from Python):
+    from html_patcher import patch_files
+    patch_files({'index.html': {'medianPrice': '$560k', 'activeListings': 162}})
+"""
+
+import os
+import re
+import html
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+
+
+@lru_cache(maxsize=32)
+def _pattern(ids):
+    """One compiled regex matching any element whose id is in ids"""
+    alternatives = '|'.join(re.escape(element_id) for element_id in ids)
+    return re.compile(
+        r'(?P<open><(?P<tag>[a-zA-Z][\w-]*)\b[^>]*?\bid=["\'](?P<id>' + alternatives + r')["\'][^>]*>)'
+        r'(?P<body>.*?)'
+        r'(?P<close></(?P=tag)\s*>)',
+        re.DOTALL
+    )
+
+
+def patch_html(content, values):
+    """Return (new_content, found_ids) with each id's element text replaced"""
+    if not values:
+        return content, set()
+    found = set()
+
+    def replace(match):
+        element_id = match.group('id')
+        found.add(element_id)
+        text = html.escape(str(values[element_id]), quote=False)
+        return f"{match.group('open')}{text}{match.group('close')}"
+
+    pattern = _pattern(tuple(sorted(values)))
+    return pattern.sub(replace, content), found
+
+
+def write_if_changed(path, content):
+    """Atomically replace path with content; returns False if nothing changed"""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if f.read() == content:
+            return False
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+def patch_files(pages, base_dir=BASE_DIR):
+    """
+    Patch several pages in one run. pages maps file name -> {element id: text}.
+    Returns {file name: {'changed': bool, 'missing': [ids not found]}}.
+    """
+    results = {}
+    for html_file, values in pages.items():
+        path = Path(base_dir) / html_file
+        if not path.exists():
+            print(f"Error: {html_file} not found!")
+            results[html_file] = {'changed': False, 'missing': sorted(values)}
+            continue
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        patched, found = patch_html(content, values)
+        changed = patched != content and write_if_changed(path, patched)
+        results[html_file] = {'changed': changed, 'missing': sorted(set(values) - found)}
+    return results
@@ -0,0 +1,84 @@
+"""
+VDI Realty - Index Extracted Listings for Search
+
+Uploads extract_listings.py output (extracted_listings.json) to the backend's
+extracted_listings table, which feeds the same full-text index as FSBO and
+partner listings, so GET /api/fsbo/search covers both. Listings are matched
+on sourceUrl, so re-running after a new extraction updates them in place.
+
+Usage:
+    python index_extracted_listings.py                            # extracted_listings.json
+    python index_extracted_listings.py my_listings.json --api http://localhost:3000
+    ADMIN_PASSWORD=... python index_extracted_listings.py
+
+Then search, e.g.:
+    curl "http://localhost:3000/api/fsbo/search?q=view+hardwood&city=Seattle"
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import requests
+
+API_BASE_URL = 'https://api.vdirealty.com'
+EXTRACTED_FILE = 'extracted_listings.json'
+BATCH_SIZE = 250
+
+
+def index_listings(listings, api_base, admin_password, batch_size=BATCH_SIZE):
+    """POST listings in batches; returns (imported, errors)"""
+    imported, errors = 0, []
+    with requests.Session() as session:
+        session.headers['Authorization'] = admin_password
+        for start in range(0, len(listings), batch_size):
+            batch = listings[start:start + batch_size]
+            response = session.post(f"{api_base}/api/fsbo/admin/extracted-listings",
+                                    json={'listings': batch}, timeout=120)
+            data = response.json() if response.text else {}
+            if not response.ok:
+                errors.append(f"batch {start}-{start + len(batch) - 1}: {data.get('error') or response.status_code}")
+                continue
+            imported += data['imported']
+            errors += [f"#{start + item['index']}: {item['error']}" for item in data['errors']]
+    return imported, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add extracted listings to the backend search index')
+    parser.add_argument('input', nargs='?', default=EXTRACTED_FILE, help=f'Extractor output (default: {EXTRACTED_FILE})')
+    parser.add_argument('--api', default=API_BASE_URL, help=f'API base URL (default: {API_BASE_URL})')
+    parser.add_argument('--password', default=os.environ.get('ADMIN_PASSWORD'),
+                        help='Admin password (default: $ADMIN_PASSWORD)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Index Extracted Listings")
+    print("=" * 60)
+
+    if not args.password:
+        print("\n❌ Admin password required (--password or ADMIN_PASSWORD)")
+        return 1
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        listings = json.load(f)
+    listings = [l for l in listings if l.get('sourceUrl')]
+    print(f"\n📄 {len(listings)} listing(s) with a sourceUrl in {args.input}")
+    if not listings:
+        return 1
+
+    try:
+        imported, errors = index_listings(listings, args.api, args.password)
+    except requests.exceptions.RequestException as e:
+        print(f"\n❌ Error contacting {args.api}: {e}")
+        return 1
+
+    print(f"\n✅ Indexed {imported} listing(s)")
+    for error in errors[:20]:
+        print(f"   ❌ {error}")
+    return 0 if not errors else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,11 @@
  */
 const CONFIG = {
     // API_BASE_URL: 'http://localhost:3000' // Uncomment for local development
-    API_BASE_URL: 'https://api.vdirealty.com' // AWS EC2 backend with SSL (migration from Railway completed Feb 13, 2026)
+    API_BASE_URL: 'https://api.vdirealty.com', // AWS EC2 backend with SSL (migration from Railway completed Feb 13, 2026)
+
+    // Static listing feeds (backend/feed-export.js). Use 'feeds' to load the
+    // copies export_feeds.py mirrors into this site instead of the backend's.
+    FEED_BASE_URL: 'https://api.vdirealty.com/feeds'
 };
 
 // Prevent modification
@@ -15,3 +19,4 @@ Object.freeze(CONFIG);
 
 // Export for use in HTML files
 const API_BASE_URL = CONFIG.API_BASE_URL;
+const FEED_BASE_URL = CONFIG.FEED_BASE_URL;
@@ -0,0 +1,51 @@
+/**
+ * Static listing feeds for VDI Realty
+ *
+ * The backend (backend/feed-export.js) writes every active listing, one feed
+ * per listing source, extracted listings and market data as content-hashed
+ * JSON files listed in manifest.json. Hashed files never change, so the
+ * browser caches them for good and only revalidates the small manifest.
+ *
+ * Requires js/config.js (FEED_BASE_URL).
+ */
+
+let feedManifest = null;
+
+// manifest.json names the current file of each feed
+async function loadFeedManifest() {
+    if (!feedManifest) {
+        feedManifest = fetch(`${FEED_BASE_URL}/manifest.json`, {
+            cache: 'no-cache',
+            signal: AbortSignal.timeout(5000)
+        }).then(response => {
+            if (!response.ok) throw new Error(`manifest returned ${response.status}`);
+            return response.json();
+        }).catch(error => {
+            feedManifest = null;
+            throw error;
+        });
+    }
+    return feedManifest;
+}
+
+/**
+ * Load a feed by name ('listings', 'listings-fsbo', 'listings-partner',
+ * 'extracted', 'market'). Listing feeds resolve to an array of listings in the
+ * same shape as GET /api/fsbo/listings; returns null if the feed is unavailable
+ * so callers can fall back to the API.
+ */
+async function loadFeed(name) {
+    try {
+        const manifest = await loadFeedManifest();
+        const feed = manifest.feeds && manifest.feeds[name];
+        if (!feed) return null;
+        
+        const response = await fetch(`${FEED_BASE_URL}/${feed.file}`, { signal: AbortSignal.timeout(10000) });
+        if (!response.ok) return null;
+        const data = await response.json();
+        return Array.isArray(data.listings) ? data.listings : data;
+    } catch (error) {
+        console.log(`⚠️ Feed ${name} unavailable:`, error.message);
+        return null;
+    }
+}
@@ -0,0 +1,203 @@
+"""
+VDI Realty - Listing Field Candidates
+Collects every value the extractors find for a field (JSON-LD, CSS selectors,
+patterns in the JSON-LD description, patterns in the page text) and picks the
+best one with a confidence score instead of keeping the first hit.
+
+A candidate's score is its strategy's reliability, cut sharply when the value
+is outside the field's plausible range and, for page-text prices, when the
+words around it say it's a monthly payment, tax or HOA amount rather than the
+list price. Candidates with the same value add up across strategies
+(1 - product of misses), so agreement raises confidence and a close rival
+value lowers it. Addresses are compared by their street part, so a page
+header "123 Main St" backs JSON-LD "123 Main St Seattle WA 98101" instead of
+competing with it; the group keeps the value from the most trusted strategy.
+
+From Python:
+    from listing_candidates import FieldCandidates
+    candidates = FieldCandidates()
+    candidates.add_json_ld(json_ld)
+    candidates.add_selectors(soup, {'price': ['span.price']})
+    candidates.add_text(soup.get_text(' '))
+    values, confidence = candidates.resolve()
+"""
+
+import re
+from collections import defaultdict
+
+from address_parser import parse_address
+
+# How far a value from each strategy is trusted on its own
+STRATEGY_SCORES = {
+    'json-ld': 0.85,
+    'selector': 0.7,
+    'description': 0.5,
+    'text': 0.3
+}
+
+# Plausible ranges; values outside keep 5% of their score
+PLAUSIBLE = {
+    'price': (10000, 100000000),
+    'bedrooms': (0, 20),
+    'bathrooms': (0, 20),
+    'sqft': (100, 50000)
+}
+IMPLAUSIBLE_FACTOR = 0.05
+NUMBER_FIELDS = {'price', 'bedrooms', 'bathrooms', 'sqft'}
+MAX_IMAGES = 5
+
+TEXT_PATTERNS = {
+    'price': re.compile(r'\$\s*([\d,]+(?:\.\d{2})?)(?!\d)'),
+    'bedrooms': re.compile(r'(\d+)\s+(?:Bed(?:room)?s?|BR)\b', re.I),
+    'bathrooms': re.compile(r'(\d+(?:\.\d+)?)\s+(?:Bath(?:room)?s?|BA)\b', re.I),
+    'sqft': re.compile(r'([\d,]+)\s+(?:Sq\.?\s*Ft|Square\s+Feet|sqft)\b', re.I)
+}
+CONTEXT_CHARS = 40
+# Words near a page-text price that mean it isn't the list price (mortgage estimates etc.)
+NOT_LIST_PRICE = re.compile(
+    r'/\s*mo\b|\bper month\b|\bmonthly\b|\bmortgage\b|\bpayment\b|\bestimate|\bhoa\b|\btax(es)?\b|'
+    r'\binsurance\b|\brent\b|\bdown\b|\bsave\b|\breduced by\b|\bprice cut\b|\bzestimate\b|\bsold for\b',
+    re.I
+)
+LIST_PRICE = re.compile(r'\b(?:list(?:ed|ing)? price|asking|offered at|price)\b', re.I)
+
+
+def clean_number(text):
+    """Extract number from text"""
+    if not text:
+        return None
+    # Remove everything except digits, decimal point, and commas
+    cleaned = re.sub(r'[^\d.,]', '', str(text))
+    cleaned = cleaned.replace(',', '')
+    try:
+        if '.' in cleaned:
+            return float(cleaned)
+        return int(cleaned)
+    except ValueError:
+        return None
+
+
+def normalized(field, value):
+    """Key under which equal values from different strategies are grouped"""
+    if field in NUMBER_FIELDS:
+        return float(value)
+    if isinstance(value, list):
+        return tuple(value)
+    if field == 'address':
+        # "123 Main St" and "123 Main St Seattle WA 98101" name the same place
+        value = parse_address(value).address or value
+    # "123 Main St, Seattle" and "123 Main St Seattle" agree
+    return re.sub(r'[^a-z0-9]', '', str(value).lower())
+
+
+class FieldCandidates:
+    """Values found for each field, with the strategy that found them"""
+
+    def __init__(self):
+        self.candidates = defaultdict(list)   # field -> [(value, strategy, score)]
+
+    def add(self, field, value, strategy, context=''):
+        if value in (None, '', []):
+            return
+        if field in NUMBER_FIELDS:
+            value = value if isinstance(value, (int, float)) else clean_number(value)
+            if value is None:
+                return
+            if field in ('price', 'sqft', 'bedrooms'):
+                value = int(value)
+        elif isinstance(value, str):
+            value = value.strip()
+            if not value:
+                return
+        self.candidates[field].append((value, strategy, self.score(field, value, strategy, context)))
+
+    @staticmethod
+    def score(field, value, strategy, context=''):
+        score = STRATEGY_SCORES[strategy]
+        low, high = PLAUSIBLE.get(field, (None, None))
+        if low is not None and not low <= value <= high:
+            score *= IMPLAUSIBLE_FACTOR
+        if field == 'address' and not (5 < len(value) < 200 and re.search(r'\d', value)):
+            score *= 0.5
+        if field == 'price' and context:
+            if NOT_LIST_PRICE.search(context):
+                score *= 0.2
+            elif LIST_PRICE.search(context):
+                score = min(1.0, score * 1.5)
+        return score
+
+    def add_json_ld(self, json_ld):
+        """Structured data: name, offers/price, description, rooms, floor size, images"""
+        if not json_ld:
+            return
+        self.add('address', json_ld.get('name'), 'json-ld')
+        offers = json_ld.get('offers')
+        if isinstance(offers, dict):
+            self.add('price', offers.get('price'), 'json-ld')
+        self.add('price', json_ld.get('price'), 'json-ld')
+        self.add('bedrooms', json_ld.get('numberOfBedrooms'), 'json-ld')
+        self.add('bathrooms', json_ld.get('numberOfBathroomsTotal'), 'json-ld')
+        floor_size = json_ld.get('floorSize')
+        self.add('sqft', floor_size.get('value') if isinstance(floor_size, dict) else floor_size, 'json-ld')
+
+        description = json_ld.get('description')
+        if isinstance(description, str):
+            self.add('description', description, 'json-ld')
+            self.add_text(description, strategy='description', fields=('bedrooms', 'bathrooms', 'sqft'))
+
+        images = json_ld.get('image')
+        if isinstance(images, str):
+            images = [images]
+        if isinstance(images, list):
+            self.add('images', [image for image in images if isinstance(image, str)][:MAX_IMAGES], 'json-ld')
+
+    def add_selectors(self, soup, selectors):
+        """Every matching selector (not just the first), e.g. {'price': ['span.price', ...]}"""
+        for field, field_selectors in selectors.items():
+            for selector in field_selectors:
+                elem = soup.select_one(selector)
+                if elem:
+                    self.add(field, elem.get_text(strip=True), 'selector')
+
+    def add_text(self, text, strategy='text', fields=tuple(TEXT_PATTERNS)):
+        """Every pattern match in free text, with the words around it"""
+        for field in fields:
+            for match in TEXT_PATTERNS[field].finditer(text):
+                context = text[max(0, match.start() - CONTEXT_CHARS):match.end() + CONTEXT_CHARS]
+                self.add(field, match.group(1), strategy, context)
+
+    def best(self, field):
+        """(value, confidence) for a field, or (None, 0.0) if nothing was found"""
+        groups = {}
+        for value, strategy, score in self.candidates.get(field, []):
+            group = groups.setdefault(normalized(field, value), {'value': value, 'score': score, 'strategies': {}})
+            # Keep the most trusted wording (the full JSON-LD address over a bare street header)
+            if score > group['score']:
+                group['value'], group['score'] = value, score
+            # Repeats within one strategy (a price printed five times) don't add up
+            group['strategies'][strategy] = max(score, group['strategies'].get(strategy, 0.0))
+
+        if not groups:
+            return None, 0.0
+        ranked = []
+        for group in groups.values():
+            miss = 1.0
+            for score in group['strategies'].values():
+                miss *= 1.0 - score
+            ranked.append((1.0 - miss, group['value']))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        best_score, value = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        confidence = best_score * best_score / (best_score + runner_up)
+        return value, round(confidence, 2)
+
+    def resolve(self):
+        """({field: best value}, {field: confidence}) for every field with a candidate"""
+        values, confidence = {}, {}
+        for field in self.candidates:
+            value, score = self.best(field)
+            if value is not None:
+                values[field] = value
+                confidence[field] = score
+        return values, confidence
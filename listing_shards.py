@@ -0,0 +1,140 @@
+"""
+VDI Realty - Sharded Listing Import
+Writes extracted listings as compact JSON shards, one per source and city
+(split further past MAX_SHARD_LISTINGS), plus listings_import.js: a small
+loader holding the shard manifest. A page includes the loader and fetches only
+the shards it needs with loadListingShards({ source, city }) instead of
+parsing every listing and copying them all into localStorage.
+
+Shard files are named <source>--<city>.<hash>.json, so they can be cached
+for good; shards that are no longer in the manifest are removed.
+
+Usage:
+    python listing_shards.py                                # Shard extracted_listings.json
+    python listing_shards.py listings.json --out listings_import --max-shard 250
+
+From Python:
+    from listing_shards import write_shards
+    manifest = write_shards(listings)
+"""
+
+import re
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+SHARD_DIR = 'listings_import'
+LOADER_FILE = 'listings_import.js'
+MAX_SHARD_LISTINGS = 500
+SHARD_FILE = re.compile(r'^[a-z0-9-]+\.[0-9a-f]{12}\.json$')
+
+LOADER_TEMPLATE = """// Auto-generated on {generated_at} by extract_listings.py
+// Listings are split into compact shards by source and city ({shard_dir}/).
+// Include this file and call loadListingShards({{ source, city }}) to fetch only
+// the shards a page needs; importListingShards() copies them into localStorage.
+const LISTING_SHARDS = {manifest};
+
+const LISTING_SHARD_BASE = new URL('{shard_dir}/', document.currentScript ? document.currentScript.src : location.href).href;
+
+// filter: {{ source, city }} as strings or arrays (case-insensitive); omitted keys match every shard
+async function loadListingShards(filter = {{}}) {{
+    const wanted = (value) => value === undefined ? null : [].concat(value).map(item => String(item).toLowerCase());
+    const sources = wanted(filter.source);
+    const cities = wanted(filter.city);
+    const shards = LISTING_SHARDS.shards.filter(shard =>
+        (!sources || sources.includes(shard.source.toLowerCase())) &&
+        (!cities || cities.includes(shard.city.toLowerCase())));
+    const parts = await Promise.all(shards.map(shard =>
+        fetch(LISTING_SHARD_BASE + shard.file).then(response => response.ok ? response.json() : [])));
+    return parts.flat();
+}}
+
+// Console import (previous listings_import.js behavior), limited to the filtered shards
+async function importListingShards(filter = {{}}) {{
+    const listings = await loadListingShards(filter);
+    try {{
+        localStorage.setItem('listings', JSON.stringify(listings));
+        console.log('Imported ' + listings.length + ' listings to localStorage.');
+    }} catch (e) {{
+        console.error('localStorage is full; import fewer shards (filter by source or city).', e);
+    }}
+    return listings;
+}}
+"""
+
+
+def slug(value):
+    return re.sub(r'[^a-z0-9]+', '-', str(value or '').lower()).strip('-') or 'unknown'
+
+
+def compact_json(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def build_shards(listings, max_listings=MAX_SHARD_LISTINGS):
+    """Group listings by (source, city); returns [(source, city, part, listings)] in a stable order"""
+    groups = {}
+    for listing in listings:
+        key = (listing.get('source') or 'Unknown', (listing.get('city') or '').strip())
+        groups.setdefault(key, []).append(listing)
+
+    shards = []
+    for (source, city), group in sorted(groups.items(), key=lambda item: (slug(item[0][0]), slug(item[0][1]))):
+        for start in range(0, len(group), max_listings):
+            shards.append((source, city, start // max_listings + 1, group[start:start + max_listings]))
+    return shards
+
+
+def write_shards(listings, out_dir=SHARD_DIR, loader_file=LOADER_FILE, max_listings=MAX_SHARD_LISTINGS):
+    """Write shard files and the loader; returns the manifest"""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    manifest = {'generatedAt': datetime.now().isoformat(), 'total': len(listings), 'shards': []}
+    for source, city, part, group in build_shards(listings, max_listings):
+        body = compact_json(group).encode('utf-8')
+        name = f"{slug(source)}--{slug(city)}" + (f"-{part}" if part > 1 else '')
+        filename = f"{name}.{hashlib.sha256(body).hexdigest()[:12]}.json"
+        (out / filename).write_bytes(body)
+        manifest['shards'].append({'file': filename, 'source': source, 'city': city,
+                                   'count': len(group), 'bytes': len(body)})
+
+    current = {shard['file'] for shard in manifest['shards']}
+    for path in out.glob('*.json'):
+        if SHARD_FILE.match(path.name) and path.name not in current:
+            path.unlink()
+
+    Path(loader_file).write_text(LOADER_TEMPLATE.format(
+        generated_at=manifest['generatedAt'],
+        shard_dir=out.name,
+        manifest=compact_json(manifest)
+    ), encoding='utf-8')
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write extracted listings as shards plus the listings_import.js loader')
+    parser.add_argument('input', nargs='?', default='extracted_listings.json', help='Listings JSON (default: extracted_listings.json)')
+    parser.add_argument('--out', default=SHARD_DIR, help=f'Shard directory (default: {SHARD_DIR})')
+    parser.add_argument('--loader', default=LOADER_FILE, help=f'Loader script (default: {LOADER_FILE})')
+    parser.add_argument('--max-shard', type=int, default=MAX_SHARD_LISTINGS,
+                        help=f'Listings per shard before a city is split (default: {MAX_SHARD_LISTINGS})')
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        listings = json.load(f)
+
+    manifest = write_shards(listings, args.out, args.loader, args.max_shard)
+    total_bytes = sum(shard['bytes'] for shard in manifest['shards'])
+    largest = max((shard['bytes'] for shard in manifest['shards']), default=0)
+    print(f"✅ {len(listings)} listing(s) in {len(manifest['shards'])} shard(s) under {args.out}/ "
+          f"({total_bytes / 1024:,.1f} KB total, largest {largest / 1024:,.1f} KB)")
+    print(f"📝 Loader: {args.loader}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+VDI Realty - Listing API Load Test
+
+Runs a mix of listing API calls (submit, list, get, contact, delete) from many
+concurrent virtual users at a target request rate, then reports throughput,
+error rates and latency percentiles per operation.
+
+By default it starts its own backend on a throwaway database (see
+local_backend.py), with email going to an in-process SMTP stand-in, and seeds
+it with --seed listings, so nothing touches production. --api can point at
+a backend you already run locally. Only localhost is accepted, and the
+listings the test created are deleted afterwards.
+
+Latency is measured from when each request was scheduled, so a server that
+falls behind the target rate shows up in the percentiles instead of quietly
+lowering the request rate (coordinated omission). "service" percentiles
+measure from when the request was actually sent.
+
+Usage:
+    python load_test.py                                  # 20 users, 50 req/s for 30s
+    python load_test.py --users 50 --rate 200 --duration 60
+    python load_test.py --mix list=50,get=30,submit=10,contact=5,delete=5
+    python load_test.py --rate 0                         # As fast as the users can go
+    python load_test.py --api http://localhost:3000 --admin-password ...
+    python load_test.py --json load_results.json
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from local_backend import ADMIN_PASSWORD, CITIES, start_backend, seed_listings, make_listing, latency_stats
+from local_smtp import start_smtp, backend_env
+
+DEFAULT_MIX = 'list=55,get=25,submit=10,contact=5,delete=5'
+OPERATIONS = ('submit', 'list', 'get', 'contact', 'delete')
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1'}
+
+
+def parse_mix(text):
+    """'list=60,get=40' -> {'list': 60.0, 'get': 40.0}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('Mix has no weight')
+    return mix
+
+
+class LoadTest:
+    """Shared state for one run: target API, listing IDs in play and recorded samples"""
+
+    def __init__(self, api_url, admin_password, seeded_ids, mix, users):
+        self.api_url = api_url
+        self.admin_password = admin_password
+        self.seeded_ids = list(seeded_ids)
+        self.created_ids = []   # Submitted by this run, not yet deleted
+        self.deleted_ids = []
+        self.mix = mix
+        self.users = users
+        self.samples = {name: [] for name in OPERATIONS}  # (scheduled latency, service latency, ok, status)
+        self.lock = threading.Lock()
+        self.sequence = 0
+
+    def make_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount('http://', adapter)
+        return session
+
+    def pick_operation(self, rng):
+        names = list(self.mix)
+        return rng.choices(names, weights=[self.mix[name] for name in names])[0]
+
+    def next_listing_number(self):
+        with self.lock:
+            self.sequence += 1
+            return 1_000_000 + self.sequence
+
+    def random_listing_id(self, rng):
+        with self.lock:
+            pool = self.seeded_ids + self.created_ids
+        return rng.choice(pool) if pool else None
+
+    # Each operation returns the response (or None if it could not run)
+    def do_submit(self, session, rng):
+        listing = make_listing(self.next_listing_number(), photos=2, firstName='Load', lastName='Test')
+        response = session.post(f"{self.api_url}/api/fsbo/submit", json=listing, timeout=30)
+        if response.ok:
+            with self.lock:
+                self.created_ids.append(response.json()['listingId'])
+        return response
+
+    def do_list(self, session, rng):
+        params = {'limit': rng.choice([20, 50, 100])}
+        filter_kind = rng.random()
+        if filter_kind < 0.3:
+            params['city'] = rng.choice(CITIES)[0]
+        elif filter_kind < 0.5:
+            params['minPrice'] = rng.choice([300000, 600000, 900000])
+        elif filter_kind < 0.6:
+            params['source'] = 'fsbo'
+        return session.get(f"{self.api_url}/api/fsbo/listings", params=params, timeout=30)
+
+    def do_get(self, session, rng):
+        listing_id = self.random_listing_id(rng)
+        if listing_id is None:
+            return None
+        return session.get(f"{self.api_url}/api/fsbo/listing/{listing_id}", timeout=30)
+
+    def do_contact(self, session, rng):
+        listing_id = self.random_listing_id(rng)
+        if listing_id is None:
+            return None
+        inquiry = {'name': 'Load Test Buyer', 'email': 'buyer@example.com', 'phone': '(206) 555-0199',
+                   'message': 'Is this home still available? (load test)'}
+        return session.post(f"{self.api_url}/api/fsbo/contact/{listing_id}", json=inquiry, timeout=30)
+
+    def do_delete(self, session, rng):
+        # Only listings this run submitted are deleted, so the seeded set stays stable
+        with self.lock:
+            if not self.created_ids:
+                return None
+            listing_id = self.created_ids.pop(rng.randrange(len(self.created_ids)))
+        response = session.delete(f"{self.api_url}/api/fsbo/listing/{listing_id}",
+                                  headers={'Authorization': self.admin_password}, timeout=30)
+        with self.lock:
+            (self.deleted_ids if response.ok else self.created_ids).append(listing_id)
+        return response
+
+    def record(self, name, scheduled_at, sent_at, response, error=None):
+        done = time.perf_counter()
+        ok = error is None and response is not None and response.ok
+        status = response.status_code if response is not None else (error or 'skipped')
+        with self.lock:
+            self.samples[name].append((done - scheduled_at, done - sent_at, ok, status))
+
+    def user(self, user_index, started, rate, stop_at, next_slot):
+        """One virtual user: take the next schedule slot, wait for it, run a random operation"""
+        rng = random.Random(user_index)
+        with self.make_session() as session:
+            while True:
+                if rate > 0:
+                    slot = next_slot()
+                    scheduled_at = started + slot / rate
+                    if scheduled_at >= stop_at:
+                        return
+                    delay = scheduled_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    scheduled_at = time.perf_counter()
+                    if scheduled_at >= stop_at:
+                        return
+
+                name = self.pick_operation(rng)
+                sent_at = time.perf_counter()
+                try:
+                    response = getattr(self, f"do_{name}")(session, rng)
+                except requests.exceptions.RequestException as e:
+                    self.record(name, scheduled_at, sent_at, None, type(e).__name__)
+                    continue
+                if response is not None:
+                    response.content
+                    self.record(name, scheduled_at, sent_at, response)
+
+    def run(self, rate, duration):
+        """Run every virtual user until duration has passed; returns elapsed seconds"""
+        counter = itertools.count()
+        counter_lock = threading.Lock()
+
+        def next_slot():
+            with counter_lock:
+                return next(counter)
+
+        started = time.perf_counter()
+        stop_at = started + duration
+        threads = [threading.Thread(target=self.user, args=(i, started, rate, stop_at, next_slot))
+                   for i in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def cleanup(self):
+        """Delete every listing this run submitted and has not deleted yet"""
+        with self.make_session() as session:
+            for listing_id in list(self.created_ids):
+                response = session.delete(f"{self.api_url}/api/fsbo/listing/{listing_id}",
+                                          headers={'Authorization': self.admin_password}, timeout=30)
+                if response.ok:
+                    self.created_ids.remove(listing_id)
+                    self.deleted_ids.append(listing_id)
+
+    def report(self, elapsed):
+        """Per-operation and overall summary"""
+        def summarize(samples):
+            scheduled = latency_stats([s[0] for s in samples])
+            service = latency_stats([s[1] for s in samples])
+            errors = [s for s in samples if not s[2]]
+            statuses = {}
+            for sample in errors:
+                statuses[str(sample[3])] = statuses.get(str(sample[3]), 0) + 1
+            return {'count': len(samples), 'rps': len(samples) / elapsed,
+                    'errorRate': len(errors) / len(samples) if samples else 0.0, 'errors': statuses,
+                    'latencyMs': {k: scheduled[k] for k in ('p50', 'p95', 'p99', 'max')} if samples else {},
+                    'serviceMs': {k: service[k] for k in ('p50', 'p95', 'p99')} if samples else {}}
+
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        return {'elapsedSeconds': elapsed,
+                'overall': summarize(everything),
+                'operations': {name: summarize(samples) for name, samples in self.samples.items() if samples}}
+
+
+def print_report(report, target_rate):
+    overall = report['overall']
+    print(f"\n📊 {overall['count']} requests in {report['elapsedSeconds']:.1f}s = {overall['rps']:.1f} req/s"
+          + (f" (target {target_rate:g})" if target_rate else ''))
+    print(f"\n   {'operation':<10}{'count':>8}{'req/s':>9}{'errors':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+          f"{'svc p95':>10}")
+    rows = list(report['operations'].items()) + [('ALL', overall)]
+    for name, stats in rows:
+        if not stats['count']:
+            continue
+        lat, svc = stats['latencyMs'], stats['serviceMs']
+        print(f"   {name:<10}{stats['count']:>8}{stats['rps']:>9.1f}{stats['errorRate']:>8.1%} "
+              f"{lat['p50']:>8.0f}{lat['p95']:>9.0f}{lat['p99']:>9.0f}{lat['max']:>9.0f}{svc['p95']:>10.0f}")
+    print("   (latency in ms from scheduled start; svc = from when the request was sent)")
+    for name, stats in rows:
+        if stats['errors'] and name != 'ALL':
+            print(f"   ❌ {name}: " + ', '.join(f"{status} x{count}" for status, count in stats['errors'].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the listing API on a local backend')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+    parser.add_argument('--rate', type=float, default=50, help='Target requests/sec across all users (0 = unthrottled)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Operation weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--seed', type=int, default=500, help='Listings to seed before the run')
+    parser.add_argument('--api', help='Existing local backend to test instead of starting one')
+    parser.add_argument('--admin-password', default=ADMIN_PASSWORD, help='Admin password for --api (for delete)')
+    parser.add_argument('--json', help='Also write the report to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show backend output')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.api and urlsplit(args.api).hostname not in LOCAL_HOSTS:
+        parser.error(f"--api must be a local server (got {args.api}); this test writes and deletes listings")
+
+    print("=" * 60)
+    print("VDI Realty - Listing API Load Test")
+    print("=" * 60)
+    print(f"{args.users} users, {'unthrottled' if args.rate <= 0 else f'{args.rate:g} req/s'}, "
+          f"{args.duration:g}s, mix {args.mix}")
+
+    with ExitStack() as stack:
+        if args.api:
+            api_url, admin_password = args.api.rstrip('/'), args.admin_password
+        else:
+            smtp = stack.enter_context(start_smtp())
+            api = stack.enter_context(start_backend(env=backend_env(smtp), quiet=not args.verbose))
+            api_url, admin_password = api.url, api.admin_password
+            print(f"🚀 Local backend at {api_url} (temporary database)")
+
+        # Seeded listings are numbered after any a previous run left behind
+        offset = random.randrange(10_000, 900_000)
+        seeded = seed_listings(api_url, args.seed, photos=3, start=offset) if args.seed else []
+        print(f"🌱 Seeded {len(seeded)} listing(s)")
+
+        test = LoadTest(api_url, admin_password, seeded, mix, args.users)
+        elapsed = test.run(args.rate, args.duration)
+        report = test.report(elapsed)
+
+        if args.api:
+            # Remove everything this run added from the existing server
+            test.created_ids += seeded
+            test.cleanup()
+            print(f"🧹 Deleted {len(test.deleted_ids)} listing(s) created by this run")
+
+    print_report(report, args.rate)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report saved to {args.json}")
+    return 0 if report['overall']['errorRate'] < 0.01 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+VDI Realty - Local Stand-in API Server
+
+A small in-memory imitation of the FSBO backend for testing the Python
+submission and test scripts without Node, SQLite or the production API.
+It implements the same JSON contract as backend/routes/fsbo-routes.js for:
+
+    POST   /api/fsbo/submit
+    POST   /api/fsbo/submit-batch
+    GET    /api/fsbo/listings           (limit, cursor, filters and fields like the backend)
+    GET    /api/fsbo/listing/:id
+    DELETE /api/fsbo/listing/:id        (Authorization: admin password)
+    GET    /api/fsbo/admin/listings     (Authorization: admin password)
+    GET    /api/health
+
+Usage:
+    python local_api_server.py                      # http://localhost:3000
+    python local_api_server.py --port 3100 --latency-ms 50
+    python bulk_submit.py listings.jsonl --api http://localhost:3000 --yes
+"""
+
+import re
+import sys
+import json
+import base64
+import hashlib
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from bulk_submit import validate_listing, INTEGER_FIELDS, FLOAT_FIELDS
+
+ADMIN_PASSWORD = 'admin123'   # Same default as backend/config.js
+LISTING_DURATION_DAYS = 14
+PAGE_SIZE = 50
+MAX_BATCH_SIZE = 500           # Same default as backend/config.js (MAX_BATCH_SIZE)
+MAX_PAGE_SIZE = 200
+
+
+def parse_number(value, integer=True):
+    """The backend's parseInt/parseFloat: leading number of the text, None if there is none"""
+    match = re.match(r'\s*[-+]?\d+' if integer else r'\s*[-+]?(\d+\.?\d*|\.\d+)', str(value or ''))
+    if not match:
+        return None
+    return int(match.group(0)) if integer else float(match.group(0))
+
+
+class ListingStore:
+    """Thread-safe in-memory listings table"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.listings = {}
+        self.next_id = 1
+
+    def insert(self, data):
+        now = datetime.now(timezone.utc)
+        with self.lock:
+            listing_id = self.next_id
+            self.next_id += 1
+            photo_urls = data.get('photoUrls') or '[]'
+            if isinstance(photo_urls, str):
+                photo_urls = json.loads(photo_urls)
+            numbers = {field: parse_number(data[field], field in INTEGER_FIELDS)
+                       for field in INTEGER_FIELDS + FLOAT_FIELDS if field in data}
+            listing = dict(data,
+                           **numbers,
+                           id=listing_id,
+                           status='active',
+                           listingSource=data.get('listingSource') or 'fsbo',
+                           privateContact=1 if data.get('privateContact') in (True, 'true', 'on') else 0,
+                           submissionDate=now.isoformat(),
+                           expirationDate=(now + timedelta(days=LISTING_DURATION_DAYS)).isoformat(),
+                           createdAt=now.isoformat(),
+                           photos=[{'id': i + 1, 'filename': f"extracted-{i}.jpg", 'url': url}
+                                   for i, url in enumerate(photo_urls)])
+            listing.pop('photoUrls', None)
+            self.listings[listing_id] = listing
+            return listing
+
+    def active(self, source=None):
+        with self.lock:
+            listings = [l for l in self.listings.values() if l['status'] == 'active'
+                        and (not source or l['listingSource'] == source)]
+        return sorted(listings, key=lambda l: (l['createdAt'], l['id']), reverse=True)
+
+    def get(self, listing_id):
+        with self.lock:
+            return self.listings.get(listing_id)
+
+    def all(self):
+        with self.lock:
+            return sorted(self.listings.values(), key=lambda l: l['createdAt'], reverse=True)
+
+    def set_status(self, listing_id, status):
+        with self.lock:
+            self.listings[listing_id]['status'] = status
+
+
+def public_view(listing):
+    """Hide contact info on private listings, like the real /listings endpoint"""
+    if not listing['privateContact']:
+        return listing
+    return dict(listing, email=None, phone=None)
+
+
+def encode_cursor(listing):
+    raw = json.dumps([listing['createdAt'], listing['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, listing_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        return None
+    return (created_at, listing_id) if isinstance(created_at, str) and isinstance(listing_id, int) else None
+
+
+def listings_page(store, query):
+    """GET /api/fsbo/listings: (status, payload) with the backend's paging, filters and fields"""
+    arg = lambda name: (query.get(name) or [''])[0]
+
+    limit = arg('limit') or str(PAGE_SIZE)
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+        return 400, {'success': False, 'error': f"limit must be an integer between 1 and {MAX_PAGE_SIZE}"}
+    limit = int(limit)
+
+    after = None
+    if arg('cursor'):
+        after = decode_cursor(arg('cursor'))
+        if not after:
+            return 400, {'success': False, 'error': 'Invalid cursor'}
+
+    numbers = {}
+    for name in ('minPrice', 'maxPrice', 'beds'):
+        if arg(name):
+            if not arg(name).isdigit():
+                return 400, {'success': False, 'error': f"{name} must be a whole number"}
+            numbers[name] = int(arg(name))
+
+    def matches(listing):
+        return ((not arg('city') or str(listing.get('city', '')).lower() == arg('city').lower())
+                and (not arg('zip') or listing.get('zip') == arg('zip'))
+                and (not arg('propertyType') or listing.get('propertyType') == arg('propertyType'))
+                and ('minPrice' not in numbers or (listing.get('price') or 0) >= numbers['minPrice'])
+                and ('maxPrice' not in numbers or (listing.get('price') or 0) <= numbers['maxPrice'])
+                and ('beds' not in numbers or int(listing.get('bedrooms') or 0) >= numbers['beds'])
+                and (not after or (listing['createdAt'], listing['id']) < after))
+
+    rows = [l for l in store.active(arg('source') or None) if matches(l)][:limit + 1]
+    listings = [public_view(l) for l in rows[:limit]]
+    next_cursor = encode_cursor(listings[-1]) if len(rows) > limit else None
+
+    if arg('fields'):
+        fields = ['id'] + [f.strip() for f in arg('fields').split(',') if f.strip() and f.strip() != 'id']
+        listings = [{field: listing.get(field) for field in fields} for listing in listings]
+    return 200, {'success': True, 'count': len(listings), 'listings': listings, 'nextCursor': next_cursor}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    store = ListingStore()
+    latency = 0.0
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps(payload).encode()
+        if self.command == 'GET' and status == 200:
+            # Strong ETag + 304, like the backend's response cache
+            etag = '"' + base64.urlsafe_b64encode(hashlib.sha1(body).digest()).decode().rstrip('=') + '"'
+            if etag in (self.headers.get('If-None-Match') or ''):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+        self.send_response(status)
+        if self.command == 'GET' and status == 200:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if self.headers.get('Content-Type', '').startswith('application/x-www-form-urlencoded'):
+            return {key: values[0] for key, values in parse_qs(raw.decode()).items()}
+        return json.loads(raw or b'{}')
+
+    def _listing_id(self, path):
+        try:
+            return int(path.rstrip('/').rsplit('/', 1)[1])
+        except ValueError:
+            return None
+
+    def _is_admin(self):
+        return self.headers.get('Authorization') == ADMIN_PASSWORD
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == '/api/health':
+            return self._send(200, {'status': 'ok', 'message': 'VDI Realty stand-in API is running',
+                                    'timestamp': datetime.now(timezone.utc).isoformat()})
+        if url.path == '/api/fsbo/listings':
+            return self._send(*listings_page(self.store, query))
+        if url.path.startswith('/api/fsbo/listing/'):
+            listing = self.store.get(self._listing_id(url.path))
+            if not listing:
+                return self._send(404, {'error': 'Listing not found'})
+            if listing['status'] != 'active':
+                return self._send(404, {'error': 'Listing is no longer active'})
+            return self._send(200, {'success': True, 'listing': public_view(listing)})
+        if url.path == '/api/fsbo/admin/listings':
+            if not self._is_admin():
+                return self._send(401, {'error': 'Unauthorized'})
+            return self._send(200, {'success': True, 'listings': self.store.all()})
+        return self._send(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == '/api/fsbo/submit':
+            try:
+                data = self._body()
+            except ValueError:
+                return self._send(400, {'error': 'Invalid JSON body'})
+            data = data if isinstance(data, dict) else {}
+            errors = validate_listing(data)
+            if errors:
+                return self._send(400, {'error': 'Missing required fields', 'details': '; '.join(errors)})
+            listing = self.store.insert(data)
+            return self._send(200, {'success': True, 'message': 'Listing submitted successfully',
+                                    'listingId': listing['id'], 'expirationDate': listing['expirationDate']})
+        if url.path == '/api/fsbo/submit-batch':
+            try:
+                body = self._body()
+            except ValueError:
+                return self._send(400, {'error': 'Invalid JSON body'})
+            listings = body.get('listings') if isinstance(body, dict) else None
+            if not isinstance(listings, list) or not listings:
+                return self._send(400, {'error': 'listings must be a non-empty array'})
+            if len(listings) > MAX_BATCH_SIZE:
+                return self._send(400, {'error': f"A batch can contain at most {MAX_BATCH_SIZE} listings"})
+            results = []
+            for index, data in enumerate(listings):
+                # Like the backend's validateListing(data || {}): a non-object item fails on its own
+                data = data if isinstance(data, dict) else {}
+                errors = validate_listing(data)
+                if errors:
+                    results.append({'index': index, 'success': False, 'error': '; '.join(errors)})
+                else:
+                    results.append({'index': index, 'success': True, 'listingId': self.store.insert(data)['id']})
+            created = sum(1 for r in results if r['success'])
+            return self._send(200, {'success': created > 0, 'created': created,
+                                    'failed': len(results) - created, 'results': results})
+        return self._send(404, {'error': 'Not found'})
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        if url.path.startswith('/api/fsbo/listing/'):
+            if not self._is_admin():
+                return self._send(401, {'error': 'Unauthorized'})
+            listing_id = self._listing_id(url.path)
+            if not self.store.get(listing_id):
+                return self._send(404, {'error': 'Listing not found'})
+            self.store.set_status(listing_id, 'removed')
+            return self._send(200, {'success': True, 'message': 'Listing removed successfully'})
+        return self._send(404, {'error': 'Not found'})
+
+
+def make_server(port=3000, latency_ms=0):
+    """Create (but don't start) a stand-in server; call serve_forever() on it"""
+    handler = type('Handler', (StandInHandler,), {'store': ListingStore(), 'latency': latency_ms / 1000})
+    return ThreadingHTTPServer(('127.0.0.1', port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the local stand-in listings API')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--latency-ms', type=int, default=0, help='Artificial delay per response')
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.latency_ms)
+    print(f"🚀 Stand-in API running on http://localhost:{args.port} (admin password: {ADMIN_PASSWORD})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+VDI Realty - Local Backend Harness
+
+Starts the real Node backend (backend/server.js) against a throwaway SQLite
+database and upload folder, so benchmarks and tests never touch production
+data. Requires Node 18+ and `npm install` in backend/.
+
+Usage (from Python):
+    from local_backend import start_backend, seed_listings
+
+    with start_backend() as api:
+        ids = seed_listings(api.url, 500)
+        ...
+"""
+
+import os
+import sys
+import time
+import socket
+import shutil
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).parent / 'backend'
+ADMIN_PASSWORD = 'local-test-admin'
+STARTUP_TIMEOUT = 30
+
+CITIES = [('Seattle', '98101'), ('Bellevue', '98004'), ('Kirkland', '98033'),
+          ('Redmond', '98052'), ('Bothell', '98011'), ('Issaquah', '98027')]
+PROPERTY_TYPES = ['Single Family', 'Condo', 'Townhouse', 'Multi-Family']
+
+
+class LocalBackend:
+    """Handle for a running backend: base URL, admin password and file locations"""
+
+    def __init__(self, url, admin_password, data_dir, process):
+        self.url = url
+        self.admin_password = admin_password
+        self.data_dir = Path(data_dir)
+        self.db_path = self.data_dir / 'fsbo.db'
+        self.process = process
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def start_backend(backend_dir=BACKEND_DIR, port=None, env=None, quiet=True, keep_data=False):
+    """
+    Run backend/server.js on a free port with DB_PATH/UPLOAD_DIR in a temp dir.
+    backend_dir may point at another checkout (e.g. a git worktree of an older
+    commit) to compare versions; node_modules from this checkout are reused.
+    """
+    backend_dir = Path(backend_dir).resolve()
+    port = port or free_port()
+    data_dir = tempfile.mkdtemp(prefix='vdi-backend-')
+    process_env = dict(os.environ,
+                       PORT=str(port),
+                       NODE_ENV='development',
+                       DB_PATH=os.path.join(data_dir, 'fsbo.db'),
+                       UPLOAD_DIR=os.path.join(data_dir, 'uploads'),
+                       ADMIN_PASSWORD=ADMIN_PASSWORD,
+                       NODE_PATH=str((BACKEND_DIR / 'node_modules').resolve()),
+                       **(env or {}))
+
+    output = subprocess.DEVNULL if quiet else None
+    process = subprocess.Popen(['node', 'server.js'], cwd=backend_dir, env=process_env,
+                               stdout=output, stderr=output)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + STARTUP_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Backend exited during startup (code {process.returncode})")
+            try:
+                if requests.get(f"{url}/api/health", timeout=1).ok:
+                    break
+            except requests.exceptions.RequestException:
+                pass
+            if time.time() > deadline:
+                raise RuntimeError(f"Backend did not become healthy within {STARTUP_TIMEOUT}s")
+            time.sleep(0.2)
+
+        yield LocalBackend(url, ADMIN_PASSWORD, data_dir, process)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if not keep_data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def make_listing(i, photos=3, **overrides):
+    """Deterministic, valid listing #i for seeding and tests"""
+    city, zip_code = CITIES[i % len(CITIES)]
+    listing = {
+        'firstName': 'Seed',
+        'lastName': f"Seller{i}",
+        'email': f"seed{i}@example.com",
+        'phone': '(206) 555-0100',
+        'address': f"{100 + i} Test Avenue",
+        'city': city,
+        'state': 'WA',
+        'zip': zip_code,
+        'propertyType': PROPERTY_TYPES[i % len(PROPERTY_TYPES)],
+        'price': 400000 + (i * 7919) % 1600000,
+        'sqft': 900 + (i * 37) % 3100,
+        'bedrooms': 1 + i % 5,
+        'bathrooms': 1 + (i % 4) * 0.5,
+        'yearBuilt': 1960 + i % 60,
+        'features': 'Hardwood floors, Updated kitchen, Garage',
+        'description': f"Seeded listing {i} used for local benchmarks and tests. " * 4,
+        'privateContact': i % 3 == 0,
+        'listingSource': 'partner' if i % 4 == 0 else 'fsbo',
+        'photoUrls': [f"https://images.example.com/seed/{i}/{n}.jpg" for n in range(photos)]
+    }
+    listing.update(overrides)
+    return listing
+
+
+def seed_listings(api_url, count, photos=3, batch_size=250, start=0):
+    """Insert count listings through /api/fsbo/submit-batch; returns their IDs"""
+    ids = []
+    with requests.Session() as session:
+        for offset in range(start, start + count, batch_size):
+            batch = [make_listing(i, photos) for i in range(offset, min(offset + batch_size, start + count))]
+            response = session.post(f"{api_url}/api/fsbo/submit-batch", json={'listings': batch}, timeout=120)
+            response.raise_for_status()
+            ids += [item['listingId'] for item in response.json()['results'] if item['success']]
+    return ids
+
+
+def latency_stats(samples):
+    """Summary of latency samples in seconds: count, mean and p50/p90/p95/p99/max in ms"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean': sum(ordered) / len(ordered) * 1000,
+        'p50': pct(50),
+        'p90': pct(90),
+        'p95': pct(95),
+        'p99': pct(99),
+        'max': ordered[-1] * 1000
+    }
+
+
+if __name__ == '__main__':
+    # Quick manual check: start, seed a few listings, print the URL until Ctrl+C
+    with start_backend(quiet=False) as api:
+        print(f"\n🚀 Local backend at {api.url} (admin password: {api.admin_password})")
+        print(f"🗄️  Seeded {len(seed_listings(api.url, 20))} listing(s) into {api.db_path}")
+        try:
+            api.process.wait()
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping")
+    sys.exit(0)
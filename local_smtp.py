@@ -0,0 +1,159 @@
+"""
+VDI Realty - Local SMTP Stand-in
+
+A minimal SMTP server that accepts every message and keeps it in memory, so
+the backend's email outbox can be exercised without a real mail provider.
+--delay makes each message slow to accept (like a distant SMTP relay) and
+--fail-rate rejects a share of messages to exercise retries.
+
+Point the backend at it with:
+    EMAIL_SERVICE=smtp EMAIL_HOST=127.0.0.1 EMAIL_PORT=2525 EMAIL_USER= node server.js
+
+Usage:
+    python local_smtp.py                    # Listen on 127.0.0.1:2525, print each message
+    python local_smtp.py --port 2525 --delay 0.5 --fail-rate 0.1
+
+From Python:
+    from local_smtp import start_smtp
+    with start_smtp(delay=0.5) as smtp:
+        ... smtp.port, smtp.messages ...
+"""
+
+import sys
+import time
+import random
+import argparse
+import threading
+import socketserver
+from email import message_from_bytes
+from contextlib import contextmanager
+
+from local_backend import free_port
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Threaded SMTP listener; received messages are appended to .messages"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, delay=0.0, fail_rate=0.0, verbose=False):
+        super().__init__(('127.0.0.1', port), SMTPHandler)
+        self.port = port
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.verbose = verbose
+        self.messages = []
+        self.rejected = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for nodemailer: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode('ascii'))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost VDI Realty SMTP stand-in')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.wfile.write(b'250-localhost\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n')
+            elif verb == 'HELO':
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                sender, recipients = self.address(command), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(self.address(command))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = self.read_data()
+                if server.delay:
+                    time.sleep(server.delay)
+                if random.random() < server.fail_rate:
+                    with server.lock:
+                        server.rejected += 1
+                    self.reply('451 Temporary failure (simulated)')
+                    continue
+                message = message_from_bytes(data)
+                with server.lock:
+                    server.messages.append({'from': sender, 'to': recipients,
+                                            'subject': message.get('Subject', ''), 'size': len(data)})
+                if server.verbose:
+                    print(f"📧 {', '.join(recipients)}: {message.get('Subject', '')}")
+                self.reply('250 OK queued')
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    @staticmethod
+    def address(command):
+        """Mailbox from 'MAIL FROM:<a@b.com> SIZE=123' / 'RCPT TO:<a@b.com>'"""
+        return command.split(':', 1)[1].strip().split(' ')[0].strip('<>')
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b'.\r\n', b'.\n'):
+                return b''.join(lines)
+            lines.append(line[1:] if line.startswith(b'..') else line)
+
+
+@contextmanager
+def start_smtp(port=None, delay=0.0, fail_rate=0.0, verbose=False):
+    """Run the stand-in in a background thread for the duration of the block"""
+    server = SMTPStandIn(port or free_port(), delay, fail_rate, verbose)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def backend_env(smtp):
+    """Environment for start_backend() that sends all email to this stand-in"""
+    return {'EMAIL_SERVICE': 'smtp', 'EMAIL_HOST': '127.0.0.1', 'EMAIL_PORT': str(smtp.port),
+            'EMAIL_SECURE': 'false', 'EMAIL_USER': '', 'EMAIL_PASSWORD': '', 'SENDGRID_API_KEY': ''}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local SMTP server that accepts and prints all mail')
+    parser.add_argument('--port', type=int, default=2525, help='Port to listen on (default: 2525)')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to hold each message before accepting')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of messages to reject with 451')
+    args = parser.parse_args()
+
+    with start_smtp(args.port, args.delay, args.fail_rate, verbose=True) as smtp:
+        print(f"📮 SMTP stand-in listening on 127.0.0.1:{smtp.port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n🛑 Received {len(smtp.messages)} message(s), rejected {smtp.rejected}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
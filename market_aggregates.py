@@ -0,0 +1,332 @@
+"""
+VDI Realty - Incremental Market Aggregates
+Keeps running market aggregates in market_state.json so a daily refresh only
+touches listings that are new, changed or gone since the last run, instead of
+recomputing every statistic from scratch.
+
+State kept per group (overall, each city, zip and property type):
+    - active/total/priced counts and price sums
+    - quantile sketches for price, price per sqft and sale-to-list (medians)
+    - active listing counts per listed day (exact days-on-market median)
+Plus per-day buckets of newly listed homes, which month-over-month trends are
+read from without re-scanning history.
+
+Usage:
+    python market_aggregates.py          # Apply changes and update market_data.json
+    python market_aggregates.py --full   # Rebuild the state from scratch
+"""
+
+import sys
+import json
+import math
+import hashlib
+import sqlite3
+import argparse
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from market_stats import (
+    EXTRACTED_FILE, FSBO_DB_FILE, MARKET_DATA_FILE, GROUP_FIELDS,
+    _number, load_extracted_listings, write_market_data
+)
+
+STATE_FILE = Path(__file__).parent / 'market_state.json'
+STATE_VERSION = 2        # 2: per-group count of priced listings
+SKETCH_ACCURACY = 0.01   # Relative error of sketch quantiles (1%)
+TREND_WINDOW_DAYS = 30
+INCLUDED_STATUSES = ('active', 'expired', 'sold')
+
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+def sketch_add(sketch, value, count=1):
+    """Add (or with count=-1 remove) a positive value from a log-bucket sketch"""
+    if value is None or not value > 0:
+        return
+    key = str(math.ceil(math.log(value) / _LOG_GAMMA))
+    remaining = sketch.get(key, 0) + count
+    if remaining > 0:
+        sketch[key] = remaining
+    else:
+        sketch.pop(key, None)
+
+
+def sketch_merge(*sketches):
+    merged = {}
+    for sketch in sketches:
+        for key, count in sketch.items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def sketch_quantile(sketch, q=0.5):
+    """Approximate quantile (within SKETCH_ACCURACY) of the values in a sketch"""
+    total = sum(sketch.values())
+    if total == 0:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for key in sorted(sketch, key=int):
+        seen += sketch[key]
+        if seen > rank:
+            return 2 * _GAMMA ** int(key) / (_GAMMA + 1)
+    return None
+
+
+def _empty_group():
+    return {'active': 0, 'total': 0, 'priced': 0, 'priceSum': 0.0, 'price': {}, 'ppsf': {}, 'ratio': {}, 'listedDays': {}}
+
+
+def _empty_state():
+    return {'version': STATE_VERSION, 'fsboSyncedAt': None, 'listings': {}, 'groups': {}, 'daily': {}}
+
+
+def load_state(path=STATE_FILE):
+    path = Path(path)
+    if path.exists():
+        with open(path, 'r') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    return _empty_state()
+
+
+def save_state(state, path=STATE_FILE):
+    with open(path, 'w') as f:
+        json.dump(state, f, separators=(',', ':'))
+
+
+def contribution(listing):
+    """What one listing adds to the aggregates, as a compact JSON-friendly list"""
+    price = _number(listing.get('price'))
+    sqft = _number(listing.get('sqft'))
+    sold = _number(listing.get('soldPrice') or listing.get('salePrice'))
+    price = None if math.isnan(price) else price
+    ppsf = price / sqft if price and sqft > 0 else None
+    ratio = sold / price * 100 if price and sold > 0 else None
+    listed = str(listing.get('listedDate') or '')[:10] or None
+    active = 1 if str(listing.get('status') or 'active').lower() == 'active' else 0
+    labels = [str(listing.get(field) or 'Unknown').strip() or 'Unknown' for field in GROUP_FIELDS]
+    return [labels, price, ppsf, ratio, listed, active]
+
+
+def fingerprint(contrib):
+    return hashlib.sha1(json.dumps(contrib).encode()).hexdigest()[:16]
+
+
+def _apply(state, contrib, sign):
+    """Add (sign=1) or remove (sign=-1) a listing's contribution from every bucket"""
+    labels, price, ppsf, ratio, listed, active = contrib
+    group_keys = ['all'] + [f"{field}:{label}" for field, label in zip(GROUP_FIELDS, labels)]
+
+    for group_key in group_keys:
+        group = state['groups'].setdefault(group_key, _empty_group())
+        group['total'] += sign
+        sketch_add(group['ratio'], ratio, sign)
+        if active:
+            group['active'] += sign
+            if price:
+                group['priced'] += sign
+                group['priceSum'] += sign * price
+            sketch_add(group['price'], price, sign)
+            sketch_add(group['ppsf'], ppsf, sign)
+            if listed:
+                remaining = group['listedDays'].get(listed, 0) + sign
+                if remaining > 0:
+                    group['listedDays'][listed] = remaining
+                else:
+                    group['listedDays'].pop(listed, None)
+        if group['total'] <= 0:
+            del state['groups'][group_key]
+
+    if listed:
+        bucket = state['daily'].setdefault(listed, {'count': 0, 'priceSum': 0.0, 'price': {}})
+        bucket['count'] += sign
+        if price:
+            bucket['priceSum'] += sign * price
+        sketch_add(bucket['price'], price, sign)
+        if bucket['count'] <= 0:
+            del state['daily'][listed]
+
+
+def apply_listings(state, listings, key_func):
+    """Apply new/changed listings; unchanged ones are skipped by fingerprint"""
+    changed = 0
+    for listing in listings:
+        key = key_func(listing)
+        old = state['listings'].get(key)
+        included = str(listing.get('status') or 'active').lower() in INCLUDED_STATUSES
+        if not included:
+            if old:
+                _apply(state, old[1], -1)
+                del state['listings'][key]
+                changed += 1
+            continue
+
+        contrib = contribution(listing)
+        fp = fingerprint(contrib)
+        if old and old[0] == fp:
+            continue
+        if old:
+            _apply(state, old[1], -1)
+        _apply(state, contrib, 1)
+        state['listings'][key] = [fp, contrib]
+        changed += 1
+    return changed
+
+
+def remove_missing(state, prefix, present_keys):
+    """Remove listings under a key prefix that are no longer in their source"""
+    missing = [key for key in state['listings'] if key.startswith(prefix) and key not in present_keys]
+    for key in missing:
+        _apply(state, state['listings'].pop(key)[1], -1)
+    return len(missing)
+
+
+def load_fsbo_changes(db_path, since=None):
+    """FSBO listings updated since the last sync (status changes bump updatedAt)"""
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return [], since
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("""
+            SELECT id, city, zip, propertyType, price, sqft, status,
+                   submissionDate AS listedDate, updatedAt
+            FROM listings
+            WHERE ? IS NULL OR updatedAt >= ?
+        """, (since, since)).fetchall()
+    finally:
+        conn.close()
+    listings = [dict(row) for row in rows]
+    synced_at = max([since or ''] + [l['updatedAt'] or '' for l in listings]) or None
+    return listings, synced_at
+
+
+def _median_listed_day(listed_days):
+    total = sum(listed_days.values())
+    if total == 0:
+        return None
+    seen = 0
+    for day in sorted(listed_days):
+        seen += listed_days[day]
+        if seen > (total - 1) / 2:
+            return date.fromisoformat(day)
+    return None
+
+
+def _group_row(group, as_of):
+    def rounded(value, digits=0):
+        if value is None:
+            return None
+        return int(round(value)) if digits == 0 else round(value, digits)
+
+    median_day = _median_listed_day(group['listedDays'])
+    return {
+        'medianPrice': rounded(sketch_quantile(group['price'])),
+        # Listings without a price count as active but not towards the average
+        'averagePrice': rounded(group['priceSum'] / group['priced']) if group['priced'] else None,
+        'medianPricePerSqft': rounded(sketch_quantile(group['ppsf']), 2),
+        'medianDaysOnMarket': (as_of - median_day).days if median_day else None,
+        'saleToList': rounded(sketch_quantile(group['ratio']), 1),
+        'activeListings': group['active'],
+        'totalListings': group['total'],
+        'samples': {
+            'price': group['priced'],
+            'pricePerSqft': sum(group['ppsf'].values()),
+            'daysOnMarket': sum(group['listedDays'].values()),
+            'saleToList': sum(group['ratio'].values())
+        }
+    }
+
+
+def _pct_change(current, previous):
+    if current is None or not previous:
+        return None
+    return round((current - previous) / previous * 100, 1)
+
+
+def trends(state, as_of=None):
+    """Month-over-month changes from the per-day buckets (last 30 days vs the 30 before)"""
+    as_of = as_of or date.today()
+    windows = []
+    for offset in (0, TREND_WINDOW_DAYS):
+        end = as_of - timedelta(days=offset)
+        start = end - timedelta(days=TREND_WINDOW_DAYS)
+        buckets = [b for day, b in state['daily'].items() if start.isoformat() < day <= end.isoformat()]
+        windows.append({
+            'count': sum(b['count'] for b in buckets),
+            'median': sketch_quantile(sketch_merge(*[b['price'] for b in buckets]))
+        })
+    current, previous = windows
+    return {
+        'newListings': current['count'],
+        'newListingsMoM': _pct_change(current['count'], previous['count']),
+        'medianPriceMoM': _pct_change(current['median'], previous['median'])
+    }
+
+
+def snapshot(state, as_of=None):
+    """Current stats in the same shape as market_stats.compute_market_stats()"""
+    as_of = as_of or date.today()
+    result = {
+        'overall': _group_row(state['groups'].get('all', _empty_group()), as_of),
+        'breakdown': {field: {} for field in GROUP_FIELDS},
+        'trends': trends(state, as_of)
+    }
+    for group_key, group in state['groups'].items():
+        if group_key == 'all':
+            continue
+        field, label = group_key.split(':', 1)
+        result['breakdown'][field][label] = _group_row(group, as_of)
+    return result
+
+
+def update_aggregates(extracted_file=EXTRACTED_FILE, db_path=FSBO_DB_FILE,
+                      state_file=STATE_FILE, full=False):
+    """Bring the persisted aggregates up to date and return (stats, changed_count)"""
+    state = _empty_state() if full else load_state(state_file)
+
+    extracted = load_extracted_listings(extracted_file)
+    url_key = lambda l: f"url:{l.get('sourceUrl')}"
+    changed = apply_listings(state, extracted, url_key)
+    changed += remove_missing(state, 'url:', {url_key(l) for l in extracted})
+
+    fsbo, state['fsboSyncedAt'] = load_fsbo_changes(db_path, state['fsboSyncedAt'])
+    changed += apply_listings(state, fsbo, lambda l: f"fsbo:{l['id']}")
+
+    save_state(state, state_file)
+    return snapshot(state), changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally update market aggregates')
+    parser.add_argument('--extracted', default=str(EXTRACTED_FILE), help='Extracted listings JSON')
+    parser.add_argument('--db', default=str(FSBO_DB_FILE), help='Backend SQLite database')
+    parser.add_argument('--state', default=str(STATE_FILE), help='Aggregate state file')
+    parser.add_argument('--output', default=str(MARKET_DATA_FILE), help='Market data JSON to update')
+    parser.add_argument('--full', action='store_true', help='Discard the state and rebuild it')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Incremental Market Aggregates")
+    print("=" * 60)
+
+    start = datetime.now()
+    stats, changed = update_aggregates(args.extracted, args.db, args.state, args.full)
+    elapsed = (datetime.now() - start).total_seconds()
+    market_data = write_market_data(stats, args.output)
+
+    print(f"\n🔄 Applied {changed:,} changed listing(s) in {elapsed:.2f}s")
+    print(f"   Median Price:    {market_data.get('medianPrice')}")
+    print(f"   Days on Market:  {market_data.get('daysOnMarket')}")
+    print(f"   Active Listings: {market_data.get('activeListings')}")
+    print(f"   Price MoM:       {stats['trends']['medianPriceMoM']}%")
+    print(f"\n📁 Saved to: {args.output} (state: {args.state})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+VDI Realty - Market History Store
+Append-only time series of market snapshots, one compact binary column file
+per region and metric:
+
+    market_history/<region>-<hash>/<metric>.bin   # fixed 12-byte records: day (uint32), value (float64)
+
+Records are sorted by day, so appending a daily snapshot is a single write and
+a date-range query is a binary search over the file plus one contiguous read -
+the cost does not grow with years of history. Same-day snapshots overwrite
+the last record instead of appending.
+
+Usage:
+    python market_history.py                          # List stored regions
+    python market_history.py zip:98101 medianPrice    # Print a series
+    python market_history.py --export 365             # Write market_history.json for charts
+"""
+
+import re
+import sys
+import json
+import struct
+import hashlib
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+HISTORY_DIR = Path(__file__).parent / 'market_history'
+EXPORT_FILE = Path(__file__).parent / 'market_history.json'
+METRICS = ('medianPrice', 'medianPricePerSqft', 'medianDaysOnMarket', 'saleToList', 'activeListings')
+
+RECORD = struct.Struct('<Id')
+NO_VALUE = float('nan')
+
+
+def region_dir(region, base_dir=HISTORY_DIR):
+    """Directory for a region key like 'all', 'city:Seattle' or 'zip:98101'.
+    The slug is lossy ('city:St. Louis' and 'city:St Louis' share one), so a
+    short hash of the exact key keeps each region's columns apart."""
+    slug = re.sub(r'[^a-z0-9]+', '-', region.lower()).strip('-')
+    digest = hashlib.sha1(region.encode('utf-8')).hexdigest()[:8]
+    return Path(base_dir) / f"{slug}-{digest}"
+
+
+def _day_at(f, index):
+    f.seek(index * RECORD.size)
+    return RECORD.unpack(f.read(RECORD.size))[0]
+
+
+def _bisect(f, count, day):
+    """Index of the first record whose day is >= day"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _day_at(f, mid) < day:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def append_value(region, metric, day, value, base_dir=HISTORY_DIR):
+    """Append one day's value; re-running on the same day overwrites it"""
+    path = region_dir(region, base_dir) / f"{metric}.bin"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ordinal = day.toordinal()
+    record = RECORD.pack(ordinal, NO_VALUE if value is None else float(value))
+
+    with open(path, 'a+b') as f:
+        f.seek(0, 2)
+        count = f.tell() // RECORD.size
+        if count:
+            last_day = _day_at(f, count - 1)
+            if ordinal < last_day:
+                print(f"  ⚠️  Skipping {region}/{metric}: {day} is older than stored history")
+                return False
+            if ordinal == last_day:
+                f.truncate((count - 1) * RECORD.size)
+        f.seek(0, 2)
+        f.write(record)
+    return True
+
+
+def read_range(region, metric, start=None, end=None, base_dir=HISTORY_DIR):
+    """Return (dates, values) for start <= day <= end (None = open-ended)"""
+    path = region_dir(region, base_dir) / f"{metric}.bin"
+    if not path.exists():
+        return [], []
+
+    with open(path, 'rb') as f:
+        count = path.stat().st_size // RECORD.size
+        first = _bisect(f, count, start.toordinal()) if start else 0
+        last = _bisect(f, count, end.toordinal() + 1) if end else count
+        f.seek(first * RECORD.size)
+        block = f.read((last - first) * RECORD.size)
+
+    dates, values = [], []
+    for ordinal, value in RECORD.iter_unpack(block):
+        dates.append(date.fromordinal(ordinal))
+        values.append(None if value != value else value)
+    return dates, values
+
+
+def append_snapshot(stats, day=None, base_dir=HISTORY_DIR):
+    """Store one day's stats (market_stats / market_aggregates shape) for every region"""
+    day = day or date.today()
+    regions = {'all': stats['overall']}
+    for field, groups in stats['breakdown'].items():
+        for label, row in groups.items():
+            regions[f"{field}:{label}"] = row
+
+    for region, row in regions.items():
+        for metric in METRICS:
+            append_value(region, metric, day, row.get(metric), base_dir)
+
+    index_path = Path(base_dir) / 'regions.json'
+    known = {}
+    if index_path.exists():
+        with open(index_path, 'r') as f:
+            known = json.load(f)
+    known.update({region: region_dir(region, base_dir).name for region in regions})
+    with open(index_path, 'w') as f:
+        json.dump(known, f, indent=2, sort_keys=True)
+    return len(regions)
+
+
+def list_regions(base_dir=HISTORY_DIR):
+    index_path = Path(base_dir) / 'regions.json'
+    if not index_path.exists():
+        return []
+    with open(index_path, 'r') as f:
+        return sorted(json.load(f))
+
+
+def export_json(days=365, output=EXPORT_FILE, base_dir=HISTORY_DIR):
+    """Write recent history in columnar JSON for charting on the site"""
+    start = date.today() - timedelta(days=days)
+    export = {}
+    for region in list_regions(base_dir):
+        series = {}
+        for metric in METRICS:
+            dates, values = read_range(region, metric, start, base_dir=base_dir)
+            if dates:
+                series.setdefault('dates', [d.isoformat() for d in dates])
+                series[metric] = values
+        if series:
+            export[region] = series
+
+    with open(output, 'w') as f:
+        json.dump(export, f, separators=(',', ':'))
+    return len(export)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the market history store')
+    parser.add_argument('region', nargs='?', help="Region key, e.g. 'all' or 'zip:98101'")
+    parser.add_argument('metric', nargs='?', default='medianPrice', choices=METRICS)
+    parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--export', type=int, metavar='DAYS', help='Export the last DAYS days to JSON')
+    args = parser.parse_args()
+
+    if args.export:
+        count = export_json(args.export)
+        print(f"✅ Exported {count} region(s) to {EXPORT_FILE.name}")
+        return 0
+
+    if not args.region:
+        regions = list_regions()
+        print(f"📚 {len(regions)} region(s) in {HISTORY_DIR.name}/")
+        for region in regions:
+            print(f"   {region}")
+        return 0
+
+    dates, values = read_range(args.region, args.metric, args.start, args.end)
+    print(f"📈 {args.region} / {args.metric}: {len(dates)} point(s)")
+    for day, value in zip(dates, values):
+        print(f"   {day}  {value if value is not None else '-'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+VDI Realty - Market Statistics Engine
+Computes market pulse numbers (median price, price per sqft, days on market,
+sale-to-list ratio, active listings) from our own listing data instead of
+hand-entered values, grouped by city, zip and property type.
+
+Sources:
+    - extracted_listings.json (output of extract_listings.py)
+    - FSBO/partner listings in the backend SQLite database (backend/fsbo.db)
+
+All per-group math is vectorized with NumPy so hundreds of thousands of
+records are processed in a few seconds.
+
+Usage:
+    python market_stats.py                         # Compute and write market_data.json
+    python market_stats.py --db /app/data/fsbo.db  # Use the production database file
+"""
+
+import sys
+import json
+import sqlite3
+import argparse
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent
+EXTRACTED_FILE = BASE_DIR / 'extracted_listings.json'
+FSBO_DB_FILE = BASE_DIR / 'backend' / 'fsbo.db'
+MARKET_DATA_FILE = BASE_DIR / 'market_data.json'
+
+GROUP_FIELDS = ('city', 'zip', 'propertyType')
+
+# Fewer values than this and a published (manual) number is kept instead
+MIN_SAMPLE = 10
+
+
+def _number(value):
+    """Coerce prices/sizes that may arrive as strings like '$540,000' to float"""
+    if value is None or value == '':
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = ''.join(ch for ch in str(value) if ch.isdigit() or ch == '.')
+    try:
+        return float(cleaned)
+    except ValueError:
+        return np.nan
+
+
+def load_extracted_listings(path=EXTRACTED_FILE):
+    """
+    Load listings written by extract_listings.py. extractedAt is when we scraped
+    a listing, not when it was listed, so it is never used as the listed date.
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_fsbo_listings(db_path=FSBO_DB_FILE):
+    """Load FSBO/partner listings straight from the backend SQLite database"""
+    db_path = Path(db_path)
+    if not db_path.exists():
+        return []
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute("""
+            SELECT id, city, zip, propertyType, price, sqft, status,
+                   submissionDate AS listedDate, listingSource
+            FROM listings
+            WHERE status IN ('active', 'expired', 'sold')
+        """).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+
+def build_columns(listings, as_of=None):
+    """Turn listing dicts into NumPy columns plus integer codes per group field"""
+    as_of = np.datetime64(as_of or date.today(), 'D')
+    n = len(listings)
+
+    price = np.empty(n)
+    sqft = np.empty(n)
+    sold_price = np.empty(n)
+    explicit_dom = np.empty(n)
+    active = np.zeros(n, dtype=bool)
+    listed = []
+    codes = {field: np.empty(n, dtype=np.int64) for field in GROUP_FIELDS}
+    labels = {field: {} for field in GROUP_FIELDS}
+
+    for i, listing in enumerate(listings):
+        price[i] = _number(listing.get('price'))
+        sqft[i] = _number(listing.get('sqft'))
+        sold_price[i] = _number(listing.get('soldPrice') or listing.get('salePrice'))
+        explicit_dom[i] = _number(listing.get('daysOnMarket'))
+        active[i] = str(listing.get('status') or 'active').lower() == 'active'
+        listed.append(str(listing.get('listedDate') or '')[:10] or 'NaT')
+        for field in GROUP_FIELDS:
+            label = str(listing.get(field) or 'Unknown').strip() or 'Unknown'
+            codes[field][i] = labels[field].setdefault(label, len(labels[field]))
+
+    listed_days = np.array(listed, dtype='datetime64[D]')
+    dom = np.where(np.isnan(explicit_dom), (as_of - listed_days).astype(float), explicit_dom)
+    dom[np.isnat(listed_days) & np.isnan(explicit_dom)] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ppsf = np.where(sqft > 0, price / sqft, np.nan)
+        sale_to_list = np.where(price > 0, sold_price / price * 100, np.nan)
+
+    return {
+        'price': price,
+        'ppsf': ppsf,
+        'dom': dom,
+        'saleToList': sale_to_list,
+        'active': active,
+        'codes': codes,
+        'labels': {field: list(names) for field, names in labels.items()}
+    }
+
+
+def grouped_median(codes, values, n_groups):
+    """Median of values per group code, NaN for groups without values"""
+    mask = ~np.isnan(values)
+    codes, values = codes[mask], values[mask]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    medians = np.full(n_groups, np.nan)
+    has = counts > 0
+    lo = starts[has] + (counts[has] - 1) // 2
+    hi = starts[has] + counts[has] // 2
+    medians[has] = (values[lo] + values[hi]) / 2
+    return medians
+
+
+def summarize(columns, codes, n_groups):
+    """Per-group stats for one grouping (codes are all zeros for the overall row)"""
+    active = columns['active']
+    active_codes = codes[active]
+    active_prices = columns['price'][active]
+    priced = ~np.isnan(active_prices)
+    price_sums = np.bincount(active_codes[priced], weights=active_prices[priced], minlength=n_groups)
+    price_counts = np.bincount(active_codes[priced], minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_price = np.where(price_counts > 0, price_sums / price_counts, np.nan)
+
+    def sample(values, group_codes=active_codes):
+        return np.bincount(group_codes[~np.isnan(values)], minlength=n_groups)
+
+    return {
+        'medianPrice': grouped_median(active_codes, active_prices, n_groups),
+        'averagePrice': average_price,
+        'medianPricePerSqft': grouped_median(active_codes, columns['ppsf'][active], n_groups),
+        'medianDaysOnMarket': grouped_median(active_codes, columns['dom'][active], n_groups),
+        'saleToList': grouped_median(codes, columns['saleToList'], n_groups),
+        'activeListings': np.bincount(active_codes, minlength=n_groups),
+        'totalListings': np.bincount(codes, minlength=n_groups),
+        'samples': {
+            'price': price_counts,
+            'pricePerSqft': sample(columns['ppsf'][active]),
+            'daysOnMarket': sample(columns['dom'][active]),
+            'saleToList': sample(columns['saleToList'], codes)
+        }
+    }
+
+
+def _row(stats, i):
+    """One group's stats as JSON-friendly values (None where there is no data)"""
+    def clean(value, digits=0):
+        if np.isnan(value):
+            return None
+        return int(round(value)) if digits == 0 else round(float(value), digits)
+
+    return {
+        'medianPrice': clean(stats['medianPrice'][i]),
+        'averagePrice': clean(stats['averagePrice'][i]),
+        'medianPricePerSqft': clean(stats['medianPricePerSqft'][i], 2),
+        'medianDaysOnMarket': clean(stats['medianDaysOnMarket'][i]),
+        'saleToList': clean(stats['saleToList'][i], 1),
+        'activeListings': int(stats['activeListings'][i]),
+        'totalListings': int(stats['totalListings'][i]),
+        # Values behind each statistic, so callers can ignore tiny samples
+        'samples': {name: int(counts[i]) for name, counts in stats['samples'].items()}
+    }
+
+
+def compute_market_stats(listings, as_of=None):
+    """Compute overall and grouped market stats for a list of listing dicts"""
+    columns = build_columns(listings, as_of)
+    overall = summarize(columns, np.zeros(len(listings), dtype=np.int64), 1)
+    result = {'overall': _row(overall, 0), 'breakdown': {}}
+
+    for field in GROUP_FIELDS:
+        labels = columns['labels'][field]
+        stats = summarize(columns, columns['codes'][field], len(labels))
+        result['breakdown'][field] = {label: _row(stats, i) for i, label in enumerate(labels)}
+
+    return result
+
+
+def format_price(value):
+    """Format a price the way market_data.json and the site show it ($540k, $1.2M)"""
+    if value >= 1000000:
+        return f"${value/1000000:.1f}M"
+    return f"${value/1000:.0f}k"
+
+
+def reliable_values(row, min_sample=MIN_SAMPLE):
+    """
+    market_data.json headline values from one stats row, leaving out any that
+    are missing or rest on fewer than min_sample values
+    """
+    samples = row.get('samples', {})
+    values = {}
+    if row['medianPrice'] is not None and samples.get('price', 0) >= min_sample:
+        values['medianPrice'] = format_price(row['medianPrice'])
+    if row['medianDaysOnMarket'] is not None and samples.get('daysOnMarket', 0) >= min_sample:
+        values['daysOnMarket'] = row['medianDaysOnMarket']
+    if row['saleToList'] is not None and samples.get('saleToList', 0) >= min_sample:
+        values['saleToList'] = int(round(row['saleToList']))
+    if row['medianPricePerSqft'] is not None and samples.get('pricePerSqft', 0) >= min_sample:
+        values['pricePerSqft'] = row['medianPricePerSqft']
+    # A handful of our own listings is not the market's inventory
+    if row['activeListings'] >= min_sample:
+        values['activeListings'] = row['activeListings']
+    return values
+
+
+def write_market_data(stats, json_file=MARKET_DATA_FILE):
+    """Merge computed stats into market_data.json, keeping old values where data is missing or thin"""
+    json_path = Path(json_file)
+    market_data = {}
+    if json_path.exists():
+        with open(json_path, 'r') as f:
+            market_data = json.load(f)
+
+    market_data.update(reliable_values(stats['overall']))
+    market_data['breakdown'] = stats['breakdown']
+    if 'trends' in stats:
+        market_data['trends'] = stats['trends']
+    market_data['lastUpdated'] = datetime.now().strftime('%Y-%m-%d')
+
+    with open(json_path, 'w') as f:
+        json.dump(market_data, f, indent=2)
+    return market_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute market stats from listing data')
+    parser.add_argument('--extracted', default=str(EXTRACTED_FILE), help='Extracted listings JSON')
+    parser.add_argument('--db', default=str(FSBO_DB_FILE), help='Backend SQLite database')
+    parser.add_argument('--output', default=str(MARKET_DATA_FILE), help='Market data JSON to update')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Market Statistics Engine")
+    print("=" * 60)
+
+    listings = load_extracted_listings(args.extracted) + load_fsbo_listings(args.db)
+    if not listings:
+        print("\n❌ No listing data found")
+        return 1
+
+    start = datetime.now()
+    stats = compute_market_stats(listings)
+    elapsed = (datetime.now() - start).total_seconds()
+    market_data = write_market_data(stats, args.output)
+
+    print(f"\n📊 Processed {len(listings):,} listing(s) in {elapsed:.2f}s")
+    print(f"   Median Price:    {market_data.get('medianPrice')}")
+    print(f"   Days on Market:  {market_data.get('daysOnMarket')}")
+    print(f"   Sale-to-List:    {market_data.get('saleToList')}%")
+    print(f"   Active Listings: {market_data.get('activeListings')}")
+    for field in GROUP_FIELDS:
+        print(f"   {field}: {len(stats['breakdown'][field])} group(s)")
+    print(f"\n📁 Saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+VDI Realty - Listing Photo Deduplication
+Perceptual-hashes listing photos so the same stock or staging image is stored
+once in photo_index.json and referenced by ID from every listing that uses it.
+
+Near-duplicate lookup uses a BK-tree over 64-bit difference hashes, so checking
+a new photo only visits a small part of the index even with tens of thousands
+of photos.
+
+Usage:
+    python photo_dedup.py                              # Dedupe extracted_listings.json
+    python photo_dedup.py listings.json                # Dedupe a specific listings file
+    python photo_dedup.py listings.json --distance 6   # Looser near-duplicate match
+"""
+
+import sys
+import json
+import argparse
+from io import BytesIO
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+INDEX_FILE = 'photo_index.json'
+DEFAULT_MAX_DISTANCE = 4   # Hamming distance (out of 64 bits) treated as "same photo"
+FETCH_WORKERS = 8
+
+
+def dhash(image, hash_size=8):
+    """Compute a 64-bit difference hash for a PIL image"""
+    gray = image.convert('L').resize((hash_size + 1, hash_size))
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree keyed by Hamming distance for near-duplicate lookup"""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, hash_value, photo_id):
+        node = [hash_value, photo_id, {}]
+        self.size += 1
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(hash_value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def find(self, hash_value, max_distance):
+        """Return (distance, photo_id) pairs within max_distance, closest first"""
+        if self.root is None:
+            return []
+        matches = []
+        stack = [self.root]
+        while stack:
+            node_hash, photo_id, children = stack.pop()
+            distance = hamming(hash_value, node_hash)
+            if distance <= max_distance:
+                matches.append((distance, photo_id))
+            # Triangle inequality: only subtrees in [d - max, d + max] can match
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        matches.sort()
+        return matches
+
+
+class PhotoIndex:
+    """Persistent photo store: one entry per distinct image, many URLs per entry"""
+
+    def __init__(self, path=None, max_distance=DEFAULT_MAX_DISTANCE):
+        self.path = Path(path) if path else Path(__file__).parent / INDEX_FILE
+        self.max_distance = max_distance
+        self.photos = {}
+        self.url_to_id = {}
+        self.tree = BKTree()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            stored = json.load(f)
+        for photo_id, photo in stored.get('photos', {}).items():
+            self._remember(photo_id, photo)
+
+    def _remember(self, photo_id, photo):
+        self.photos[photo_id] = photo
+        self.tree.add(int(photo['hash'], 16), photo_id)
+        for url in photo['urls']:
+            self.url_to_id[url] = photo_id
+
+    def lookup_url(self, url):
+        """Return the photo ID already recorded for this exact URL, if any"""
+        return self.url_to_id.get(url)
+
+    def add(self, url, hash_value):
+        """Return the photo ID for a hashed image, creating one if it is new"""
+        matches = self.tree.find(hash_value, self.max_distance)
+        if matches:
+            photo_id = matches[0][1]
+            self.photos[photo_id]['urls'].append(url)
+            self.url_to_id[url] = photo_id
+            return photo_id, True
+
+        photo_id = f"p{len(self.photos) + 1:06d}"
+        self._remember(photo_id, {
+            'hash': f"{hash_value:016x}",
+            'url': url,
+            'urls': [url]
+        })
+        return photo_id, False
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump({'photos': self.photos}, f, separators=(',', ':'))
+
+
+def fetch_image_hash(session, url):
+    """Download an image and return its dhash, or None if it can't be read"""
+    from PIL import Image
+
+    try:
+        response = session.get(url, timeout=15)
+        response.raise_for_status()
+        with Image.open(BytesIO(response.content)) as image:
+            return dhash(image)
+    except Exception as e:
+        print(f"  ⚠️  Could not hash {url[:80]}: {e}")
+        return None
+
+
+def listing_photo_urls(listing):
+    """Photo URLs from either extractor output ('images') or FSBO submissions ('photoUrls')"""
+    if listing.get('images'):
+        return list(listing['images'])
+    photo_urls = listing.get('photoUrls')
+    if isinstance(photo_urls, str):
+        try:
+            return json.loads(photo_urls)
+        except ValueError:
+            return []
+    return list(photo_urls or [])
+
+
+def dedupe_listings(listings, index, workers=FETCH_WORKERS):
+    """Attach 'photoIds' to each listing, hashing only URLs the index hasn't seen"""
+    pending = {}
+    for listing in listings:
+        for url in listing_photo_urls(listing):
+            if index.lookup_url(url) is None:
+                pending.setdefault(url, None)
+    pending = list(pending)
+
+    stats = {'photos': 0, 'new': 0, 'duplicates': 0, 'failed': 0}
+    if pending:
+        print(f"\n🔍 Hashing {len(pending)} new photo URL(s)...")
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+            hashes = list(pool.map(lambda url: fetch_image_hash(session, url), pending))
+        for url, hash_value in zip(pending, hashes):
+            if hash_value is None:
+                stats['failed'] += 1
+                continue
+            _, duplicate = index.add(url, hash_value)
+            stats['duplicates' if duplicate else 'new'] += 1
+
+    for listing in listings:
+        photo_ids = []
+        for url in listing_photo_urls(listing):
+            photo_id = index.lookup_url(url)
+            if photo_id and photo_id not in photo_ids:
+                photo_ids.append(photo_id)
+        listing['photoIds'] = photo_ids
+        stats['photos'] += len(photo_ids)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate listing photos by perceptual hash')
+    parser.add_argument('listings_file', nargs='?', default='extracted_listings.json')
+    parser.add_argument('--index', default=None, help=f'Photo index file (default: {INDEX_FILE})')
+    parser.add_argument('--distance', type=int, default=DEFAULT_MAX_DISTANCE,
+                        help='Max Hamming distance treated as the same photo')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Listing Photo Deduplication")
+    print("=" * 60)
+
+    listings_path = Path(args.listings_file)
+    if not listings_path.exists():
+        print(f"\n❌ Error: {listings_path} not found")
+        return 1
+
+    with open(listings_path, 'r') as f:
+        listings = json.load(f)
+
+    index = PhotoIndex(args.index, max_distance=args.distance)
+    print(f"\n📚 Photo index: {len(index.photos)} distinct photo(s) in {index.path.name}")
+
+    stats = dedupe_listings(listings, index)
+    index.save()
+
+    with open(listings_path, 'w') as f:
+        json.dump(listings, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print(f"✅ Referenced {stats['photos']} photo(s) across {len(listings)} listing(s)")
+    print(f"   New photos stored:    {stats['new']}")
+    print(f"   Duplicates collapsed: {stats['duplicates']}")
+    print(f"   Failed downloads:     {stats['failed']}")
+    print(f"📁 Index: {index.path} ({len(index.photos)} distinct)")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
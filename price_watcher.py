@@ -0,0 +1,518 @@
+"""
+VDI Realty - Listing Price Watcher
+Re-checks tracked listing URLs on a schedule and records price and status
+changes, instead of re-running extract_listings.py by hand.
+
+Checks are lightweight: a conditional GET (If-None-Match / If-Modified-Since
+from the last response), a body hash to skip pages that came back unchanged,
+and only the page's JSON-LD is parsed (no BeautifulSoup). New URLs are due
+at once, so their starting price is recorded on the next pass; after that
+first check each URL's schedule is spread over the interval by a hash of the
+URL and then jittered, and requests to one host are spaced --host-delay
+seconds apart, so thousands of URLs are checked from one process without
+bursts.
+
+Tracked URLs, validators and the price/status history live in
+price_watch.db. Every change is appended to price_events.jsonl and, with
+--webhook, POSTed as JSON.
+
+Usage:
+    python price_watcher.py --add urls.txt                  # Track URLs (file, URLs or extracted_listings.json)
+    python price_watcher.py --add URL --interval-hours 2
+    python price_watcher.py                                 # Watch: check URLs as they come due
+    python price_watcher.py --once                          # Check everything due now, then exit
+    python price_watcher.py --webhook http://localhost:9000/listing-events
+    python price_watcher.py --list
+    python price_watcher.py --history URL
+    python price_watcher.py --remove URL
+
+From Python:
+    from price_watcher import PriceWatcher
+    with PriceWatcher() as watcher:
+        watcher.add(urls)
+        watcher.run(once=True)
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from extraction_cache import canonical_url, timestamp
+from listing_candidates import clean_number
+
+DEFAULT_DB = Path(__file__).parent / 'price_watch.db'
+DEFAULT_EVENTS = Path(__file__).parent / 'price_events.jsonl'
+DEFAULT_INTERVAL_HOURS = 6
+DEFAULT_WORKERS = 8
+DEFAULT_HOST_DELAY = 2.0
+JITTER = 0.1                     # +/- share of the interval added to each next check
+MAX_BACKOFF_FACTOR = 8           # Failing URLs wait up to 8 intervals
+MAX_SLEEP = 30                   # Longest idle wait between scheduler passes
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+LISTING_TYPES = {'Product', 'Apartment', 'SingleFamilyResidence', 'House', 'Residence',
+                 'RealEstateListing', 'Offer'}
+LD_JSON = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.I | re.S)
+
+# schema.org availability -> listing status
+AVAILABILITY_STATUS = {
+    'instock': 'Active', 'limitedavailability': 'Active', 'onlineonly': 'Active', 'instoreonly': 'Active',
+    'preorder': 'Pending', 'presale': 'Pending', 'backorder': 'Pending',
+    'soldout': 'Sold',
+    'outofstock': 'Off Market', 'discontinued': 'Off Market'
+}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS watched (
+        canonicalUrl TEXT PRIMARY KEY,
+        url TEXT NOT NULL,
+        host TEXT NOT NULL,
+        intervalSeconds INTEGER NOT NULL,
+        nextCheckAt REAL NOT NULL,
+        etag TEXT,
+        lastModified TEXT,
+        bodyHash TEXT,
+        address TEXT,
+        price INTEGER,
+        status TEXT,
+        checks INTEGER NOT NULL DEFAULT 0,
+        notModified INTEGER NOT NULL DEFAULT 0,
+        failures INTEGER NOT NULL DEFAULT 0,
+        lastError TEXT,
+        lastCheckedAt TEXT,
+        lastChangedAt TEXT,
+        addedAt TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_watched_next_check ON watched(nextCheckAt);
+    CREATE TABLE IF NOT EXISTS price_history (
+        canonicalUrl TEXT NOT NULL,
+        observedAt TEXT NOT NULL,
+        price INTEGER,
+        status TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_price_history_url ON price_history(canonicalUrl, observedAt);
+"""
+
+
+def read_urls(inputs):
+    """URLs from arguments, text files (one per line) or listing JSON files (sourceUrl)"""
+    urls = []
+    for item in inputs:
+        path = Path(item)
+        if not path.exists():
+            urls.append(item)
+        elif path.suffix.lower() == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                urls.extend(listing['sourceUrl'] for listing in json.load(f) if listing.get('sourceUrl'))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return urls
+
+
+def spread_offset(url, interval):
+    """Stable offset within the interval, so a batch of new URLs isn't re-checked all at once"""
+    digest = hashlib.sha256(url.encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') / 2 ** 32 * interval
+
+
+def _ld_items(data):
+    """Flatten JSON-LD lists and @graph containers"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _ld_items(item)
+    elif isinstance(data, dict):
+        yield data
+        if isinstance(data.get('@graph'), list):
+            yield from _ld_items(data['@graph'])
+
+
+def structured_data(html):
+    """(address, price, status) from the page's JSON-LD; parts not found are None"""
+    for block in LD_JSON.findall(html):
+        try:
+            data = json.loads(block.strip(), strict=False)
+        except ValueError:
+            continue
+        for item in _ld_items(data):
+            types = item.get('@type')
+            types = set(types) if isinstance(types, list) else {types}
+            offers = item.get('offers')
+            if isinstance(offers, list):
+                offers = offers[0] if offers else None
+            if not (types & LISTING_TYPES or isinstance(offers, dict)):
+                continue
+            offers = offers if isinstance(offers, dict) else {}
+
+            price = clean_number(offers.get('price') or item.get('price'))
+            availability = str(offers.get('availability') or item.get('availability') or '')
+            status = AVAILABILITY_STATUS.get(availability.rstrip('/').rsplit('/', 1)[-1].lower())
+            if price is None and status is None:
+                continue
+            name = item.get('name')
+            return (name if isinstance(name, str) else None), (int(price) if price else None), status
+    return None, None, None
+
+
+def make_session(workers):
+    """One keep-alive session with a connection pool sized to the worker count"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def check_url(session, row):
+    """Fetch one tracked URL; returns a result dict (never raises). Runs on a worker thread."""
+    headers = {}
+    if row['etag']:
+        headers['If-None-Match'] = row['etag']
+    if row['lastModified']:
+        headers['If-Modified-Since'] = row['lastModified']
+    try:
+        response = session.get(row['url'], headers=headers, timeout=15)
+        if response.status_code == 304:
+            return {'outcome': 'not-modified'}
+        if response.status_code in (404, 410):
+            return {'outcome': 'fetched', 'status': 'Removed', 'price': None, 'address': None, 'bodyHash': None}
+        response.raise_for_status()
+        validators = {'etag': response.headers.get('ETag'), 'lastModified': response.headers.get('Last-Modified')}
+
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        if body_hash == row['bodyHash']:
+            return {'outcome': 'unchanged', **validators}
+        address, price, status = structured_data(response.text)
+        if price is None and status is None:
+            return {'outcome': 'error', 'error': 'no structured price or status on the page'}
+        return {'outcome': 'fetched', 'address': address, 'price': price, 'status': status,
+                'bodyHash': body_hash, **validators}
+    except requests.exceptions.RequestException as e:
+        return {'outcome': 'error', 'error': str(e)}
+
+
+def change_events(row, result, observed_at):
+    """Event dicts for a fetched result that differs from the stored price/status"""
+    events = []
+    base = {'url': row['url'], 'address': result.get('address') or row['address'], 'at': observed_at}
+    old_price, new_price = row['price'], result.get('price')
+    if new_price is not None and old_price is not None and new_price != old_price:
+        events.append(dict(base, type='price', old=old_price, new=new_price,
+                           change=new_price - old_price, percent=round((new_price - old_price) / old_price * 100, 2)))
+    old_status, new_status = row['status'], result.get('status')
+    # A page seen before without a status that now 404s still counts as removed
+    if old_status is None and new_status == 'Removed' and old_price is not None:
+        old_status = 'Unknown'
+    if new_status is not None and old_status is not None and new_status != old_status:
+        events.append(dict(base, type='status', old=old_status, new=new_status))
+    return events
+
+
+class PriceWatcher:
+    """Tracked listing URLs, their check schedule and price/status history"""
+
+    def __init__(self, path=DEFAULT_DB, events_file=DEFAULT_EVENTS, webhook=None,
+                 workers=DEFAULT_WORKERS, host_delay=DEFAULT_HOST_DELAY):
+        self.path = Path(path)
+        self.events_file = Path(events_file)
+        self.webhook = webhook
+        self.workers = workers
+        self.host_delay = host_delay
+        self.host_next = {}       # host -> earliest time its next request may start
+        self.stats = {'checks': 0, 'first': 0, 'notModified': 0, 'unchanged': 0, 'changed': 0, 'errors': 0,
+                      'events': 0}
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def add(self, urls, interval_hours=DEFAULT_INTERVAL_HOURS):
+        """Track URLs (already tracked ones keep their history); returns how many were new.
+        New URLs are due now; host spacing keeps a large batch from arriving at once."""
+        interval = int(interval_hours * 3600)
+        now, added = time.time(), 0
+        for url in urls:
+            key = canonical_url(url)
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO watched (canonicalUrl, url, host, intervalSeconds, nextCheckAt, addedAt) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, url, urlsplit(key).hostname or '', interval, now, timestamp())
+            )
+            added += cursor.rowcount
+        self.conn.commit()
+        return added
+
+    def remove(self, url):
+        key = canonical_url(url)
+        self.conn.execute('DELETE FROM price_history WHERE canonicalUrl = ?', (key,))
+        removed = self.conn.execute('DELETE FROM watched WHERE canonicalUrl = ?', (key,)).rowcount
+        self.conn.commit()
+        return removed
+
+    def history(self, url):
+        return self.conn.execute(
+            'SELECT observedAt, price, status FROM price_history WHERE canonicalUrl = ? ORDER BY observedAt',
+            (canonical_url(url),)
+        ).fetchall()
+
+    def due(self, now, limit, skip_hosts=(), skip_urls=()):
+        """Due rows, oldest first, leaving out busy hosts and URLs already in flight"""
+        skip_hosts, skip_urls = list(skip_hosts), list(skip_urls)
+        sql = 'SELECT * FROM watched WHERE nextCheckAt <= ?'
+        if skip_hosts:
+            sql += f" AND host NOT IN ({', '.join('?' * len(skip_hosts))})"
+        if skip_urls:
+            sql += f" AND canonicalUrl NOT IN ({', '.join('?' * len(skip_urls))})"
+        return self.conn.execute(sql + ' ORDER BY nextCheckAt LIMIT ?',
+                                 (now, *skip_hosts, *skip_urls, limit)).fetchall()
+
+    def reserve_host(self, host, now):
+        """Start time for the next request to host, spacing requests host_delay apart"""
+        start = max(now, self.host_next.get(host, 0.0))
+        self.host_next[host] = start + self.host_delay
+        return start
+
+    def next_check(self, row, failures=0):
+        interval = row['intervalSeconds'] * min(2 ** failures, MAX_BACKOFF_FACTOR)
+        if row['checks'] == 0 and not failures:
+            # After the first check, spread a batch added together over the interval
+            return time.time() + spread_offset(row['canonicalUrl'], interval)
+        return time.time() + interval * (1 + random.uniform(-JITTER, JITTER))
+
+    def record(self, row, result):
+        """Store one check's result, history and events (main thread only)"""
+        now = timestamp()
+        key = row['canonicalUrl']
+        self.stats['checks'] += 1
+        outcome = result['outcome']
+
+        if outcome == 'error':
+            failures = row['failures'] + 1
+            self.stats['errors'] += 1
+            self.conn.execute(
+                'UPDATE watched SET checks = checks + 1, failures = ?, lastError = ?, lastCheckedAt = ?, '
+                'nextCheckAt = ? WHERE canonicalUrl = ?',
+                (failures, result['error'], now, self.next_check(row, failures), key)
+            )
+            return []
+
+        if outcome in ('not-modified', 'unchanged'):
+            self.stats['notModified' if outcome == 'not-modified' else 'unchanged'] += 1
+            self.conn.execute(
+                'UPDATE watched SET checks = checks + 1, notModified = notModified + ?, failures = 0, '
+                'lastError = NULL, lastCheckedAt = ?, nextCheckAt = ?, '
+                'etag = COALESCE(?, etag), lastModified = COALESCE(?, lastModified) WHERE canonicalUrl = ?',
+                (1 if outcome == 'not-modified' else 0, now, self.next_check(row),
+                 result.get('etag'), result.get('lastModified'), key)
+            )
+            return []
+
+        if row['status'] == 'Removed' and result['status'] is None:
+            result['status'] = 'Active'       # Back online without an availability of its own
+        price = result['price'] if result['price'] is not None else row['price']
+        status = result['status'] or row['status']
+        events = change_events(row, result, now)
+        first = row['price'] is None and row['status'] is None
+        if events or first:
+            self.conn.execute('INSERT INTO price_history (canonicalUrl, observedAt, price, status) VALUES (?, ?, ?, ?)',
+                              (key, now, price, status))
+        self.stats['changed' if events else 'first' if first else 'unchanged'] += 1
+        self.conn.execute(
+            'UPDATE watched SET checks = checks + 1, failures = 0, lastError = NULL, lastCheckedAt = ?, '
+            'nextCheckAt = ?, etag = ?, lastModified = ?, bodyHash = ?, address = COALESCE(?, address), '
+            'price = ?, status = ?, lastChangedAt = CASE WHEN ? THEN ? ELSE lastChangedAt END WHERE canonicalUrl = ?',
+            (now, self.next_check(row), result.get('etag'), result.get('lastModified'), result.get('bodyHash'),
+             result.get('address'), price, status, bool(events), now, key)
+        )
+        return events
+
+    def emit(self, events, session):
+        """Append events to the events file and POST them to the webhook"""
+        if not events:
+            return
+        self.stats['events'] += len(events)
+        with open(self.events_file, 'a', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+        for event in events:
+            arrow = f"${event['old']:,} → ${event['new']:,} ({event['percent']:+.1f}%)" if event['type'] == 'price' \
+                else f"{event['old']} → {event['new']}"
+            print(f"  🔔 {event['address'] or event['url']}: {arrow}")
+            if self.webhook:
+                try:
+                    session.post(self.webhook, json=event, timeout=10).raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    print(f"  ⚠️  Webhook failed ({e}); event kept in {self.events_file}")
+
+    def run(self, once=False, progress=True):
+        """Check URLs as they come due; with once=True stop when nothing is due any more"""
+        started = time.time()
+        in_flight = {}            # future -> row
+        host_load = {}            # host -> checks in flight
+
+        with make_session(self.workers) as session, ThreadPoolExecutor(max_workers=self.workers) as pool:
+
+            def delayed_check(row, start):
+                time.sleep(max(0.0, start - time.time()))
+                return check_url(session, row)
+
+            while True:
+                now = time.time()
+                horizon = now + MAX_SLEEP
+                # Keep the pool fed without reserving far-off host slots for more rows than it can run.
+                # A host whose next slot is past the horizon waits for its in-flight checks; its rows
+                # stay due, so a single pass (only URLs due when it started) still reaches all of them
+                busy = {host for host in host_load if self.host_next.get(host, 0.0) > horizon}
+                queued = [row['canonicalUrl'] for row in in_flight.values()]
+                for row in self.due(started if once else now, self.workers * 4, busy, queued):
+                    if len(in_flight) >= self.workers * 2:
+                        break
+                    host = row['host']
+                    if host in busy:
+                        continue
+                    start = self.reserve_host(host, now)
+                    if start > horizon and host_load.get(host):
+                        self.host_next[host] -= self.host_delay
+                        busy.add(host)
+                        continue
+                    in_flight[pool.submit(delayed_check, row, start)] = row
+                    host_load[host] = host_load.get(host, 0) + 1
+
+                if not in_flight:
+                    if once:
+                        break
+                    next_due = self.conn.execute('SELECT MIN(nextCheckAt) FROM watched').fetchone()[0]
+                    time.sleep(min(MAX_SLEEP, max(0.5, (next_due or now + MAX_SLEEP) - time.time())))
+                    continue
+
+                done, _ = wait(list(in_flight), timeout=MAX_SLEEP, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = in_flight.pop(future)
+                    host_load[row['host']] -= 1
+                    if not host_load[row['host']]:
+                        del host_load[row['host']]
+                    self.emit(self.record(row, future.result()), session)
+                self.conn.commit()
+                if progress and done and self.stats['checks'] % 100 < len(done):
+                    self.print_stats(time.time() - started)
+
+        return self.stats
+
+    def print_stats(self, seconds):
+        s = self.stats
+        rate = s['checks'] / seconds * 60 if seconds else 0
+        print(f"  ⏱️  {s['checks']:,} check(s) ({rate:,.0f}/min): {s['first']:,} first seen, "
+              f"{s['notModified']:,} not modified, {s['unchanged']:,} unchanged, {s['changed']:,} changed, {s['errors']:,} error(s)")
+
+    def summary(self):
+        total, due, failing = self.conn.execute(
+            'SELECT COUNT(*), COUNT(CASE WHEN nextCheckAt <= ? THEN 1 END), COUNT(CASE WHEN failures > 0 THEN 1 END) '
+            'FROM watched', (time.time(),)
+        ).fetchone()
+        return {'tracked': total, 'due': due, 'failing': failing}
+
+
+def print_list(watcher):
+    rows = watcher.conn.execute(
+        'SELECT url, address, price, status, lastCheckedAt, lastChangedAt, nextCheckAt, failures '
+        'FROM watched ORDER BY nextCheckAt'
+    ).fetchall()
+    for row in rows:
+        price = f"${row['price']:,}" if row['price'] else 'no price yet'
+        next_check = datetime.fromtimestamp(row['nextCheckAt'], timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
+        failing = f", ❌ {row['failures']} failure(s)" if row['failures'] else ''
+        print(f"  {row['address'] or row['url']}")
+        print(f"     {price} · {row['status'] or 'unknown status'} · next check {next_check}{failing}")
+    summary = watcher.summary()
+    print(f"\n📋 {summary['tracked']} tracked URL(s), {summary['due']} due, {summary['failing']} failing")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch tracked listing URLs for price and status changes')
+    parser.add_argument('--add', nargs='+', metavar='URL_OR_FILE', help='Track URLs (or a URL file / listings JSON)')
+    parser.add_argument('--remove', metavar='URL', help='Stop tracking a URL and drop its history')
+    parser.add_argument('--list', action='store_true', help='Show tracked URLs and their next check')
+    parser.add_argument('--history', metavar='URL', help='Show the price/status history of a URL')
+    parser.add_argument('--once', action='store_true', help='Check every URL that is due, then exit')
+    parser.add_argument('--db', default=str(DEFAULT_DB), help=f'Watch database (default: {DEFAULT_DB.name})')
+    parser.add_argument('--events', default=str(DEFAULT_EVENTS), help=f'Change events file (default: {DEFAULT_EVENTS.name})')
+    parser.add_argument('--webhook', help='POST each change event as JSON to this URL')
+    parser.add_argument('--interval-hours', type=float, default=DEFAULT_INTERVAL_HOURS,
+                        help=f'Hours between checks of URLs added now (default: {DEFAULT_INTERVAL_HOURS})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'Concurrent checks (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--host-delay', type=float, default=DEFAULT_HOST_DELAY,
+                        help=f'Seconds between requests to one site (default: {DEFAULT_HOST_DELAY})')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VDI Realty - Listing Price Watcher")
+    print("=" * 60)
+
+    with PriceWatcher(args.db, args.events, args.webhook, args.workers, args.host_delay) as watcher:
+        if args.add:
+            urls = read_urls(args.add)
+            added = watcher.add(urls, args.interval_hours)
+            print(f"✅ Tracking {added} new URL(s) ({len(urls) - added} already tracked), "
+                  f"checked every {args.interval_hours:g} hour(s)")
+            return 0
+        if args.remove:
+            if not watcher.remove(args.remove):
+                print(f"❌ Not tracked: {args.remove}")
+                return 1
+            print(f"🗑️  Stopped tracking {args.remove}")
+            return 0
+        if args.list:
+            print_list(watcher)
+            return 0
+        if args.history:
+            rows = watcher.history(args.history)
+            if not rows:
+                print(f"❌ No history for {args.history}")
+                return 1
+            for row in rows:
+                price = f"${row['price']:,}" if row['price'] else '-'
+                print(f"  {row['observedAt']}  {price:>14}  {row['status'] or ''}")
+            return 0
+
+        summary = watcher.summary()
+        if not summary['tracked']:
+            print("❌ No tracked URLs; add some with --add urls.txt")
+            return 1
+        print(f"👀 Watching {summary['tracked']} URL(s), {summary['due']} due now"
+              + (" (single pass)" if args.once else " (Ctrl+C to stop)"))
+        started = time.time()
+        try:
+            watcher.run(once=args.once)
+        except KeyboardInterrupt:
+            print("\n⏹️  Stopped")
+        watcher.print_stats(time.time() - started)
+        if watcher.stats['events']:
+            print(f"🔔 {watcher.stats['events']} change event(s) written to {args.events}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+VDI Realty - End-to-End Test Runner
+
+Starts the backend against a temporary SQLite database (plus the local SMTP
+stand-in for outgoing mail) and runs the listing flows from
+test-listing-flow.py and test-listing-with-photos.py in parallel workers.
+Every flow submits its own uniquely generated listing, so flows never depend
+on each other's data or on fixed waits, and the report shows how long each
+step took.
+
+Flows:
+    lifecycle     submit, public + admin listings, delete, verify removal (--repeat times)
+    contact       private listing hides contact info; inquiry reaches the seller's inbox
+    photo-urls    listing with extracted photo URLs shows up with its photos
+    photo-upload  multipart upload: dedup, resized variants, cache headers
+    search        new listing is found by keyword search
+
+Usage:
+    python run_e2e_tests.py                          # All flows, 4 workers, temporary backend
+    python run_e2e_tests.py --workers 8 --repeat 4
+    python run_e2e_tests.py --only lifecycle search --verbose
+    python run_e2e_tests.py --api http://localhost:3000 --password secret
+"""
+
+import io
+import sys
+import time
+import uuid
+import argparse
+import threading
+import importlib.util
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from local_backend import start_backend
+from local_smtp import start_smtp, backend_env
+
+HERE = Path(__file__).parent
+MAIL_TIMEOUT = 15
+
+
+def load_script(filename):
+    """Import a hyphen-named test script as a module"""
+    name = filename[:-3].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(name, HERE / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+flow = load_script('test-listing-flow.py')
+photos = load_script('test-listing-with-photos.py')
+
+
+class ThreadOutput:
+    """sys.stdout stand-in that gives each flow's thread its own buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffers = {}
+
+    def capture(self):
+        buffer = io.StringIO()
+        self.buffers[threading.get_ident()] = buffer
+        return buffer
+
+    def release(self):
+        self.buffers.pop(threading.get_ident(), None)
+
+    def write(self, text):
+        return self.buffers.get(threading.get_ident(), self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def contact_hidden(listing_id):
+    result = flow.api_request('GET', f'/api/fsbo/listing/{listing_id}')
+    listing = result.get('data', {}).get('listing') or {}
+    return result['ok'] and listing.get('email') is None and listing.get('phone') is None
+
+
+def send_inquiry(listing_id):
+    result = flow.api_request('POST', f'/api/fsbo/contact/{listing_id}', {
+        'name': 'E2E Buyer',
+        'email': 'buyer@example.com',
+        'message': 'Is the house still available?'
+    })
+    return result['ok'] and result['data'].get('success')
+
+
+def inquiry_delivered(smtp, recipient):
+    """Wait for the outbox worker to hand the inquiry to the SMTP stand-in"""
+    deadline = time.time() + MAIL_TIMEOUT
+    while time.time() < deadline:
+        with smtp.lock:
+            if any(recipient in message['to'] and 'Inquiry' in message['subject'] for message in smtp.messages):
+                return True
+        time.sleep(0.05)
+    return False
+
+
+def found_by_search(listing_id, word):
+    result = flow.api_request('GET', f'/api/fsbo/search?q={word}')
+    return result['ok'] and any(
+        item['type'] == 'listing' and item['id'] == listing_id for item in result['data'].get('results', [])
+    )
+
+
+def lifecycle_flow(smtp):
+    _, steps = flow.run_flow(flow.make_test_listing())
+    return steps
+
+
+def contact_flow(smtp):
+    steps = []
+    listing = flow.make_test_listing(privateContact=True)
+    listing_id = flow.time_step(steps, 'submit', flow.test_submit_listing, listing)
+    if listing_id and flow.time_step(steps, 'contact hidden', contact_hidden, listing_id):
+        if flow.time_step(steps, 'send inquiry', send_inquiry, listing_id) and smtp:
+            flow.time_step(steps, 'inquiry delivered', inquiry_delivered, smtp, listing['email'])
+    return steps
+
+
+def photo_urls_flow(smtp):
+    steps = []
+    listing = flow.make_test_listing(photoUrls=photos.test_listing['photoUrls'])
+    listing_id = flow.time_step(steps, 'submit', photos.submit_listing, listing)
+    if listing_id:
+        flow.time_step(steps, 'verify photos', photos.verify_listing, listing_id, listing)
+    return steps
+
+
+def photo_upload_flow(smtp):
+    steps = []
+    flow.time_step(steps, 'upload + resize', photos.test_photo_upload, flow.make_test_listing())
+    return steps
+
+
+def search_flow(smtp):
+    steps = []
+    tag = uuid.uuid4().hex[:10]
+    listing_id = flow.time_step(steps, 'submit', flow.test_submit_listing, flow.make_test_listing(tag))
+    if listing_id:
+        flow.time_step(steps, 'keyword search', found_by_search, listing_id, f"e2e{tag}")
+    return steps
+
+
+FLOWS = {
+    'lifecycle': lifecycle_flow,
+    'contact': contact_flow,
+    'photo-urls': photo_urls_flow,
+    'photo-upload': photo_upload_flow,
+    'search': search_flow
+}
+
+
+def run_flows(jobs, smtp, workers, output):
+    """Run (label, flow) jobs in parallel; returns results in job order"""
+    def run_one(job):
+        label, run = job
+        buffer = output.capture()
+        started = time.perf_counter()
+        try:
+            steps = run(smtp)
+        except Exception as e:
+            steps = [{'step': 'crashed', 'ok': False, 'seconds': 0.0, 'error': str(e)}]
+        finally:
+            output.release()
+        return {'flow': label, 'steps': steps, 'ok': bool(steps) and all(step['ok'] for step in steps),
+                'seconds': time.perf_counter() - started, 'output': buffer.getvalue()}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_one, jobs))
+
+
+def print_report(results, verbose):
+    print("\n" + "=" * 60)
+    print("📋 RESULTS")
+    print("=" * 60)
+    for result in results:
+        print(f"\n{'✅' if result['ok'] else '❌'} {result['flow']:<24} {result['seconds']:6.2f}s")
+        for step in result['steps']:
+            detail = f"  ({step['error']})" if step['error'] else ''
+            print(f"   {'✓' if step['ok'] else '✗'} {step['step']:<20} {step['seconds'] * 1000:7.0f} ms{detail}")
+        if result['output'] and (verbose or not result['ok']):
+            print("   --- output ---")
+            print('\n'.join(f"   {line}" for line in result['output'].rstrip().splitlines()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the listing flows in parallel against a temporary backend')
+    parser.add_argument('--workers', type=int, default=4, help='Flows to run at once (default: 4)')
+    parser.add_argument('--repeat', type=int, default=2, help='Lifecycle flows to run (default: 2)')
+    parser.add_argument('--only', nargs='+', choices=sorted(FLOWS), help='Run only these flows')
+    parser.add_argument('--api', help='Test an already running backend instead of starting one '
+                                      '(mail delivery is not checked)')
+    parser.add_argument('--password', default=flow.ADMIN_PASSWORD, help='Admin password for --api')
+    parser.add_argument('--verbose', action='store_true', help='Show every flow\'s output, not just failures')
+    args = parser.parse_args()
+
+    names = args.only or list(FLOWS)
+    jobs = [(f"{name} #{n}" if name == 'lifecycle' and args.repeat > 1 else name, FLOWS[name])
+            for name in names for n in range(1, (args.repeat if name == 'lifecycle' else 1) + 1)]
+
+    print("=" * 60)
+    print("VDI Realty - End-to-End Tests")
+    print("=" * 60)
+    print(f"{len(jobs)} flow(s), {args.workers} worker(s)")
+
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    started = time.perf_counter()
+    try:
+        if args.api:
+            flow.API_BASE_URL = photos.API_BASE_URL = args.api.rstrip('/')
+            flow.ADMIN_PASSWORD = photos.ADMIN_PASSWORD = args.password
+            print(f"🌐 API: {flow.API_BASE_URL}")
+            results = run_flows(jobs, None, args.workers, output)
+            elapsed = time.perf_counter() - started
+        else:
+            with start_smtp() as smtp, start_backend(env=backend_env(smtp)) as api:
+                flow.API_BASE_URL = photos.API_BASE_URL = api.url
+                flow.ADMIN_PASSWORD = photos.ADMIN_PASSWORD = api.admin_password
+                startup = time.perf_counter() - started
+                print(f"🚀 Backend up at {api.url} in {startup:.2f}s (temporary database {api.db_path})")
+                started = time.perf_counter()
+                results = run_flows(jobs, smtp, args.workers, output)
+                elapsed = time.perf_counter() - started
+    finally:
+        sys.stdout = output.stream
+
+    print_report(results, args.verbose)
+    passed = sum(1 for result in results if result['ok'])
+    busy = sum(result['seconds'] for result in results)
+    print(f"\n⏱️  {elapsed:.2f}s wall for {busy:.2f}s of flows ({busy / elapsed:.1f}x parallel)")
+    print(f"{'✅ ALL FLOWS PASSED' if passed == len(results) else '❌ SOME FLOWS FAILED'} "
+          f"({passed}/{len(results)})")
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,7 +8,14 @@ This script tests the complete listing lifecycle:
 4. Delete the listing via admin
 5. Verify it's removed from public view but still in admin with 'removed' status
 
-Usage: python test-listing-flow.py
+Each run submits a fresh listing (unique address, email and price), so runs
+never trip over each other's data; run_e2e_tests.py runs this flow alongside
+the photo, contact and search flows in parallel against a local backend.
+
+Usage:
+    python test-listing-flow.py                    # Against production
+    python test-listing-flow.py --local            # Against a temporary local backend
+    python test-listing-flow.py --api http://localhost:3000 --password secret
 
 Requirements: Python 3.6+, requests library (pip install requests)
 """
@@ -16,8 +23,12 @@ Requirements: Python 3.6+, requests library (pip install requests)
 import requests
 import json
 import time
+import uuid
+import argparse
+import threading
 from datetime import datetime
 import sys
+from urllib.parse import urlencode
 
 API_BASE_URL = 'https://api.vdirealty.com'
 ADMIN_PASSWORD = 'VDI2025AdminSecure789'  # From .env
@@ -50,7 +61,7 @@ def log_error(message):
 def log_info(message):
     log(f"ℹ {message}", 'BLUE')
 
-# Test data for a residential listing
+# Test data for a residential listing (make_test_listing() gives each run its own copy)
 test_listing = {
     # Contact Info
     'firstName': 'Test',
@@ -87,6 +98,28 @@ test_listing = {
     'externalUrl': ''
 }
 
+def make_test_listing(tag=None, **overrides):
+    """A copy of test_listing no other run shares; its description carries the search word e2e<tag>"""
+    serial = uuid.uuid4().int
+    tag = tag or f"{serial:x}"[:10]
+    listing = dict(test_listing)
+    listing.update({
+        'address': f"{1000 + serial % 90000} Test Street",
+        'email': f"test.seller+{tag}@example.com",
+        'price': 650000 + (serial % 100000) * 10,
+        'description': f"{test_listing['description']} Run e2e{tag}.",
+    })
+    listing.update(overrides)
+    return listing
+
+# One keep-alive session per thread (requests.Session isn't safe to share across threads)
+_local = threading.local()
+
+def http():
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
+
 def api_request(method, endpoint, data=None, headers=None):
     """Make an API request and return the response"""
     url = f"{API_BASE_URL}{endpoint}"
@@ -95,11 +128,11 @@ def api_request(method, endpoint, data=None, headers=None):
     
     try:
         if method == 'GET':
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http().get(url, headers=headers, timeout=10)
         elif method == 'POST':
-            response = requests.post(url, json=data, headers=headers, timeout=10)
+            response = http().post(url, json=data, headers=headers, timeout=10)
         elif method == 'DELETE':
-            response = requests.delete(url, headers=headers, timeout=10)
+            response = http().delete(url, headers=headers, timeout=10)
         else:
             raise ValueError(f"Unsupported method: {method}")
         
@@ -115,16 +148,16 @@ def api_request(method, endpoint, data=None, headers=None):
             'error': str(e)
         }
 
-def test_submit_listing():
+def test_submit_listing(listing):
     """Test Step 1: Submit a new FSBO listing"""
     log_step(1, 'Submit New FSBO Listing')
     
-    log_info(f"Submitting test listing for: {test_listing['address']}, {test_listing['city']}")
-    log_info(f"Property Type: {test_listing['propertyType']}")
-    log_info(f"Price: ${test_listing['price']:,}")
-    log_info(f"Details: {test_listing['bedrooms']} bed, {test_listing['bathrooms']} bath, {test_listing['sqft']} sqft")
+    log_info(f"Submitting test listing for: {listing['address']}, {listing['city']}")
+    log_info(f"Property Type: {listing['propertyType']}")
+    log_info(f"Price: ${listing['price']:,}")
+    log_info(f"Details: {listing['bedrooms']} bed, {listing['bathrooms']} bath, {listing['sqft']} sqft")
     
-    result = api_request('POST', '/api/fsbo/submit', test_listing)
+    result = api_request('POST', '/api/fsbo/submit', listing)
     
     if result['ok'] and result['data'].get('success'):
         log_success("Listing created successfully!")
@@ -138,13 +171,23 @@ def test_submit_listing():
         log_error(f"Failed to create listing: {error_msg}")
         raise Exception('Failed to create listing')
 
-def test_public_listings(expected_listing_id):
+def public_listings_endpoint(listing):
+    """GET /api/fsbo/listings narrowed server-side to listings like the test listing"""
+    return '/api/fsbo/listings?' + urlencode({
+        'city': listing['city'],
+        'zip': listing['zip'],
+        'minPrice': listing['price'],
+        'maxPrice': listing['price'],
+        'limit': 200
+    })
+
+def test_public_listings(expected_listing_id, listing):
     """Test Step 2: Verify listing appears in public view"""
     log_step(2, 'Verify Listing Appears in Public View')
     
-    log_info('Fetching public listings (GET /api/fsbo/listings)...')
+    log_info(f"Fetching matching public listings (GET {public_listings_endpoint(listing)})...")
     
-    result = api_request('GET', '/api/fsbo/listings')
+    result = api_request('GET', public_listings_endpoint(listing))
     
     if result['ok'] and result['data'].get('success'):
         count = result['data']['count']
@@ -245,13 +288,13 @@ def test_delete_listing(listing_id):
         log_error(f"Failed to delete listing: {error_msg}")
         return False
 
-def test_verify_deletion(listing_id):
+def test_verify_deletion(listing_id, listing):
     """Test Step 5: Verify listing removed from public view"""
     log_step(5, 'Verify Listing Removed from Public View')
     
     log_info('Checking public listings...')
     
-    public_result = api_request('GET', '/api/fsbo/listings')
+    public_result = api_request('GET', public_listings_endpoint(listing))
     
     if public_result['ok'] and public_result['data'].get('success'):
         listings = public_result['data']['listings']
@@ -291,6 +334,32 @@ def test_verify_deletion(listing_id):
         log_error("Failed to fetch admin listings for verification")
         return False
 
+def time_step(steps, name, check, *args):
+    """Run one check, append {'step', 'ok', 'seconds', 'error'} to steps and return its result"""
+    started = time.perf_counter()
+    try:
+        value = check(*args)
+        error = None if value else 'check failed'
+    except Exception as e:
+        value, error = None, str(e)
+    steps.append({'step': name, 'ok': error is None,
+                  'seconds': time.perf_counter() - started, 'error': error})
+    return value
+
+def run_flow(listing=None):
+    """Submit, verify, delete and re-verify one listing; returns (listing_id, steps)"""
+    listing = listing or make_test_listing()
+    steps = []
+    
+    # Submit responds after the row is committed, so later steps need no waits
+    listing_id = time_step(steps, 'submit', test_submit_listing, listing)
+    if listing_id:
+        time_step(steps, 'public listings', test_public_listings, listing_id, listing)
+        time_step(steps, 'admin listings', test_admin_listings, listing_id, 'active')
+        if time_step(steps, 'delete', test_delete_listing, listing_id):
+            time_step(steps, 'verify deletion', test_verify_deletion, listing_id, listing)
+    return listing_id, steps
+
 def run_tests():
     """Main test runner"""
     log('\n' + '═' * 60, 'BOLD')
@@ -301,54 +370,18 @@ def run_tests():
     log(f"Test Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 'CYAN')
     log(f"Admin Auth: {'Configured ✓' if ADMIN_PASSWORD else 'Missing ✗'}", 'CYAN')
     
-    tests_passed = 0
-    tests_failed = 0
-    listing_id = None
-    
-    try:
-        # Test 1: Submit listing
-        listing_id = test_submit_listing()
-        tests_passed += 1
-        
-        # Wait a moment for database to settle
-        time.sleep(1)
-        
-        # Test 2: Verify in public listings
-        if test_public_listings(listing_id):
-            tests_passed += 1
-        else:
-            tests_failed += 1
-        
-        # Test 3: Verify in admin panel
-        if test_admin_listings(listing_id, 'active'):
-            tests_passed += 1
-        else:
-            tests_failed += 1
-        
-        # Test 4: Delete listing
-        if test_delete_listing(listing_id):
-            tests_passed += 1
-        else:
-            tests_failed += 1
-            raise Exception('Cannot continue without successful deletion')
-        
-        # Wait a moment for deletion to process
-        time.sleep(1)
-        
-        # Test 5: Verify deletion
-        if test_verify_deletion(listing_id):
-            tests_passed += 1
-        else:
-            tests_failed += 1
-        
-    except Exception as e:
-        log_error(f"\nTest suite failed: {str(e)}")
-        tests_failed += 1
+    listing_id, steps = run_flow()
+    tests_passed = sum(1 for step in steps if step['ok'])
+    tests_failed = len(steps) - tests_passed
     
     # Final summary
     log('\n' + '═' * 60, 'BOLD')
     log('  TEST SUMMARY  ', 'BOLD')
     log('═' * 60, 'BOLD')
+    for step in steps:
+        mark = '✓' if step['ok'] else '✗'
+        detail = f"  ({step['error']})" if step['error'] else ''
+        log(f"{mark} {step['step']:<16} {step['seconds'] * 1000:7.0f} ms{detail}", 'GREEN' if step['ok'] else 'RED')
     log(f"Total Tests: {tests_passed + tests_failed}", 'CYAN')
     log(f"Passed: {tests_passed}", 'GREEN')
     log(f"Failed: {tests_failed}", 'RED')
@@ -367,14 +400,22 @@ def run_tests():
         log('Please review the errors above and check the system.\n', 'RED')
         return 1
 
+def main():
+    global API_BASE_URL, ADMIN_PASSWORD
+    parser = argparse.ArgumentParser(description='Test the FSBO listing lifecycle')
+    parser.add_argument('--local', action='store_true', help='Start a temporary local backend and test against it')
+    parser.add_argument('--api', default=API_BASE_URL, help=f'API base URL (default: {API_BASE_URL})')
+    parser.add_argument('--password', default=ADMIN_PASSWORD, help='Admin password for the admin steps')
+    args = parser.parse_args()
+    API_BASE_URL, ADMIN_PASSWORD = args.api, args.password
+    
+    if not args.local:
+        return run_tests()
+    
+    from local_backend import start_backend
+    with start_backend() as api:
+        API_BASE_URL, ADMIN_PASSWORD = api.url, api.admin_password
+        return run_tests()
+
 if __name__ == '__main__':
-    # Check if requests library is available
-    try:
-        import requests
-    except ImportError:
-        print("Error: 'requests' library not found.")
-        print("Please install it with: pip install requests")
-        sys.exit(1)
-    
-    exit_code = run_tests()
-    sys.exit(exit_code)
+    sys.exit(main())
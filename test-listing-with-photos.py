@@ -5,10 +5,20 @@ This script tests:
 1. Submit a listing with multiple photo URLs (extracted photos)
 2. Verify the listing displays with photo navigation
 3. Test the contact seller functionality
+4. (--upload / --local) Upload real photo files as multipart form data and
+   check content-hash dedup, resized variants and cache headers
 
-Usage: python test-listing-with-photos.py
+Usage:
+    python test-listing-with-photos.py            # Production API, interactive
+    python test-listing-with-photos.py --local    # Throwaway local backend, automatic
+    python test-listing-with-photos.py --upload --api http://localhost:3000
 """
 
+import sys
+import time
+import zlib
+import struct
+import argparse
 import requests
 import json
 from datetime import datetime
@@ -46,19 +56,20 @@ test_listing = {
     ])
 }
 
-def submit_listing():
+def submit_listing(listing=None):
     """Submit listing with multiple photos"""
+    listing = listing or test_listing
     print("\n" + "="*60)
     print("📸 SUBMITTING LISTING WITH MULTIPLE PHOTOS")
     print("="*60)
     
-    print(f"\n🏠 Property: {test_listing['address']}, {test_listing['city']}")
-    print(f"💰 Price: ${test_listing['price']:,}")
+    print(f"\n🏠 Property: {listing['address']}, {listing['city']}")
+    print(f"💰 Price: ${listing['price']:,}")
     print(f"📷 Photos: 5 images")
     
     response = requests.post(
         f"{API_BASE_URL}/api/fsbo/submit",
-        json=test_listing,
+        json=listing,
         headers={'Content-Type': 'application/json'},
         timeout=10
     )
@@ -74,13 +85,22 @@ def submit_listing():
     print(f"\n❌ FAILED: {response.text}")
     return None
 
-def verify_listing(listing_id):
+def verify_listing(listing_id, submitted=None):
     """Verify the listing appears with photos"""
+    submitted = submitted or test_listing
     print("\n" + "="*60)
     print("🔍 VERIFYING LISTING")
     print("="*60)
     
-    response = requests.get(f"{API_BASE_URL}/api/fsbo/listings", timeout=10)
+    # Narrow the search server-side instead of downloading every listing
+    params = {
+        'city': submitted['city'],
+        'zip': submitted['zip'],
+        'minPrice': submitted['price'],
+        'maxPrice': submitted['price'],
+        'limit': 200
+    }
+    response = requests.get(f"{API_BASE_URL}/api/fsbo/listings", params=params, timeout=10)
     
     if response.ok:
         data = response.json()
@@ -109,6 +129,78 @@ def verify_listing(listing_id):
     print(f"\n❌ Listing not found")
     return False
 
+def make_png(width, height, seed):
+    """A width x height RGB PNG with a seed-dependent pattern (no imaging library needed)"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)  # Filter type: none
+        rows.extend(((x * 7 + y * 3 + seed) * (x ^ y)) & 0xff for x in range(width * 3))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(bytes(rows), 6)) + chunk(b'IEND', b''))
+
+def test_photo_upload(listing=None):
+    """Upload 3 photos (one a duplicate) as multipart/form-data and check the photo pipeline"""
+    listing_fields = dict(listing or test_listing, address='789 Upload Court')
+    print("\n" + "="*60)
+    print("📤 MULTIPART PHOTO UPLOAD")
+    print("="*60)
+
+    first, second = make_png(1600, 1200, 1), make_png(1600, 1200, 2)
+    files = [
+        ('photos', ('front.png', first, 'image/png')),
+        ('photos', ('kitchen.png', second, 'image/png')),
+        ('photos', ('front-copy.png', first, 'image/png'))
+    ]
+    fields = {key: str(value) for key, value in listing_fields.items() if key != 'photoUrls'}
+
+    response = requests.post(f"{API_BASE_URL}/api/fsbo/submit", data=fields, files=files, timeout=60)
+    if not (response.ok and response.json().get('success')):
+        print(f"\n❌ Upload failed: {response.text}")
+        return None
+    listing_id = response.json()['listingId']
+    print(f"\n✅ Listing {listing_id} created with {len(files)} uploaded photos "
+          f"({len(first) / 1024 / 1024:.1f} MB each)")
+
+    listing = requests.get(f"{API_BASE_URL}/api/fsbo/listing/{listing_id}", timeout=10).json()['listing']
+    photos = listing['photos']
+    checks = [
+        ('3 photos attached', len(photos) == 3),
+        ('duplicate upload stored once', photos[0]['filename'] == photos[2]['filename']),
+        ('distinct uploads stored separately', photos[0]['filename'] != photos[1]['filename']),
+        ('sizes listed', set(photos[0].get('sizes') or {}) >= {'thumb', 'card', 'large', 'original'})
+    ]
+
+    original = requests.get(f"{API_BASE_URL}{photos[0]['sizes']['original']}", timeout=10)
+    checks += [
+        ('original served', original.ok and original.content == first),
+        ('original cached as immutable', 'immutable' in original.headers.get('Cache-Control', ''))
+    ]
+
+    # Variants are generated in the background; poll until the thumbnail is ready
+    thumb = None
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        thumb = requests.get(f"{API_BASE_URL}{photos[0]['sizes']['thumb']}", timeout=10)
+        if thumb.headers.get('X-Photo-Size') == 'thumb':
+            break
+        time.sleep(0.5)
+    checks += [
+        ('thumbnail generated', thumb is not None and thumb.headers.get('X-Photo-Size') == 'thumb'),
+        ('thumbnail is WebP', thumb is not None and thumb.headers.get('Content-Type', '').startswith('image/webp')),
+        ('thumbnail smaller than original', thumb is not None and len(thumb.content) < len(first)),
+        ('thumbnail cached as immutable', thumb is not None and 'immutable' in thumb.headers.get('Cache-Control', ''))
+    ]
+
+    for name, ok in checks:
+        print(f"   {'✅' if ok else '❌'} {name}")
+    if thumb is not None and thumb.ok:
+        print(f"   📉 {len(first) / 1024:.0f} KB original → {len(thumb.content) / 1024:.0f} KB thumbnail")
+    return listing_id if all(ok for _, ok in checks) else None
+
 def cleanup_listing(listing_id):
     """Delete test listing"""
     print("\n" + "="*60)
@@ -128,12 +220,48 @@ def cleanup_listing(listing_id):
     print(f"\n❌ Failed to delete: {response.text}")
     return False
 
+def run_local():
+    """Run every check against a throwaway local backend, then shut it down"""
+    global API_BASE_URL, ADMIN_PASSWORD
+    from local_backend import start_backend
+
+    with start_backend() as api:
+        API_BASE_URL, ADMIN_PASSWORD = api.url, api.admin_password
+        print(f"\nAPI: {API_BASE_URL} (local, temporary database)")
+
+        listing_id = submit_listing()
+        passed = bool(listing_id) and verify_listing(listing_id)
+        upload_id = test_photo_upload()
+        passed = passed and bool(upload_id)
+
+    print(f"\n{'✅ ALL CHECKS PASSED' if passed else '❌ SOME CHECKS FAILED'}\n")
+    return 0 if passed else 1
+
 def main():
+    global API_BASE_URL
+    parser = argparse.ArgumentParser(description='Test FSBO listings with photos')
+    parser.add_argument('--local', action='store_true', help='Start a temporary local backend and run all checks')
+    parser.add_argument('--upload', action='store_true', help='Also run the multipart photo upload test')
+    parser.add_argument('--api', default=API_BASE_URL, help=f'API base URL (default: {API_BASE_URL})')
+    args = parser.parse_args()
+    API_BASE_URL = args.api
+
     print("\n" + "═"*60)
     print("  FSBO MULTI-PHOTO GALLERY TEST")
     print("═"*60)
-    print(f"\nAPI: {API_BASE_URL}")
     print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if args.local:
+        return run_local()
+
+    print(f"\nAPI: {API_BASE_URL}")
+    
+    if args.upload:
+        upload_id = test_photo_upload()
+        if not upload_id:
+            print("\n❌ Test failed - photo upload checks")
+            return 1
+        cleanup_listing(upload_id)
     
     # Step 1: Submit listing with 5 photos
     listing_id = submit_listing()
@@ -178,5 +306,4 @@ def main():
     return 0
 
 if __name__ == '__main__':
-    import sys
     sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+VDI Realty - Listing Field Candidate Checks
+Checks that listing_candidates.py picks the right value when strategies
+disagree or only partly agree.
+
+Usage:
+    python test_listing_candidates.py       # or: python -m pytest test_listing_candidates.py
+"""
+
+import sys
+
+from bs4 import BeautifulSoup
+
+from listing_candidates import FieldCandidates
+from extract_listings import extract_century21, drop_low_confidence
+
+CENTURY21_PAGE = """
+<html><head>
+<script type="application/ld+json">
+{"@type": "SingleFamilyResidence", "name": "123 Main St Seattle WA 98101", "offers": {"price": "650000"}}
+</script>
+</head><body><h1>123 Main St</h1></body></html>
+"""
+
+
+def test_street_header_backs_full_json_ld_address():
+    """The h1 street is the JSON-LD address without the city, so it agrees rather than competes"""
+    listing = extract_century21('https://www.century21.com/property/1', BeautifulSoup(CENTURY21_PAGE, 'html.parser'))
+    assert listing['address'] == '123 Main St Seattle WA 98101'
+    assert listing['confidence']['address'] >= 0.85
+
+    assert drop_low_confidence(listing, 0.5) == []
+    assert listing['address'] == '123 Main St Seattle WA 98101'
+
+
+def test_different_street_still_competes():
+    candidates = FieldCandidates()
+    candidates.add('address', '123 Main St Seattle WA 98101', 'json-ld')
+    candidates.add('address', '456 Oak Ave', 'selector')
+    value, confidence = candidates.best('address')
+    assert value == '123 Main St Seattle WA 98101'
+    assert confidence < 0.85
+
+
+def test_mortgage_estimate_is_not_the_price():
+    candidates = FieldCandidates()
+    candidates.add_text('Est. payment $2,345/mo  List price $649,000  3 Beds')
+    value, _ = candidates.best('price')
+    assert value == 649000
+
+
+def test_in_range_estimate_loses_to_list_price():
+    """Both prices are plausible, so only the words around them tell them apart"""
+    candidates = FieldCandidates()
+    candidates.add_text('Zestimate $712,000   Built 1998, updated kitchen   List price $649,000   3 Beds')
+    value, _ = candidates.best('price')
+    assert value == 649000
+
+
+if __name__ == '__main__':
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)
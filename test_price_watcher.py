@@ -0,0 +1,105 @@
+"""
+VDI Realty - Price Watcher Checks
+Checks JSON-LD parsing, change events and single-pass scheduling in
+price_watcher.py. The scheduling test serves pages from a local http.server.
+
+Usage:
+    python test_price_watcher.py       # or: python -m pytest test_price_watcher.py
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import price_watcher
+from price_watcher import PriceWatcher, structured_data, change_events
+
+LISTING_PAGE = """
+<html><head>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@graph": [
+  {"@type": "WebPage", "name": "Listing"},
+  {"@type": "SingleFamilyResidence", "name": "123 Main St",
+   "offers": [{"price": "$649,000", "availability": "https://schema.org/SoldOut"}]}
+]}
+</script>
+</head><body></body></html>
+"""
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = (b'<script type="application/ld+json">'
+                b'{"@type": "Product", "offers": {"price": "500000", "availability": "InStock"}}</script>')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_structured_data_reads_graph_and_offer_list():
+    assert structured_data(LISTING_PAGE) == ('123 Main St', 649000, 'Sold')
+
+
+def test_structured_data_without_listing_json_ld():
+    assert structured_data('<script type="application/ld+json">{"@type": "WebPage"}</script>') == (None, None, None)
+    assert structured_data('<html><body>$649,000</body></html>') == (None, None, None)
+
+
+def test_change_events_price_drop():
+    row = {'url': 'https://example.com/1', 'address': '123 Main St', 'price': 650000, 'status': 'Active'}
+    events = change_events(row, {'price': 617500, 'status': 'Active'}, 'now')
+    assert [(e['type'], e['old'], e['new'], e['percent']) for e in events] == [('price', 650000, 617500, -5.0)]
+
+
+def test_change_events_404_after_page_without_status():
+    row = {'url': 'https://example.com/1', 'address': None, 'price': 650000, 'status': None}
+    events = change_events(row, {'price': None, 'status': 'Removed'}, 'now')
+    assert [(e['type'], e['old'], e['new']) for e in events] == [('status', 'Unknown', 'Removed')]
+
+
+def test_removed_listing_back_online_is_active():
+    with tempfile.TemporaryDirectory() as tmp:
+        with PriceWatcher(Path(tmp) / 'watch.db', Path(tmp) / 'events.jsonl') as watcher:
+            watcher.add(['https://example.com/1'])
+            watcher.conn.execute("UPDATE watched SET price = 650000, status = 'Removed', checks = 1")
+            row = watcher.due(float('inf'), 1)[0]
+            result = {'outcome': 'fetched', 'address': None, 'price': 650000, 'status': None, 'bodyHash': 'x'}
+            events = watcher.record(row, result)
+            assert [(e['type'], e['old'], e['new']) for e in events] == [('status', 'Removed', 'Active')]
+            assert watcher.conn.execute('SELECT status FROM watched').fetchone()[0] == 'Active'
+
+
+def test_single_pass_checks_every_due_url_on_one_busy_host():
+    """More URLs on one host than the pool holds, with the host's slots running past the horizon"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ListingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    max_sleep = price_watcher.MAX_SLEEP
+    price_watcher.MAX_SLEEP = 0.2       # 4 host slots fit in the horizon; the pool holds 8 checks
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            with PriceWatcher(Path(tmp) / 'watch.db', Path(tmp) / 'events.jsonl',
+                              workers=4, host_delay=0.05) as watcher:
+                urls = [f'http://127.0.0.1:{server.server_port}/home/{i}' for i in range(30)]
+                assert watcher.add(urls) == 30
+                stats = watcher.run(once=True, progress=False)
+                assert stats['checks'] == 30
+                assert stats['first'] == 30 and stats['unchanged'] == 0
+                assert watcher.conn.execute('SELECT COUNT(*) FROM watched WHERE checks = 0').fetchone()[0] == 0
+                assert watcher.summary()['due'] == 0
+    finally:
+        price_watcher.MAX_SLEEP = max_sleep
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    tests = [value for name, value in sorted(globals().items()) if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    sys.exit(0)
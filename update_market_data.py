@@ -1,9 +1,9 @@
 """
 Market Pulse Data Updater for VDI Realty Website
-This script fetches real estate market data and updates the index.html file automatically.
+This script fetches real estate market data and updates the stats on index.html
+and neighborhoods.html automatically.
 """
 
-import re
 import json
 from datetime import datetime
 from pathlib import Path
@@ -116,6 +116,52 @@ def get_data_from_json(json_file='market_data.json'):
     return None
 
 
+# Option 5: Compute from our own listing data (extracted + FSBO listings)
+def get_computed_data(full=False):
+    """
+    Update the incremental market aggregates from extracted_listings.json and the
+    backend database (only new/changed listings are applied), save the full
+    breakdown and trends to market_data.json, append today's snapshot to the
+    market history store and return the homepage values.
+    Only values backed by enough listings are returned (see
+    market_stats.MIN_SAMPLE); main() keeps the manual value for the rest.
+    Pass full=True to rebuild the aggregates from scratch.
+    """
+    try:
+        from market_aggregates import update_aggregates
+        from market_stats import write_market_data, reliable_values, MIN_SAMPLE
+        from market_history import append_snapshot
+
+        stats, changed = update_aggregates(full=full)
+        print(f"Applied {changed} changed listing(s) to market aggregates")
+        if stats['overall']['totalListings'] == 0:
+            print("No listing data found to compute market stats from")
+            return None
+
+        write_market_data(stats)
+        regions = append_snapshot(stats)
+        print(f"Appended snapshot for {regions} region(s) to market history")
+
+        values = reliable_values(stats['overall'])
+        computed = {
+            key: values[name] for key, name in (
+                ('median_price', 'medianPrice'), ('days_on_market', 'daysOnMarket'),
+                ('list_to_sale', 'saleToList'), ('active_listings', 'activeListings')
+            ) if name in values
+        }
+        computed['city_median_prices'] = {
+            city: row['medianPrice'] for city, row in stats['breakdown']['city'].items()
+            if row['samples']['price'] >= MIN_SAMPLE
+        }
+        kept = {'median_price', 'days_on_market', 'list_to_sale', 'active_listings'} - set(computed)
+        if kept:
+            print(f"Too few listings for {', '.join(sorted(kept))}; keeping the manual value(s)")
+        return computed
+    except Exception as e:
+        print(f"Error computing market stats: {e}")
+        return None
+
+
 def format_number(value):
     """Format numbers with proper formatting"""
     if isinstance(value, str):
@@ -127,67 +173,69 @@ def format_number(value):
     return str(value)
 
 
-def update_html_file(data, html_file='index.html'):
+# Neighborhood cards on neighborhoods.html, keyed by city name in the market stats
+NEIGHBORHOOD_IDS = {
+    'Seattle': 'medianHome-seattle',
+    'Bellevue': 'medianHome-bellevue',
+    'Redmond': 'medianHome-redmond',
+    'Kirkland': 'medianHome-kirkland',
+    'Issaquah': 'medianHome-issaquah',
+    'Mercer Island': 'medianHome-mercer-island'
+}
+
+
+def build_page_values(data):
     """
-    Update the index.html file with new market data.
+    Map market data onto the element ids each page displays it in.
+    Returns {html file: {element id: text}} for html_patcher.patch_files().
     """
-    html_path = Path(__file__).parent / html_file
-    
-    if not html_path.exists():
-        print(f"Error: {html_file} not found!")
-        return False
-    
-    # Read the current HTML
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    
-    # Update Median Price
-    html_content = re.sub(
-        r'(<span class="local-stat-num">)\$?\d+k?(</span>\s*<span class="local-stat-title">Median Price</span>)',
-        rf'\1{data["median_price"]}\2',
-        html_content
-    )
-    
-    # Update Days on Market
-    html_content = re.sub(
-        r'(<span class="local-stat-num">)\d+(</span>\s*<span class="local-stat-title">Days on Market</span>)',
-        rf'\1{data["days_on_market"]}\2',
-        html_content
-    )
-    
-    # Update List-to-Sale
-    html_content = re.sub(
-        r'(<span class="local-stat-num">)\d+%(</span>\s*<span class="local-stat-title">List-to-Sale</span>)',
-        rf'\1{data["list_to_sale"]}%\2',
-        html_content
-    )
-    
-    # Update Active Listings
-    html_content = re.sub(
-        r'(<span class="local-stat-num">)\d+(</span>\s*<span class="local-stat-title">Active Listings</span>)',
-        rf'\1{data["active_listings"]}\2',
-        html_content
-    )
-    
-    # Update the date in the footer note
-    html_content = re.sub(
-        r'\*Data reflects Greater Metro Area averages updated [A-Za-z]+ \d{4}\.',
-        f'*Data reflects Greater Metro Area averages updated {data["update_date"]}.',
-        html_content
-    )
-    
-    # Write the updated HTML back
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"✅ Successfully updated {html_file}")
-    print(f"   Median Price: {data['median_price']}")
-    print(f"   Days on Market: {data['days_on_market']}")
-    print(f"   List-to-Sale: {data['list_to_sale']}%")
-    print(f"   Active Listings: {data['active_listings']}")
+    median_price = str(data['median_price'])
+    if not median_price.startswith('$'):
+        median_price = f"${median_price}"
+
+    pages = {
+        'index.html': {
+            'medianPrice': median_price,
+            'daysOnMarket': data['days_on_market'],
+            'saleToList': f"{data['list_to_sale']}%",
+            'activeListings': data['active_listings']
+        }
+    }
+
+    neighborhoods = {}
+    for city, price in (data.get('city_median_prices') or {}).items():
+        if city in NEIGHBORHOOD_IDS and price:
+            neighborhoods[NEIGHBORHOOD_IDS[city]] = format_number(price).replace('k', 'K')
+    if neighborhoods:
+        pages['neighborhoods.html'] = neighborhoods
+
+    return pages
+
+
+def update_html_file(data, html_files=None):
+    """
+    Update market stats in index.html (and neighborhoods.html when per-city
+    data is available). Each page is patched in a single pass by element id
+    and only rewritten if its content changed.
+    """
+    from html_patcher import patch_files
+
+    pages = build_page_values(data)
+    if html_files:
+        pages = {name: values for name, values in pages.items() if name in html_files}
+
+    results = patch_files(pages)
+    for html_file, result in results.items():
+        status = "Successfully updated" if result['changed'] else "No changes for"
+        print(f"✅ {status} {html_file}")
+        for element_id, value in pages[html_file].items():
+            print(f"   {element_id}: {value}")
+        if result['missing']:
+            print(f"   ⚠️  Elements not found: {', '.join(result['missing'])}")
+
     print(f"   Updated: {data['update_date']}")
-    
-    return True
+
+    return all(not result['missing'] for result in results.values())
 
 
 def main():
@@ -197,8 +245,12 @@ def main():
     print("=" * 60)
     
     # Choose your data source method here:
-    # Method 1: Manual update (fastest, no API needed)
-    market_data = get_manual_data()
+    # Method 1: Computed from our listing data; manual values fill any field
+    # that is missing or rests on too few listings
+    market_data = {**get_manual_data(), **(get_computed_data() or {})}
+    
+    # Method 1b: Manual update only (fastest, no listing data needed)
+    # market_data = get_manual_data()
     
     # Method 2: From JSON file (uncomment to use)
     # market_data = get_data_from_json('market_data.json')